@@ -0,0 +1,90 @@
+"""Benchmarks compression ratio, compression and decompression speed per codec.
+
+Collects the files of a random json data lake into one bundle per available
+codec through the collector BundleWriter, then reads the bundle back.
+
+Usage:
+    python -m benchmarks.bench_codec [json_files]
+"""
+
+import bz2
+import gzip
+import lzma
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from lakeflush.core.bundle_writer import BundleWriter
+from lakeflush.core.codec import available_codecs, get_codec
+from lakeflush.core.flush_policy import FlushMode, FlushPolicy
+from tests.lakes.random_datalake import create_random_datalake
+
+
+def zstd_open(path: str, mode: str):
+    import zstandard
+
+    return zstandard.open(path, mode)
+
+
+OPENERS = {"gzip": gzip.open, "bz2": bz2.open, "lzma": lzma.open, "zstd": zstd_open}
+
+
+def load_lake(path: Path, max_files: int) -> list:
+    endtime = datetime.now().replace(hour=12)
+    create_random_datalake(
+        path, 4, endtime - timedelta(minutes=30), endtime, max_files=max_files
+    )
+    records = []
+    for root, _, files in os.walk(path):
+        for name in files:
+            with open(os.path.join(root, name), "rb") as fp:
+                records.append(fp.read())
+    return records
+
+
+def bench(path: Path, records: list, codec_name: str) -> tuple:
+    codec = get_codec(codec_name)
+    writer = BundleWriter(
+        str(path / "bench.lakeflush.inprogress"),
+        max_bytes=0,
+        interval=0,
+        buffer_size=256 * 1024,
+        codec=codec,
+        flush_policy=FlushPolicy(FlushMode.ROTATION),
+    )
+    start = time.perf_counter()
+    for i in range(0, len(records), 100):
+        writer.write_many(records[i : i + 100])
+    writer.close()
+    compress_time = time.perf_counter() - start
+    start = time.perf_counter()
+    with OPENERS[codec_name](writer.filename, "rb") as fp:
+        while fp.read(1024 * 1024):
+            pass
+    decompress_time = time.perf_counter() - start
+    size = os.path.getsize(writer.filename)
+    os.remove(writer.filename)
+    return size, compress_time, decompress_time
+
+
+def main(json_files: int = 20000):
+    with tempfile.TemporaryDirectory() as tmp:
+        lake = Path(tmp) / "lake"
+        os.makedirs(lake)
+        records = load_lake(lake, json_files)
+        raw = sum(len(record) + 1 for record in records) / 1024 / 1024
+        print(f"\njson: {len(records)} files, {raw:.1f} MB")
+        for codec_name in available_codecs():
+            size, compress_time, decompress_time = bench(Path(tmp), records, codec_name)
+            print(
+                f"{codec_name.ljust(6)} ratio {raw * 1024 * 1024 / size:6.2f}"
+                f"  compress {raw / compress_time:8.1f} MB/s"
+                f"  decompress {raw / decompress_time:8.1f} MB/s"
+            )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
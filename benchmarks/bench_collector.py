@@ -0,0 +1,91 @@
+"""Benchmarks collector write throughput in MB/s.
+
+Compares the logging based rotating handlers used by the collector before with
+the direct BundleWriter, for both plain and gzip bundles.
+
+Usage:
+    python -m benchmarks.bench_collector [record_size] [total_mb]
+"""
+
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from lakeflush.core.bundle_writer import BundleWriter
+from lakeflush.core.codec import get_codec
+from lakeflush.core.file_handler import SizedTimedRotatingFileHandler
+from lakeflush.core.gzipfile_handler import GzipSizedTimedRotatingFileHandler
+
+
+def make_record(record_size: int) -> str:
+    _data = '{"id": 1, "name": "lakeflush", "price": 10.5},'
+    return (_data * (record_size // len(_data) + 1))[:record_size]
+
+
+def bench_logging(path: Path, record: str, count: int, compress: bool) -> float:
+    handler_cls = (
+        GzipSizedTimedRotatingFileHandler if compress else SizedTimedRotatingFileHandler
+    )
+    handler = handler_cls(
+        str(path / "bench.lakeflush.inprogress"),
+        maxBytes=64 * 1024 * 1024,
+        when="M",
+        interval=60,
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger = logging.getLogger(f"__lakeflush-bench-{compress}__")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(handler)
+    start = time.perf_counter()
+    for _ in range(count):
+        logger.info(record)
+    handler.close()
+    logger.removeHandler(handler)
+    return time.perf_counter() - start
+
+
+def bench_writer(
+    path: Path, record: str, count: int, compress: bool, buffer_size: int
+) -> float:
+    writer = BundleWriter(
+        str(path / "bench.lakeflush.inprogress"),
+        max_bytes=64 * 1024 * 1024,
+        interval=3600,
+        buffer_size=buffer_size,
+        codec=get_codec("gzip") if compress else None,
+    )
+    start = time.perf_counter()
+    for _ in range(count):
+        writer.write(record)
+    writer.close()
+    return time.perf_counter() - start
+
+
+def main(record_size: int = 256, total_mb: int = 64):
+    record = make_record(record_size)
+    count = total_mb * 1024 * 1024 // record_size
+    print(f"records: {count} x {record_size} bytes ({total_mb} MB)")
+    for compress in (False, True):
+        cases = [
+            ("logging handler", lambda p: bench_logging(p, record, count, compress)),
+            (
+                "bundle writer (buffer 0)",
+                lambda p: bench_writer(p, record, count, compress, 0),
+            ),
+            (
+                "bundle writer (buffer 64K)",
+                lambda p: bench_writer(p, record, count, compress, 64 * 1024),
+            ),
+        ]
+        for name, fn in cases:
+            with tempfile.TemporaryDirectory() as tmp:
+                elapsed = fn(Path(tmp))
+            label = f"{'gzip' if compress else 'plain'} {name}"
+            print(f"{label.ljust(36)} {total_mb / elapsed:10.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
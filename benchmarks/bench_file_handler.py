@@ -0,0 +1,76 @@
+"""Benchmarks emits per second of SizedTimedRotatingFileHandler.
+
+Compares the tracked size accounting with the previous per record size check,
+which formatted every record twice and did a seek and tell on every emit.
+
+Usage:
+    python -m benchmarks.bench_file_handler [record_size] [count]
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+from logging.handlers import TimedRotatingFileHandler
+from pathlib import Path
+
+from lakeflush.core.file_handler import SizedTimedRotatingFileHandler
+
+
+class SeekTellSizedTimedRotatingFileHandler(SizedTimedRotatingFileHandler):
+    """The previous size check, kept for comparison."""
+
+    emit = TimedRotatingFileHandler.emit
+
+    def shouldRollover(self, record):
+        if self.max_bytes > 0:
+            msg = f"{self.format(record)}\n"
+            self.stream.seek(0, os.SEEK_END)
+            if self.stream.tell() + len(msg) >= self.max_bytes:
+                return True
+        return TimedRotatingFileHandler.shouldRollover(self, record)
+
+
+def bench(handler_cls, path: Path, record: str, count: int, **kwargs) -> float:
+    handler = handler_cls(
+        str(path / "bench.lakeflush.inprogress"),
+        maxBytes=1024 * 1024 * 1024,
+        when="M",
+        interval=60,
+        **kwargs,
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger = logging.getLogger(f"__lakeflush-bench-{handler_cls.__name__}__")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(handler)
+    start = time.perf_counter()
+    for _ in range(count):
+        logger.info(record)
+    elapsed = time.perf_counter() - start
+    handler.close()
+    logger.removeHandler(handler)
+    return elapsed
+
+
+def main(record_size: int = 256, count: int = 200000):
+    record = "x" * record_size
+    print(f"records: {count} x {record_size} bytes")
+    cases = [
+        ("seek/tell per emit", SeekTellSizedTimedRotatingFileHandler, {}),
+        ("tracked size", SizedTimedRotatingFileHandler, {}),
+        (
+            "tracked size, check every 1MB",
+            SizedTimedRotatingFileHandler,
+            {"size_check_interval": 1024 * 1024},
+        ),
+    ]
+    for name, handler_cls, kwargs in cases:
+        with tempfile.TemporaryDirectory() as tmp:
+            elapsed = bench(handler_cls, Path(tmp), record, count, **kwargs)
+        print(f"{name.ljust(32)} {count / elapsed:12.0f} emits/s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,78 @@
+"""Benchmarks the memory of holding scanned files, RSS growth in MB measured in a
+fresh process per representation.
+
+Compares a list of (mtime, Path) tuples as once held by FileProcessor, a list of
+(mtime, path, size) tuples and the compact FileIndex, each built and then sorted
+by mtime. Entries are synthetic, no files are created.
+
+Usage:
+    python -m benchmarks.bench_file_index [entries] [case ...]
+"""
+
+import random
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from lakeflush.utils.file_index import FileIndex
+
+CASES = ("path tuples", "str tuples", "file index")
+
+
+def entries(count: int):
+    rand = random.Random(42)
+    for i in range(count):
+        mtime = 1.7e9 + rand.random() * 86400 * 30
+        yield mtime, f"/data/lake/part={i % 997}/file-{i:010d}.json", 1024
+
+
+def build(case: str, count: int):
+    if case == "path tuples":
+        files = [(mtime, Path(path)) for mtime, path, _ in entries(count)]
+        return files, files.sort
+    if case == "str tuples":
+        files = list(entries(count))
+        return files, files.sort
+    index = FileIndex()
+    for mtime, path, size in entries(count):
+        index.append(mtime, path, size)
+    return index, index.sorted
+
+
+def max_rss() -> float:
+    """Returns the peak RSS of the process in MB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(case: str, count: int) -> None:
+    """Builds and sorts a representation, runs in its own process"""
+    base = max_rss()
+    start = time.perf_counter()
+    files, sort = build(case, count)
+    built, elapsed = max_rss() - base, time.perf_counter() - start
+    start = time.perf_counter()
+    sort()
+    sort_elapsed = time.perf_counter() - start
+    print(
+        f"{case.ljust(12)} {built:9.1f} MB built {max_rss() - base:9.1f} MB sorted "
+        f"{elapsed:7.2f} s build {sort_elapsed:7.2f} s sort",
+        flush=True,
+    )
+
+
+def main(count: int = 1000000, *cases: str):
+    print(f"entries: {count}", flush=True)
+    for case in cases or CASES:
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_file_index", "--run", case]
+            + [str(count)]
+        )
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--run"]:
+        run(sys.argv[2], int(sys.argv[3]))
+    else:
+        main(*(int(arg) if arg.isdigit() else arg for arg in sys.argv[1:]))
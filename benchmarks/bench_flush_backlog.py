@@ -0,0 +1,59 @@
+"""Benchmarks draining a backlog of collected bundles with Flusher in bundles/s.
+
+The bundles exist before the flusher starts and are found by its startup scan.
+Uploads are simulated by sleeping latency_ms in flush, the latency of a put to
+an object store.
+
+Usage:
+    python -m benchmarks.bench_flush_backlog [bundles] [latency_ms]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from lakeflush.core import Flusher
+
+
+class SleepFlusher(Flusher):
+    latency = 0.0
+
+    def flush(self, src_file: str):
+        time.sleep(self.latency)
+        os.remove(src_file)
+        stat = os.stat_result((0,) * 10)
+        self.record_flush(os.path.basename(src_file), src_file, "", stat)
+
+
+def bench(root: str, count: int, workers: int, latency: float) -> float:
+    for i in range(count):
+        with open(os.path.join(root, f"bench.{i}.lakeflush.collected"), "w") as fp:
+            fp.write("data")
+    flusher = SleepFlusher(root, f"bench-{workers}", flush_workers=workers)
+    flusher.latency = latency
+    thread = threading.Thread(target=flusher.start)
+    start = time.perf_counter()
+    thread.start()
+    while len(flusher.journal) < count:
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    flusher.stop()
+    thread.join()
+    return elapsed
+
+
+def main(count: int = 2000, latency_ms: int = 20):
+    print(f"bundles: {count}, latency: {latency_ms} ms")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        for workers in (1, 4, 16, 64):
+            root = os.path.join(tmp, f"workers-{workers}")
+            os.makedirs(root)
+            elapsed = bench(root, count, workers, latency_ms / 1000)
+            print(f"flush_workers {workers:3}  {count / elapsed:10.1f} bundles/s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
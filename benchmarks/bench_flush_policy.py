@@ -0,0 +1,113 @@
+"""Benchmarks compression ratio and throughput of the gzip flush policies.
+
+Collects the files of random json and csv data lakes through
+GzipSizedTimedRotatingFileHandler and the collector BundleWriter, one record per
+file, once per flush policy.
+
+Usage:
+    python -m benchmarks.bench_flush_policy [json_files] [csv_files]
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from lakeflush.core.bundle_writer import BundleWriter
+from lakeflush.core.flush_policy import FlushMode, FlushPolicy
+from lakeflush.core.gzipfile_handler import GzipSizedTimedRotatingFileHandler
+from tests.lakes.random_datalake import create_random_datalake
+
+POLICIES = [
+    ("record (previous)", FlushPolicy(FlushMode.RECORD)),
+    ("bytes 64K", FlushPolicy(FlushMode.BYTES, 64 * 1024)),
+    ("millis 100", FlushPolicy(FlushMode.MILLIS, 100)),
+    ("rotation", FlushPolicy(FlushMode.ROTATION)),
+]
+
+
+def load_lake(path: Path, file_type: str, max_files: int) -> list:
+    endtime = datetime.now().replace(hour=12)
+    create_random_datalake(
+        path,
+        4,
+        endtime - timedelta(minutes=30),
+        endtime,
+        file_type=file_type,
+        max_files=max_files,
+        csv_num_rows=100,
+    )
+    records = []
+    for root, _, files in os.walk(path):
+        for name in files:
+            with open(os.path.join(root, name)) as fp:
+                records.append(fp.read())
+    return records
+
+
+def bench_handler(path: Path, records: list, policy: FlushPolicy) -> tuple:
+    file_path = path / "bench.lakeflush.inprogress.gz"
+    handler = GzipSizedTimedRotatingFileHandler(
+        str(file_path),
+        maxBytes=1024 * 1024 * 1024,
+        when="M",
+        interval=60,
+        flush_policy=policy,
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger = logging.getLogger("__lakeflush-bench-flush__")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    logger.addHandler(handler)
+    start = time.perf_counter()
+    for record in records:
+        logger.info(record)
+    handler.close()
+    elapsed = time.perf_counter() - start
+    logger.removeHandler(handler)
+    size = os.path.getsize(file_path)
+    os.remove(file_path)
+    return elapsed, size
+
+
+def bench_writer(path: Path, records: list, policy: FlushPolicy) -> tuple:
+    file_path = path / "bench.lakeflush.inprogress.gz"
+    writer = BundleWriter(
+        str(file_path),
+        max_bytes=1024 * 1024 * 1024,
+        interval=3600,
+        compress=True,
+        flush_policy=policy,
+    )
+    start = time.perf_counter()
+    for record in records:
+        writer.write(record)
+    writer.close()
+    elapsed = time.perf_counter() - start
+    size = os.path.getsize(file_path)
+    os.remove(file_path)
+    return elapsed, size
+
+
+def main(json_files: int = 5000, csv_files: int = 200):
+    for file_type, max_files in (("json", json_files), ("csv", csv_files)):
+        with tempfile.TemporaryDirectory() as tmp:
+            lake = Path(tmp) / "lake"
+            os.makedirs(lake)
+            records = load_lake(lake, file_type, max_files)
+            raw = sum(len(record) + 1 for record in records)
+            print(f"\n{file_type}: {len(records)} files, {raw / 1024 / 1024:.1f} MB")
+            for label, bench in (("handler", bench_handler), ("writer", bench_writer)):
+                for name, policy in POLICIES:
+                    elapsed, size = bench(Path(tmp), records, policy)
+                    print(
+                        f"{label.ljust(8)} {name.ljust(20)} ratio {raw / size:6.2f}"
+                        f"  {raw / 1024 / 1024 / elapsed:8.1f} MB/s"
+                    )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,76 @@
+"""Benchmarks the latency from a collected file renamed to its flush in ms.
+
+Compares the flusher detecting collected files by filesystem events with the
+collector submitting them to the flusher in process.
+
+Usage:
+    python -m benchmarks.bench_handoff [bundles]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from lakeflush.core import Collector, Flusher
+
+RECORD = "x" * 1023 + "\n"
+
+
+class TimedFlusher(Flusher):
+    def flush(self, src_file: str):
+        flushed[os.path.basename(src_file)] = time.perf_counter()
+        os.remove(src_file)
+
+
+class TimedCollector(Collector):
+    def on_finalized(self, file_path: str) -> None:
+        finalized[os.path.basename(file_path)] = time.perf_counter()
+
+
+finalized, flushed = {}, {}
+
+
+def bench(root: str, count: int, handoff: bool) -> list:
+    finalized.clear()
+    flushed.clear()
+    flusher = TimedFlusher(root, "bench", watch=not handoff)
+    thread = threading.Thread(target=flusher.start)
+    thread.start()
+    time.sleep(0.5)
+    collector = TimedCollector(root, "bench", flusher=flusher if handoff else None)
+    for _ in range(count):
+        # a bundle of 1 MB rotated by the next collect
+        collector.collect_many([RECORD] * 1024)
+        time.sleep(0.01)
+    collector.collect(RECORD)
+    deadline = time.time() + 30
+    while len(flushed) < len(finalized) and time.time() < deadline:
+        time.sleep(0.01)
+    flusher.stop()
+    thread.join()
+    collector.close()
+    return [(flushed[name] - finalized[name]) * 1000 for name in flushed]
+
+
+def main(count: int = 200):
+    print(f"bundles: {count}")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        for handoff in (False, True):
+            root = os.path.join(tmp, f"handoff-{handoff}")
+            os.makedirs(root)
+            latencies = sorted(bench(root, count, handoff))
+            mode = "in process" if handoff else "watchdog  "
+            p99 = latencies[int(len(latencies) * 0.99) - 1]
+            print(
+                f"{mode} {len(latencies)} flushed "
+                f"median {statistics.median(latencies):8.3f} ms "
+                f"p99 {p99:8.3f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
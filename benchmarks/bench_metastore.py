@@ -0,0 +1,62 @@
+"""Benchmarks writing and reading SQLiteMetastore keys in keys/s.
+
+Compares a transaction per key with set_metadata() against set_many(), and a
+query per key with get_metadata() against get_many(), for each synchronous
+setting.
+
+Usage:
+    python -m benchmarks.bench_metastore [keys] [per_key]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from lakeflush.utils.metastore import SQLiteMetastore
+
+
+def rate(count: int, elapsed: float) -> str:
+    return f"{count / elapsed:12.1f} keys/s"
+
+
+def main(count: int = 1000000, per_key: int = 5000):
+    items = {
+        f"file:/lake/logs/{i % 24:02d}/events-{i}.json": {"size": i, "offset": 0}
+        for i in range(count)
+    }
+    keys = list(items)
+    print(f"keys: {count}, per key calls: {per_key}")
+
+    for synchronous in ("FULL", "NORMAL"):
+        with tempfile.TemporaryDirectory() as tmp:
+            metastore = SQLiteMetastore(os.path.join(tmp, "bench.db"), synchronous)
+
+            start = time.perf_counter()
+            for key in keys[:per_key]:
+                metastore.set_metadata(key, items[key])
+            elapsed = time.perf_counter() - start
+            print(f"{synchronous:6} set_metadata {rate(per_key, elapsed)}")
+
+            start = time.perf_counter()
+            metastore.set_many(items)
+            elapsed = time.perf_counter() - start
+            print(f"{synchronous:6} set_many     {rate(count, elapsed)}")
+
+            start = time.perf_counter()
+            for key in keys[:per_key]:
+                metastore.get_metadata(key)
+            elapsed = time.perf_counter() - start
+            print(f"{synchronous:6} get_metadata {rate(per_key, elapsed)}")
+
+            start = time.perf_counter()
+            found = metastore.get_many(keys)
+            elapsed = time.perf_counter() - start
+            print(
+                f"{synchronous:6} get_many     {rate(count, elapsed)} {len(found)} found"
+            )
+            del metastore
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,81 @@
+"""Benchmarks ordering scanned files by modification time, time and peak MB
+allocated by Python.
+
+Compares the per batch heap of FileProcessor, a global sort in memory and the
+external merge sort of order 'global'. Entries are synthetic, no files are
+created.
+
+Usage:
+    python -m benchmarks.bench_ordering [entries] [run_size]
+"""
+
+import heapq
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from lakeflush.utils.external_sort import ExternalSorter
+
+
+def entries(count: int):
+    rand = random.Random(42)
+    for i in range(count):
+        mtime = 1.7e9 + rand.random() * 86400 * 30
+        yield mtime, f"/data/lake/part={i % 997}/file-{i:010d}.json", 1024
+
+
+def batch_heap(count: int, batch_size: int = 1000):
+    heap = []
+    for mtime, path, size in entries(count):
+        heapq.heappush(heap, (mtime, Path(path)))
+        if len(heap) > batch_size:
+            while heap:
+                yield heapq.heappop(heap)
+    while heap:
+        yield heapq.heappop(heap)
+
+
+def memory_sort(count: int):
+    yield from sorted((mtime, Path(path)) for mtime, path, size in entries(count))
+
+
+def external_sort(count: int, run_size: int):
+    yield from ExternalSorter(run_size).sort(entries(count))
+
+
+def consume(ordered) -> tuple:
+    """Returns (entries, entries out of order)"""
+    last, inversions, total = 0.0, 0, 0
+    for entry in ordered:
+        inversions += entry[0] < last
+        last = entry[0]
+        total += 1
+    return total, inversions
+
+
+def measure(name: str, ordered) -> None:
+    # timed without tracing, traced memory in a second pass
+    start = time.perf_counter()
+    total, inversions = consume(ordered())
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    consume(ordered())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name.ljust(24)} {elapsed:8.2f} s {peak / 1024 / 1024:10.1f} MB peak "
+        f"{inversions:10d} out of order"
+    )
+
+
+def main(count: int = 1000000, run_size: int = 100000):
+    print(f"entries: {count}")
+    measure("batch heap (1000)", lambda: batch_heap(count))
+    measure("sort in memory", lambda: memory_sort(count))
+    measure(f"external sort ({run_size})", lambda: external_sort(count, run_size))
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,62 @@
+"""Benchmarks local collection of json lines files in MB/s and CPU s/GB.
+
+Compares reading files through JSONFileReader, which decodes every file into a
+str and encodes it back, with the passthrough mode appending files as is.
+
+Usage:
+    python -m benchmarks.bench_passthrough [file_kb] [total_mb]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from lakeflush.core.bundle_writer import BundleWriter
+from lakeflush.utils.file.reader import JSONFileReader
+
+
+def make_files(path: Path, file_kb: int, total_mb: int) -> list:
+    line = '{"id": 1, "name": "lakeflush", "price": 10.5}\n'
+    content = line * (file_kb * 1024 // len(line))
+    files = []
+    for i in range(total_mb * 1024 // file_kb):
+        file_path = path / f"{i}.json"
+        file_path.write_text(content)
+        files.append(file_path)
+    return files
+
+
+def bench(path: Path, files: list, passthrough: bool) -> tuple:
+    writer = BundleWriter(
+        str(path / "bench.lakeflush.inprogress"),
+        max_bytes=256 * 1024 * 1024,
+        interval=3600,
+        buffer_size=64 * 1024,
+    )
+    reader = JSONFileReader()
+    start, cpu = time.perf_counter(), time.process_time()
+    for file_path in files:
+        if passthrough:
+            writer.write_file(file_path)
+        else:
+            writer.write_many(reader.read(file_path))
+    writer.close()
+    return time.perf_counter() - start, time.process_time() - cpu
+
+
+def main(file_kb: int = 64, total_mb: int = 256):
+    with tempfile.TemporaryDirectory() as tmp:
+        files = make_files(Path(tmp), file_kb, total_mb)
+        print(f"files: {len(files)} x {file_kb} KB ({total_mb} MB)")
+        for name, passthrough in (("reader", False), ("passthrough", True)):
+            with tempfile.TemporaryDirectory() as out:
+                elapsed, cpu = bench(Path(out), files, passthrough)
+            print(
+                f"{name.ljust(12)} {total_mb / elapsed:10.1f} MB/s "
+                f"{cpu * 1024 / total_mb:8.2f} CPU s/GB"
+            )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
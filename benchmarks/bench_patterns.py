@@ -0,0 +1,38 @@
+"""Benchmarks matching names against match_patterns in names/s.
+
+Compares fnmatch called per pattern with the patterns compiled into a single
+regex by PatternMatcher.
+
+Usage:
+    python -m benchmarks.bench_patterns [names] [patterns]
+"""
+
+import fnmatch
+import sys
+import time
+
+from lakeflush.utils.file import PatternMatcher
+
+
+def main(count: int = 1000000, patterns: int = 5):
+    names = [
+        f"logs/2024/{i % 24:02d}/events-{i}.{('json', 'csv')[i % 2]}"
+        for i in range(count)
+    ]
+    rules = [f"logs/2024/{hour:02d}/*.json" for hour in range(patterns)]
+    print(f"names: {count}, patterns: {patterns}")
+
+    start = time.perf_counter()
+    matched = sum(1 for name in names if any(fnmatch.fnmatch(name, p) for p in rules))
+    elapsed = time.perf_counter() - start
+    print(f"fnmatch per pattern  {count / elapsed:12.1f} names/s {matched} matched")
+
+    matcher = PatternMatcher(rules)
+    start = time.perf_counter()
+    matched = sum(1 for name in names if matcher.match(name))
+    elapsed = time.perf_counter() - start
+    print(f"compiled regex       {count / elapsed:12.1f} names/s {matched} matched")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,64 @@
+"""Benchmarks local collection with files read ahead in files/s.
+
+High latency mounts like NFS are simulated by sleeping before every file read.
+
+Usage:
+    python -m benchmarks.bench_prefetch [files] [latency_ms]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from lakeflush.collectors import LocalLakeCollector
+from lakeflush.utils.file.reader import JSONFileReader
+
+
+class SlowJSONFileReader(JSONFileReader):
+    latency = 0.0
+
+    def fetch(self, file_path: str) -> str:
+        time.sleep(self.latency)
+        return super().fetch(file_path)
+
+
+def bench(root: Path, out: Path, workers: int) -> float:
+    collector = LocalLakeCollector(
+        root,
+        prefetch_workers=workers,
+        filepath=out,
+        filename="bench",
+        max_size_mb=256,
+        max_time_mins=60,
+        buffer_size=64 * 1024,
+    )
+    reader = SlowJSONFileReader()
+    collector.reader = reader
+    if collector.prefetcher:
+        collector.prefetcher.fetch = reader.fetch
+    start = time.perf_counter()
+    collector.start()
+    collector.close()
+    return time.perf_counter() - start
+
+
+def main(files: int = 2000, latency_ms: int = 2):
+    SlowJSONFileReader.latency = latency_ms / 1000
+    line = '{"id": 1, "name": "lakeflush", "price": 10.5}\n'
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "lake"
+        root.mkdir()
+        for i in range(files):
+            (root / f"{i}.json").write_text(line * 20)
+        print(f"files: {files}, simulated latency: {latency_ms} ms")
+        for workers in (0, 4, 16):
+            with tempfile.TemporaryDirectory() as out:
+                elapsed = bench(root, Path(out), workers)
+            print(
+                f"prefetch_workers={str(workers).ljust(4)} {files / elapsed:10.1f} files/s"
+            )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,66 @@
+"""Benchmarks s3 collection with objects fetched concurrently in objects/s.
+
+Runs against a local moto server, every request pays the server round trip.
+
+Usage:
+    python -m benchmarks.bench_s3_fetch [objects] [object_kb]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import boto3
+from moto.server import ThreadedMotoServer
+
+from lakeflush.collectors import S3LakeCollector
+
+BUCKET = "lakeflush-bench"
+
+
+def bench(endpoint_url: str, out: Path, workers: int) -> float:
+    collector = S3LakeCollector(
+        BUCKET,
+        fetch_workers=workers,
+        client_kwargs=dict(endpoint_url=endpoint_url),
+        filepath=out,
+        filename="bench",
+        max_size_mb=256,
+        max_time_mins=60,
+        buffer_size=64 * 1024,
+    )
+    start = time.perf_counter()
+    collector.start()
+    collector.close()
+    return time.perf_counter() - start
+
+
+def main(objects: int = 500, object_kb: int = 4):
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    server = ThreadedMotoServer(port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    endpoint_url = f"http://{host}:{port}"
+    client = boto3.client("s3", endpoint_url=endpoint_url)
+    client.create_bucket(Bucket=BUCKET)
+    body = b'{"id": 1, "name": "lakeflush"}\n' * (object_kb * 1024 // 32)
+    for i in range(objects):
+        client.put_object(Bucket=BUCKET, Key=f"lake/{i}.json", Body=body)
+    print(f"objects: {objects} x {object_kb} KB")
+    try:
+        for workers in (0, 4, 16):
+            with tempfile.TemporaryDirectory() as out:
+                elapsed = bench(endpoint_url, Path(out), workers)
+            print(
+                f"fetch_workers={str(workers).ljust(4)} {objects / elapsed:10.1f} objects/s"
+            )
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,61 @@
+"""Benchmarks s3 listing in keys/s with prefixes listed concurrently.
+
+Runs against a local moto server in another process.
+
+Usage:
+    python -m benchmarks.bench_s3_list [keys] [prefixes]
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import boto3
+
+from lakeflush.utils.s3 import S3Lister, S3Store
+
+BUCKET = "lakeflush-bench"
+
+
+def main(keys: int = 5000, prefixes: int = 20):
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, "-m", "moto.server", "-p", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    endpoint_url = f"http://127.0.0.1:{port}"
+    client = boto3.client("s3", endpoint_url=endpoint_url)
+    try:
+        for _ in range(50):
+            try:
+                client.create_bucket(Bucket=BUCKET)
+                break
+            except Exception:
+                time.sleep(0.2)
+        for i in range(keys):
+            client.put_object(
+                Bucket=BUCKET, Key=f"lake/p={i % prefixes}/{i}.json", Body=b"{}"
+            )
+        S3Store.setup(endpoint_url=endpoint_url)
+        print(f"keys: {keys} in {prefixes} prefixes, page size 100")
+        for workers in (1, 4, 8):
+            lister = S3Lister(BUCKET, "lake/", page_size=100, workers=workers)
+            start = time.perf_counter()
+            listed = sum(1 for _ in lister.objects())
+            elapsed = time.perf_counter() - start
+            assert listed == keys
+            print(f"list_workers={str(workers).ljust(4)} {keys / elapsed:10.1f} keys/s")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,86 @@
+"""Benchmarks collecting a large s3 object whole or in byte ranges, in MB/s and
+peak MB allocated by Python.
+
+Runs against a local moto server in another process, so only the collector
+allocations are traced.
+
+Usage:
+    python -m benchmarks.bench_s3_ranged [object_mb]
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import boto3
+
+from lakeflush.collectors import S3LakeCollector
+
+BUCKET = "lakeflush-bench"
+
+
+def bench(endpoint_url: str, out: Path, range_cutoff_mb: int) -> tuple:
+    collector = S3LakeCollector(
+        BUCKET,
+        range_cutoff_mb=range_cutoff_mb,
+        client_kwargs=dict(endpoint_url=endpoint_url),
+        filepath=out,
+        filename="bench",
+        max_size_mb=1024,
+        max_time_mins=60,
+        buffer_size=64 * 1024,
+    )
+    tracemalloc.start()
+    start = time.perf_counter()
+    collector.start()
+    collector.close()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main(object_mb: int = 128):
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, "-m", "moto.server", "-p", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    endpoint_url = f"http://127.0.0.1:{port}"
+    client = boto3.client("s3", endpoint_url=endpoint_url)
+    for _ in range(50):
+        try:
+            client.create_bucket(Bucket=BUCKET)
+            break
+        except Exception:
+            time.sleep(0.2)
+    line = b'{"id": 1, "name": "lakeflush", "price": 10.5}\n'
+    body = line * (object_mb * 1024 * 1024 // len(line))
+    client.put_object(Bucket=BUCKET, Key="lake/large.json", Body=body)
+    del body
+    print(f"object: {object_mb} MB")
+    try:
+        for name, cutoff in (("whole", 0), ("ranged 8 MB x 4", 1)):
+            with tempfile.TemporaryDirectory() as out:
+                elapsed, peak = bench(endpoint_url, Path(out), cutoff)
+            print(
+                f"{name.ljust(16)} {object_mb / elapsed:8.1f} MB/s "
+                f"{peak:8.1f} MB peak"
+            )
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:2]))
@@ -0,0 +1,72 @@
+"""Benchmarks scanning a partitioned tree with FileProcessor in files/s.
+
+High latency mounts like NFS are simulated by sleeping before every directory
+visited, the tree is year=/month=/day=/hour= partitioned. A rescan with a scan
+cache is measured after a file is added to a single hour.
+
+Usage:
+    python -m benchmarks.bench_scan [days] [latency_ms] [files_per_hour]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from lakeflush.utils.file import FileProcessor
+
+
+class SlowFileProcessor(FileProcessor):
+    latency = 0.0
+
+    def _scan_dir(self, current_dir: str, cached: dict = None):
+        time.sleep(self.latency)
+        return super()._scan_dir(current_dir, cached)
+
+
+def bench(root: Path, workers: int) -> tuple:
+    processor = SlowFileProcessor(root, scan_workers=workers)
+    start = time.perf_counter()
+    files = sum(1 for _ in processor)
+    return files, time.perf_counter() - start
+
+
+def bench_rescan(root: Path, cache: str) -> tuple:
+    processor = SlowFileProcessor(root, scan_cache=cache)
+    start = time.perf_counter()
+    files = sum(1 for _ in processor)
+    processor.commit_scan()
+    return files, time.perf_counter() - start
+
+
+def main(days: int = 10, latency_ms: int = 2, files_per_hour: int = 20):
+    SlowFileProcessor.latency = latency_ms / 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "lake"
+        for day in range(days):
+            for hour in range(24):
+                path = root / "year=2024" / "month=01" / f"day={day}" / f"hour={hour}"
+                path.mkdir(parents=True)
+                for i in range(files_per_hour):
+                    (path / f"{i}.json").write_text("{}\n")
+        print(f"directories: {days * 25 + 3}, simulated latency: {latency_ms} ms")
+        for workers in (1, 4, 16):
+            files, elapsed = bench(root, workers)
+            print(
+                f"scan_workers={str(workers).ljust(4)} {files / elapsed:10.1f} files/s"
+            )
+
+        for dir_path, _, _ in os.walk(root):
+            # directories modified just before a scan are not cached
+            os.utime(dir_path, (1000, 1000))
+        cache = str(Path(tmp) / "scan.db")
+        files, elapsed = bench_rescan(root, cache)
+        print(f"scan_cache first scan {elapsed * 1000:10.1f} ms {files:6d} files")
+        (path / "new.json").write_text("{}\n")
+        files, elapsed = bench_rescan(root, cache)
+        print(f"scan_cache rescan     {elapsed * 1000:10.1f} ms {files:6d} files")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:4]))
@@ -1,8 +1,16 @@
+from datetime import datetime
 from lakeflush.core import Collector
 from typing import List
 
 from lakeflush.utils.logger import Logger
-from lakeflush.utils.file import FileProcessor, FileType, FileStore
+from lakeflush.utils.file import (
+    FileProcessor,
+    FileType,
+    FileStore,
+    FileOrder,
+    FileFilter,
+)
+from lakeflush.utils.prefetcher import Prefetcher
 from lakeflush.utils.file.reader import CSVFileReader, JSONFileReader
 
 
@@ -16,9 +24,38 @@ class LocalLakeCollector(Collector):
         match_patterns (List[str]): The list of patterns to match files in directory
             or lake, uses unix pattern style for eg: ["*.json"].
         batch_size (int): The size of batch to process files at once.
+        order (FileOrder): 'batch' orders files by modification time within a batch,
+            'global' orders all files oldest first using an external merge sort,
+            required with a checkpoint, see Collector (default = 'batch').
+        sort_run_size (int): For order 'global', files sorted in memory at once,
+            more are spilled to temporary files and merged (default = 1000000).
+        scan_workers (int): Number of directories scanned concurrently, for deep
+            partition trees on high latency mounts like NFS (default = 1).
+        scan_cache (str): SQLite file caching the directories scanned, a rerun
+            only lists directories changed since and collects files not seen
+            before, or failing to be read. Files modified in place are not
+            collected again (default = None).
+        min_age_secs (float): Skips files modified less than that many seconds
+            before a scan, eg: still written by a producer (default = 0).
+        modified_after (datetime): Skips files modified before (default = None).
+        modified_before (datetime): Skips files modified at or after
+            (default = None).
+        min_file_bytes (int): Skips files smaller, empty files are skipped by
+            default (default = 1).
+        max_file_mb (float): Skips files larger (default = None).
         csv_header (bool): For file_type csv, If True extracts header from first
             file and put in all collected, otherwise skips header. (default = False)
         log_file (bool): If True logs the name of file (default = False).
+        collect_batch_size (int): The number of records read from files collected
+            at once (default = 100).
+        passthrough (bool): If True, appends files as is without reading them in
+            Python, for json lines or text files. A newline is added when a file
+            does not end with one. Not supported with csv_header (default = False).
+        prefetch_workers (int): If > 0, reads the next files ahead on that many
+            threads while files are collected in order, for high latency mounts
+            like NFS. Not used in passthrough mode (default = 0).
+        prefetch_files (int): Maximum files read ahead (default = 16).
+        prefetch_mb (int): Maximum MB of files read ahead (default = 64).
         **kwargs: The parent class arguments. See Collector.
 
     Example:
@@ -32,10 +69,31 @@ class LocalLakeCollector(Collector):
         file_type: FileType = FileType.JSON,
         match_patterns: List[str] = [],
         batch_size: int = 1000,
+        order: FileOrder = FileOrder.BATCH,
+        sort_run_size: int = 1000000,
+        scan_workers: int = 1,
+        scan_cache: str = None,
+        min_age_secs: float = 0,
+        modified_after: datetime = None,
+        modified_before: datetime = None,
+        min_file_bytes: int = 1,
+        max_file_mb: float = None,
         csv_header: bool = False,
         log_file: bool = False,
+        collect_batch_size: int = 100,
+        passthrough: bool = False,
+        prefetch_workers: int = 0,
+        prefetch_files: int = 16,
+        prefetch_mb: int = 64,
         **kwargs,
     ):
+        # validated before the collector recovers its checkpoint
+        if kwargs.get("checkpoint"):
+            if FileOrder(order) != FileOrder.GLOBAL:
+                raise ValueError("checkpoint requires order 'global'.")
+            if file_type == FileType.CSV and csv_header:
+                raise ValueError("checkpoint is not supported with csv_header.")
+
         super().__init__(**kwargs)
 
         Logger.info("setup local-collector")
@@ -43,7 +101,23 @@ class LocalLakeCollector(Collector):
         if not root_dir:
             raise ValueError("root_dir is required.")
 
-        self.processor = FileProcessor(root_dir, match_patterns, batch_size)
+        file_filter = FileFilter(
+            min_age_secs,
+            modified_after,
+            modified_before,
+            min_file_bytes,
+            None if max_file_mb is None else int(max_file_mb * 1024 * 1024),
+        )
+        self.processor = FileProcessor(
+            root_dir,
+            match_patterns,
+            batch_size,
+            order,
+            sort_run_size,
+            scan_workers,
+            scan_cache,
+            file_filter,
+        )
 
         if not self.processor.root.exists():
             raise ValueError(f"Directory does not exist: {root_dir}")
@@ -51,25 +125,85 @@ class LocalLakeCollector(Collector):
         if not self.processor.root.is_dir():
             raise ValueError(f"Path is not a directory: {root_dir}")
 
+        if passthrough and file_type == FileType.CSV and csv_header:
+            raise ValueError("passthrough is not supported with csv_header.")
+
         if file_type == FileType.CSV:
             self.reader = CSVFileReader(csv_header)
         else:
             self.reader = JSONFileReader()
         self.log_file = log_file
+        self.collect_batch_size = collect_batch_size
+        self.passthrough = passthrough
+        self.prefetcher = None
+        if prefetch_workers > 0 and not passthrough:
+            self.prefetcher = Prefetcher(
+                self._fetch,
+                workers=prefetch_workers,
+                max_items=prefetch_files,
+                max_bytes=prefetch_mb * 1024 * 1024,
+                size=lambda f: f[1],
+            )
+
+    def _fetch(self, file: tuple) -> str:
+        """Reads a file ahead, from its (path, size, mtime)"""
+        return self.reader.fetch(file[0])
+
+    def _files(self):
+        """Yields matched files (path, mtime) not collected by a previous run, with
+        their content future when read ahead"""
+        files = self.processor.files()
+        if self.checkpoint:
+            files = (f for f in files if not self.checkpoint.skip(f[2], str(f[0])))
+        if self.prefetcher is None:
+            for file_path, size, mtime in files:
+                yield file_path, mtime, None
+            return
+
+        # read ahead in order, bounded by the size of the files in flight
+        for (file_path, size, mtime), prefetched in self.prefetcher.map(files):
+            yield file_path, mtime, prefetched
 
     def process_files_by_mtime(self):
         """Find matched files path, sorted by modification time."""
-        for file_path in iter(self.processor):
+        batch = []
+        checkpoint = self.checkpoint
+        for file_path, mtime, prefetched in self._files():
             if self.log_file:
                 Logger.info(f"processing file: {FileStore.basename(file_path)}")
+            skip = 0
+            if checkpoint:
+                checkpoint.start(mtime, str(file_path))
+                skip = checkpoint.skip_records(str(file_path))
             try:
+                if self.passthrough:
+                    if checkpoint:
+                        checkpoint.done()
+                    self.collect_file(file_path, self.mark())
+                    continue
+                content = prefetched.result() if prefetched else None
                 # read data from file reader
-                for data in self.reader.read(file_path):
-                    self.collect(data)
+                for data in self.reader.read(file_path, content):
+                    if skip:
+                        # collected by a previous run
+                        skip -= 1
+                        continue
+                    batch.append(data)
+                    if checkpoint:
+                        checkpoint.advance()
+                    if len(batch) >= self.collect_batch_size:
+                        self.collect_many(batch, self.mark())
+                        batch = []
             except (OSError, PermissionError):
                 Logger.warning(f"permission error while reading file: {file_path}")
+                self.processor.failed(file_path)
             except Exception as ex:
                 Logger.error(f"unexpected error: {str(ex)}")
+                self.processor.failed(file_path)
+            if checkpoint and not self.passthrough:
+                checkpoint.done()
+        if batch or checkpoint:
+            self.collect_many(batch, self.mark())
 
     def on_collected(self):
         """Callback after collection"""
@@ -80,3 +214,7 @@ class LocalLakeCollector(Collector):
         """Starts collector and processes files"""
         Logger.info("starting local-collector")
         self.process_files_by_mtime()
+        # write data still buffered by the collector
+        self.flush()
+        # files collected are not collected again by a rerun
+        self.processor.commit_scan()
@@ -1,11 +1,15 @@
-from lakeflush.core import Collector
+from datetime import datetime
+from lakeflush.core import Collector, FlushMode
 from typing import List
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 from lakeflush.utils.logger import Logger
-from lakeflush.utils.file import FileType
+from lakeflush.utils.file import FileType, FileOrder, FileFilter
 from lakeflush.utils.s3 import S3Processor, S3Store
 from lakeflush.utils.s3.reader import S3CSVFileReader, S3JSONFileReader
+from lakeflush.utils.s3.range_reader import S3RangeReader
+from lakeflush.utils.prefetcher import Prefetcher
 
 
 class S3LakeCollector(Collector):
@@ -19,9 +23,42 @@ class S3LakeCollector(Collector):
         match_patterns (List[str]): The list of patterns to match files in s3 data lake,
             uses unix pattern style for eg: ["*.json"].
         batch_size (int): The size of batch to process files at once.
+        order (FileOrder): 'batch' orders files by modification time within a batch,
+            'global' orders all files oldest first using an external merge sort,
+            required with a checkpoint, see Collector (default = 'batch').
+        sort_run_size (int): For order 'global', files sorted in memory at once,
+            more are spilled to temporary files and merged (default = 1000000).
+        min_age_secs (float): Skips files modified less than that many seconds
+            before a scan, eg: still written by a producer (default = 0).
+        modified_after (datetime): Skips files modified before (default = None).
+        modified_before (datetime): Skips files modified at or after
+            (default = None).
+        min_file_bytes (int): Skips files smaller, empty files are skipped by
+            default (default = 1).
+        max_file_mb (float): Skips files larger (default = None).
         csv_header (bool): For file_type csv, If True extracts header from first
             file and put in all collected, otherwise skips header. (default = False)
         log_file (bool): If True logs the name of file (default = False).
+        collect_batch_size (int): The number of records read from objects collected
+            at once (default = 100).
+        fetch_workers (int): If > 0, fetches the next objects concurrently on that
+            many threads while objects are collected in order (default = 0).
+        fetch_objects (int): Maximum objects fetched ahead (default = 16).
+        fetch_mb (int): Maximum MB of objects fetched ahead (default = 64).
+        range_cutoff_mb (int): If > 0, objects of at least that many MB are not
+            fetched whole but streamed in concurrent byte ranges (default = 0).
+        range_part_mb (int): MB of a byte range (default = 8).
+        range_workers (int): Number of byte ranges fetched concurrently, at most
+            twice as many are held in memory (default = 4).
+        list_workers (int): Number of prefixes listed concurrently, split on '/'
+            under prefix (default = 1).
+        list_checkpoint (str): File saving the listing progress, a stopped listing
+            resumes after the objects collected instead of the first key, not
+            supported with order 'global', see checkpoint. With buffer_size or a
+            flush_policy other than 'record', the collector is flushed before
+            objects are acknowledged (default = None).
+        client_kwargs (dict): Arguments of the boto3 s3 client, eg: endpoint_url of
+            a local s3 stand-in (default = None).
         **kwargs: The parent class arguments. See Collector.
 
     Example:
@@ -29,6 +66,8 @@ class S3LakeCollector(Collector):
         >>> s3_collector.start()
     """
 
+    collect_batch_bytes = 1024 * 1024
+
     def __init__(
         self,
         bucket: str,
@@ -37,10 +76,34 @@ class S3LakeCollector(Collector):
         file_type: FileType = FileType.JSON,
         match_patterns: List[str] = [],
         batch_size: int = 1000,
+        order: FileOrder = FileOrder.BATCH,
+        sort_run_size: int = 1000000,
+        min_age_secs: float = 0,
+        modified_after: datetime = None,
+        modified_before: datetime = None,
+        min_file_bytes: int = 1,
+        max_file_mb: float = None,
         csv_header: bool = False,
         log_file: bool = False,
+        collect_batch_size: int = 100,
+        fetch_workers: int = 0,
+        fetch_objects: int = 16,
+        fetch_mb: int = 64,
+        range_cutoff_mb: int = 0,
+        range_part_mb: int = 8,
+        range_workers: int = 4,
+        list_workers: int = 1,
+        list_checkpoint: str = None,
+        client_kwargs: dict = None,
         **kwargs,
     ):
+        # validated before the collector recovers its checkpoint
+        if kwargs.get("checkpoint"):
+            if FileOrder(order) != FileOrder.GLOBAL:
+                raise ValueError("checkpoint requires order 'global'.")
+            if file_type == FileType.CSV and csv_header:
+                raise ValueError("checkpoint is not supported with csv_header.")
+
         super().__init__(**kwargs)
 
         Logger.info("setup s3-collector")
@@ -48,38 +111,144 @@ class S3LakeCollector(Collector):
         if not bucket:
             raise ValueError("s3 bucket name is required.")
 
-        S3Store.setup()
+        client_kwargs = dict(client_kwargs or {})
+        connections = fetch_workers + list_workers
+        connections += range_workers if range_cutoff_mb > 0 else 0
+        if connections > 10 and "config" not in client_kwargs:
+            # a connection per fetch thread, boto3 pools 10 by default
+            client_kwargs["config"] = Config(max_pool_connections=connections)
+        S3Store.setup(**client_kwargs)
 
         if not S3Store.exists(bucket):
             raise ValueError(f"S3 bucket does not exist: {bucket}")
 
+        file_filter = FileFilter(
+            min_age_secs,
+            modified_after,
+            modified_before,
+            min_file_bytes,
+            None if max_file_mb is None else int(max_file_mb * 1024 * 1024),
+        )
         self.processor = S3Processor(
             bucket,
             prefix,
             s3_batchsize,
             match_patterns,
             batch_size,
+            list_workers,
+            list_checkpoint,
+            order,
+            sort_run_size,
+            file_filter,
         )
+        # records still buffered are written before their objects are acknowledged
+        self.flush_on_done = bool(list_checkpoint) and (
+            self.writer.buffer_size > 0
+            or self.writer.flush_policy.mode != FlushMode.RECORD
+        )
+
+        range_reader = None
+        if range_cutoff_mb > 0:
+            range_reader = S3RangeReader(
+                bucket,
+                cutoff=range_cutoff_mb * 1024 * 1024,
+                part_size=range_part_mb * 1024 * 1024,
+                workers=range_workers,
+                max_parts=range_workers * 2,
+            )
+        self.range_reader = range_reader
 
         if file_type == FileType.CSV:
-            self.reader = S3CSVFileReader(csv_header, bucket)
+            self.reader = S3CSVFileReader(csv_header, bucket, range_reader=range_reader)
         else:
-            self.reader = S3JSONFileReader(bucket)
+            self.reader = S3JSONFileReader(bucket, range_reader=range_reader)
         self.log_file = log_file
+        self.collect_batch_size = collect_batch_size
+        self.prefetcher = None
+        if fetch_workers > 0:
+            self.prefetcher = Prefetcher(
+                self._fetch,
+                workers=fetch_workers,
+                max_items=fetch_objects,
+                max_bytes=fetch_mb * 1024 * 1024,
+                size=lambda obj: 0 if self._ranged(obj[1]) else obj[1],
+            )
+
+    def _ranged(self, size: int) -> bool:
+        return self.range_reader is not None and self.range_reader.ranged(size)
+
+    def _fetch(self, obj: tuple) -> bytes | None:
+        """Fetches a s3 object ahead, objects read in ranges are streamed later"""
+        object_key, size, mtime = obj
+        if self._ranged(size):
+            return None
+        return self.reader.fetch(object_key)
+
+    def _objects(self):
+        """Yields matched s3 objects (key, size, mtime) not collected by a previous
+        run, with their content future when fetched ahead"""
+        objects = self.processor.objects()
+        if self.checkpoint:
+            objects = (o for o in objects if not self.checkpoint.skip(o[2], o[0]))
+        if self.prefetcher is None:
+            for object_key, size, mtime in objects:
+                yield object_key, size, mtime, None
+        else:
+            for (object_key, size, mtime), future in self.prefetcher.map(objects):
+                yield object_key, size, mtime, future
 
     def process_files_by_mtime(self):
         """Find matched s3 objects keys, sorted by modification time."""
-        for object_key in iter(self.processor):
+        batch, batch_bytes = [], 0
+        # objects read whole, done once their records are collected
+        read = []
+        checkpoint = self.checkpoint
+        for object_key, size, mtime, prefetched in self._objects():
             if self.log_file:
                 Logger.info(f"processing s3 object: {object_key}")
+            skip = 0
+            if checkpoint:
+                checkpoint.start(mtime, object_key)
+                skip = checkpoint.skip_records(object_key)
             try:
+                content = prefetched.result() if prefetched else None
                 # read data from s3 object reader
-                for data in self.reader.read(object_key):
-                    self.collect(data)
+                for data in self.reader.read(object_key, content, size):
+                    if skip:
+                        # collected by a previous run
+                        skip -= 1
+                        continue
+                    batch.append(data)
+                    batch_bytes += len(data)
+                    if checkpoint:
+                        checkpoint.advance()
+                    # large objects stream blocks of MBs, bound the batch bytes
+                    if (
+                        len(batch) >= self.collect_batch_size
+                        or batch_bytes >= self.collect_batch_bytes
+                    ):
+                        self.collect_many(batch, self.mark())
+                        batch, batch_bytes = [], 0
+                        self._done(read)
             except ClientError as ex:
                 Logger.error(f"s3_client error: {ex}")
             except Exception as ex:
                 Logger.error(f"unexpected error: {str(ex)}")
+            if checkpoint:
+                checkpoint.done()
+            read.append(object_key)
+        if batch or checkpoint:
+            self.collect_many(batch, self.mark())
+        self._done(read)
+
+    def _done(self, object_keys: List[str]) -> None:
+        """Acknowledges objects collected to the listing, once their records are
+        written"""
+        if object_keys and self.flush_on_done:
+            self.flush()
+        for object_key in object_keys:
+            self.processor.done(object_key)
+        object_keys.clear()
 
     def on_collected(self):
         """Callback after collection"""
@@ -90,3 +259,5 @@ class S3LakeCollector(Collector):
         """Starts collector and processes files from s3"""
         Logger.info("starting s3-collector")
         self.process_files_by_mtime()
+        # write data still buffered by the collector
+        self.flush()
@@ -1,2 +1,6 @@
 from lakeflush.core.collector import Collector
+from lakeflush.core.checkpoint import Checkpoint
+from lakeflush.core.routing_collector import RoutingCollector
 from lakeflush.core.flusher import Flusher
+from lakeflush.core.flush_policy import FlushPolicy, FlushMode
+from lakeflush.core.codec import Codec, get_codec, register_codec, available_codecs
@@ -0,0 +1,530 @@
+import os
+import glob
+import errno
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+from lakeflush.core.codec import Codec
+from lakeflush.core.flush_policy import FlushPolicy
+from lakeflush.core.parallel_compressor import ParallelCompressor
+
+IOV_MAX = os.sysconf("SC_IOV_MAX") if hasattr(os, "sysconf") else 1024
+COPY_CHUNK_SIZE = 1024 * 1024
+# errors of zero-copy syscalls not supported between two files
+COPY_UNSUPPORTED = (errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP)
+
+
+def writev(fd: int, buffers: list) -> int:
+    """Writes all buffers to the file descriptor, batching them into as few
+    syscalls as possible. Falls back to a single joined write where os.writev
+    is not available.
+
+    Returns:
+        int: Total number of bytes written.
+    """
+    if not hasattr(os, "writev"):
+        data = b"".join(buffers)
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+        return len(data)
+
+    total = 0
+    buffers = list(buffers)
+    while buffers:
+        batch = buffers[:IOV_MAX]
+        expected = sum(len(b) for b in batch)
+        written = os.writev(fd, batch)
+        total += written
+        if written == expected:
+            del buffers[: len(batch)]
+            continue
+        # partial write, drop fully written buffers and retry the remainder
+        while written:
+            size = len(buffers[0])
+            if written >= size:
+                written -= size
+                buffers.pop(0)
+            else:
+                buffers[0] = memoryview(buffers[0])[written:]
+                written = 0
+    return total
+
+
+def copy_range(src_fd: int, dst_fd: int, count: int, offset: int) -> int:
+    """Copies count bytes from the start of src_fd to offset of dst_fd in kernel
+    space with os.copy_file_range or os.sendfile. Falls back to copying chunks
+    with os.pread and os.pwrite where neither is supported between the files.
+
+    Returns:
+        int: Number of bytes copied, less than count if src_fd is shorter.
+    """
+    copied = 0
+    if hasattr(os, "copy_file_range"):
+        try:
+            while copied < count:
+                n = os.copy_file_range(
+                    src_fd, dst_fd, count - copied, copied, offset + copied
+                )
+                if not n:
+                    return copied
+                copied += n
+            return copied
+        except OSError as ex:
+            if ex.errno not in COPY_UNSUPPORTED:
+                raise
+
+    if hasattr(os, "sendfile"):
+        try:
+            # sendfile writes at the file position of dst_fd
+            os.lseek(dst_fd, offset + copied, os.SEEK_SET)
+            while copied < count:
+                n = os.sendfile(dst_fd, src_fd, copied, count - copied)
+                if not n:
+                    return copied
+                copied += n
+            return copied
+        except OSError as ex:
+            if ex.errno not in COPY_UNSUPPORTED:
+                raise
+
+    while copied < count:
+        chunk = os.pread(src_fd, min(COPY_CHUNK_SIZE, count - copied), copied)
+        if not chunk:
+            break
+        view = memoryview(chunk)
+        while view:
+            written = os.pwrite(dst_fd, view, offset + copied)
+            view = view[written:]
+            copied += written
+    return copied
+
+
+class Bundle:
+    """An open bundle file written by BundleWriter, holds the file descriptor and
+    the compressor stream of the bundle.
+
+    Args:
+        path (str): Path to the bundle file, opened in append mode.
+        codec (Codec): Compresses the bundle with the codec (default None).
+        executor (Executor): If provided, compresses blocks in parallel on it.
+        max_pending (int): Maximum blocks in flight for parallel compression.
+    """
+
+    def __init__(self, path: str, codec: Codec = None, executor=None, max_pending=4):
+        self.path = path
+        self.fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        stat = os.fstat(self.fd)
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        self.compressor = None
+        # a reopened bundle gets a new member of the codec
+        if codec and executor:
+            self.compressor = ParallelCompressor(
+                codec, executor, max_pending=max_pending
+            )
+        elif codec:
+            self.compressor = codec.compressor()
+        self.compressed_input = 0
+        self.synced_input = 0
+        # zero-copy syscalls refuse O_APPEND descriptors, copies use another one
+        self._copy_fd = None
+
+    def write(self, buffers: list, sync: bool) -> bool:
+        """Writes buffers into the bundle, sync forces compressed data out of the
+        compressor so the bundle is readable up to the last record.
+
+        Returns:
+            bool: True if compressed data was synced, False otherwise.
+        """
+        synced = False
+        if self.compressor is not None:
+            out = []
+            for buffer in buffers:
+                self.compressed_input += len(buffer)
+                chunk = self.compressor.compress(buffer)
+                if chunk:
+                    out.append(chunk)
+            if sync and self.compressed_input > self.synced_input:
+                out.append(self.compressor.flush())
+                self.synced_input = self.compressed_input
+                synced = True
+            buffers = out
+        if buffers:
+            self.size += writev(self.fd, buffers)
+        return synced
+
+    def copy(self, src_fd: int, count: int) -> int:
+        """Appends count bytes of src_fd to the uncompressed bundle without
+        copying them through Python.
+
+        Returns:
+            int: Number of bytes copied.
+        """
+        if self._copy_fd is None:
+            self._copy_fd = os.open(self.path, os.O_WRONLY)
+        copied = copy_range(src_fd, self._copy_fd, count, self.size)
+        self.size += copied
+        return copied
+
+    def close(self, fsync: bool = False) -> None:
+        """Finishes compression and closes the bundle."""
+        if self.compressor is not None and self.compressed_input:
+            self.size += writev(self.fd, [self.compressor.finish()])
+        self.compressor = None
+        if self._copy_fd is not None:
+            os.close(self._copy_fd)
+            self._copy_fd = None
+        if fsync:
+            os.fsync(self.fd)
+        os.close(self.fd)
+        self.fd = None
+
+
+class BundleWriter:
+    """Writes collected data directly into bundle files and rotates them based on
+    both size and time thresholds.
+
+    Records are encoded once, buffered in memory and written with a single
+    os.writev call per flush, without going through the logging machinery.
+    Rotation occurs when EITHER the size limit or time interval is exceeded.
+
+    With max_pending_bundles > 0 a rotated bundle is finalized in background: it is
+    moved aside under a '.rotating' name and writing continues in a fresh bundle
+    at once, while its last data, compression trailer, fsync, close and rename by
+    namer happen on a finalizer thread. Bundles are finalized in rotation order.
+
+    Args:
+        filename (str): Path to the in progress bundle file.
+        max_bytes (int): Maximum bundle size in bytes before rotation (0 = no limit).
+        interval (float): Time in seconds between rotations, fractions allowed
+            (0 = no time limit).
+        buffer_size (int): Bytes buffered in memory before writing to the bundle,
+            0 writes on every record (default 0).
+        codec (Codec): Compresses the bundle on the fly with the codec, its
+            extension is added to filename (default None = no compression).
+        compress_workers (int): If > 1, compresses blocks of the bundle on a thread
+            pool into concatenated codec members, works best with a large
+            buffer_size and a flush policy other than every record (default 1).
+        flush_policy (FlushPolicy): When compressed data is flushed to the bundle,
+            see FlushPolicy for the durability trade-off (default every record).
+        max_pending_bundles (int): Maximum rotated bundles being finalized in
+            background, rotation waits when reached (default 0 = rotate inline).
+        fsync (bool): If True, fsyncs a bundle before it is renamed (default False).
+        namer (callable): Returns the rotated bundle path from the default path.
+        rotation_callback (callable): Called after a new bundle is opened.
+        finalize_callback (callable): Called with the rotated bundle path once it is
+            closed and renamed, on the finalizer thread in background mode.
+        commit_callback (callable): Called with the mark of the last data written
+            into a rotated bundle, the path it is renamed to and its current path,
+            once it is closed and before it is renamed, eg: to commit a checkpoint.
+
+    Example:
+        >>> writer = BundleWriter(
+        ...     'data.lakeflush.inprogress',
+        ...     max_bytes=10*1024*1024,  # 10 MB
+        ...     interval=30 * 60,        # Every 30 mins
+        ...     buffer_size=64 * 1024,   # 64 KB
+        ... )
+        >>> writer.write("data")
+        >>> writer.close()
+    """
+
+    terminator = b"\n"
+    rotating_suffix = ".rotating"
+
+    def __init__(
+        self,
+        filename: str,
+        max_bytes: int = 1024 * 1024,
+        interval: int = 60,
+        buffer_size: int = 0,
+        codec: Codec = None,
+        compress_workers: int = 1,
+        flush_policy: FlushPolicy = None,
+        max_pending_bundles: int = 0,
+        fsync: bool = False,
+        namer=None,
+        rotation_callback=None,
+        finalize_callback=None,
+        commit_callback=None,
+    ):
+        filename = str(filename)
+        if codec and not filename.endswith(codec.extension):
+            filename = f"{filename}{codec.extension}"
+        self.filename = filename
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.buffer_size = buffer_size
+        self.codec = codec
+        self.compress = codec is not None
+        self.compress_workers = compress_workers
+        self._executor = None
+        if self.compress and compress_workers > 1:
+            self._executor = ThreadPoolExecutor(
+                compress_workers, thread_name_prefix="lakeflush-compress"
+            )
+        self.flush_policy = flush_policy or FlushPolicy()
+        self.fsync = fsync
+        self.namer = namer
+        self.rotation_callback = rotation_callback
+        self.finalize_callback = finalize_callback
+        self.commit_callback = commit_callback
+        # opaque position of the last data written, eg: of its source
+        self.mark = None
+        self._finalizer = None
+        self._finalizing = None
+        self._finalize_error = None
+        if max_pending_bundles > 0:
+            self._finalizer = ThreadPoolExecutor(
+                1, thread_name_prefix="lakeflush-finalize"
+            )
+            self._finalizing = threading.BoundedSemaphore(max_pending_bundles)
+        self.encoding = "utf-8"
+        # guards writes against rotation from other threads, eg: idle timer
+        self._lock = threading.RLock()
+        self.rollover_at = 0
+        self._pending = []
+        self._pending_bytes = 0
+        self._bundle = None
+        self._recover()
+        self._open()
+
+    @property
+    def size(self) -> int:
+        """Size of the current bundle, including buffered records if uncompressed."""
+        if self.compress:
+            return self._bundle.size
+        return self._bundle.size + self._pending_bytes
+
+    def _open(self):
+        """Opens the in progress bundle in append mode and seeds its size."""
+        self._bundle = Bundle(
+            self.filename,
+            self.codec,
+            self._executor,
+            max_pending=self.compress_workers * 2,
+        )
+        # continue the time window of a bundle left over by a previous run
+        start = self._bundle.mtime if self._bundle.size else time.time()
+        self.rollover_at = start + self.interval
+        self.flush_policy.reset()
+
+    def _recover(self):
+        """Renames bundles left rotating by a previous run, so data is not lost."""
+        pattern = f"{glob.escape(self.filename)}.*{self.rotating_suffix}"
+        for path in sorted(glob.glob(pattern), key=os.path.getmtime):
+            os.rename(path, self.rotation_filename())
+
+    def _encode(self, data) -> bytes:
+        if isinstance(data, str):
+            return data.encode(self.encoding)
+        return data
+
+    def should_rollover(self, nbytes: int = 0) -> bool:
+        """Determine if rollover should occur before writing nbytes.
+
+        Args:
+            nbytes (int): Size of the data about to be written.
+
+        Returns:
+            bool: True if rollover should occur, False otherwise.
+        """
+        # Size-based check, compressed size is only known after writing
+        size = self.size
+        if self.max_bytes > 0 and size > 0:
+            if self.compress:
+                nbytes = 0
+            if size + nbytes >= self.max_bytes:
+                return True
+        # Time-based check
+        return self.interval > 0 and time.time() >= self.rollover_at
+
+    def write(self, data: str | bytes, mark=None) -> None:
+        """Writes a record followed by the terminator into the bundle, mark is
+        the position of the record kept as the writer mark if given."""
+        data = self._encode(data)
+        with self._lock:
+            self._append(data, mark)
+
+    def write_many(self, records: Iterable[str | bytes], mark=None) -> None:
+        """Writes a batch of records, each followed by the terminator, into the
+        bundle. Rotation is checked once for the whole batch."""
+        records = [self._encode(data) for data in records]
+        if records:
+            # one joined buffer keeps a batch of tiny records in a single iovec
+            data = self.terminator.join(records)
+            with self._lock:
+                self._append(data, mark)
+        elif mark is not None:
+            with self._lock:
+                self.mark = mark
+
+    def write_file(self, path: str, mark=None) -> int:
+        """Appends the content of a file into the bundle as records, without
+        decoding or copying it through Python when the bundle is uncompressed.
+        The terminator is added only when the file does not end with one.
+
+        Returns:
+            int: Number of bytes appended from the file.
+        """
+        with open(path, "rb") as src:
+            nbytes = os.fstat(src.fileno()).st_size
+            if not nbytes:
+                if mark is not None:
+                    with self._lock:
+                        self.mark = mark
+                return 0
+            if self.compress:
+                # compressor needs the bytes, still never decoded
+                data = src.read()
+                if data.endswith(self.terminator):
+                    data = data[: -len(self.terminator)]
+                with self._lock:
+                    self._append(data, mark)
+                return len(data)
+
+            with self._lock:
+                if self.should_rollover(nbytes):
+                    self.do_rollover()
+                # buffered records were collected first
+                self._write_pending(sync=False)
+                copied = self._bundle.copy(src.fileno(), nbytes)
+                if mark is not None:
+                    # an emptied file is collected too
+                    self.mark = mark
+                if not copied:
+                    return 0
+                size = len(self.terminator)
+                if os.pread(src.fileno(), size, copied - size) != self.terminator:
+                    self._bundle.write([self.terminator], sync=False)
+                if self.max_bytes > 0 and self.size >= self.max_bytes:
+                    self.do_rollover()
+                return copied
+
+    def _append(self, data: bytes, mark=None) -> None:
+        """Buffers data followed by the terminator and rotates when required."""
+        nbytes = len(data) + len(self.terminator)
+        if self.should_rollover(nbytes):
+            self.do_rollover()
+        self._pending.append(data)
+        self._pending.append(self.terminator)
+        self._pending_bytes += nbytes
+        if mark is not None:
+            self.mark = mark
+        if self._pending_bytes >= self.buffer_size:
+            self._write_pending(self.flush_policy.should_flush(self._pending_bytes))
+            if self.max_bytes > 0 and self.size >= self.max_bytes:
+                self.do_rollover()
+
+    def flush(self) -> None:
+        """Writes all buffered records into the bundle, compressed data included."""
+        with self._lock:
+            self._write_pending(sync=True)
+
+    def _take_pending(self) -> list:
+        """Returns the buffered records and empties the buffer."""
+        buffers = self._pending
+        self._pending = []
+        self._pending_bytes = 0
+        return buffers
+
+    def _write_pending(self, sync: bool) -> None:
+        """Writes buffered records, sync forces compressed data out of the
+        compressor so the bundle is readable up to the last record."""
+        if self._bundle.write(self._take_pending(), sync):
+            self.flush_policy.reset()
+
+    def rotation_filename(self) -> str:
+        """Returns the path the current bundle is renamed to on rotation."""
+        default_name = f"{self.filename}.{time.strftime('%Y-%m-%d_%H-%M-%S')}"
+        if self.namer:
+            return self.namer(default_name)
+        return default_name
+
+    def _finalize(self, bundle: Bundle, buffers: list, mark=None) -> str:
+        """Writes the last records of a rotated bundle, closes and renames it."""
+        bundle.write(buffers, sync=False)
+        bundle.close(self.fsync)
+        file_path = self.rotation_filename()
+        if self.commit_callback and mark is not None:
+            self.commit_callback(mark, file_path, bundle.path)
+        os.rename(bundle.path, file_path)
+        if self.finalize_callback:
+            self.finalize_callback(file_path)
+        return file_path
+
+    def _finalized(self, future) -> None:
+        """Releases a background finalization slot and keeps its error."""
+        self._finalizing.release()
+        if future.exception() is not None:
+            self._finalize_error = future.exception()
+
+    def _raise_finalize_error(self) -> None:
+        """Raises the error of a failed background finalization in the caller."""
+        if self._finalize_error is not None:
+            error, self._finalize_error = self._finalize_error, None
+            raise error
+
+    @property
+    def empty(self) -> bool:
+        """Checks if nothing was written into the current bundle."""
+        bundle = self._bundle
+        return not (bundle.size or bundle.compressed_input or self._pending)
+
+    def rollover_if_due(self) -> bool:
+        """Rotates the bundle if its time interval expired and it is not empty,
+        an empty bundle starts a new time interval instead.
+
+        Returns:
+            bool: True if rollover occurred, False otherwise.
+        """
+        with self._lock:
+            if self.interval <= 0 or time.time() < self.rollover_at:
+                return False
+            if self.empty:
+                self.rollover_at = time.time() + self.interval
+                return False
+            self.do_rollover()
+            return True
+
+    def do_rollover(self) -> None:
+        """Closes the current bundle, renames it and opens a new one."""
+        with self._lock:
+            self._do_rollover()
+
+    def _do_rollover(self) -> None:
+        bundle, buffers = self._bundle, self._take_pending()
+        if self._finalizer:
+            self._raise_finalize_error()
+            # bound the bundles in flight, waits for the oldest one
+            self._finalizing.acquire()
+            # free the in progress name, the rest happens off the hot path
+            bundle.path = f"{self.filename}.{uuid.uuid4().hex}{self.rotating_suffix}"
+            os.rename(self.filename, bundle.path)
+            self._open()
+            future = self._finalizer.submit(self._finalize, bundle, buffers, self.mark)
+            future.add_done_callback(self._finalized)
+        else:
+            self._finalize(bundle, buffers, self.mark)
+            self._open()
+
+        if self.rotation_callback:
+            self.rotation_callback()
+
+    def close(self) -> None:
+        """Flushes buffered records and closes the bundle without rotating, waits
+        for rotated bundles being finalized in background."""
+        with self._lock:
+            if self._bundle.fd is not None:
+                self._bundle.write(self._take_pending(), sync=False)
+                self._bundle.close(self.fsync)
+        if self._finalizer:
+            self._finalizer.shutdown()
+            self._finalizer = None
+        if self._executor:
+            self._executor.shutdown()
+            self._executor = None
+        self._raise_finalize_error()
@@ -0,0 +1,130 @@
+import os
+import glob
+from typing import List, Tuple
+from lakeflush.core.bundle_writer import BundleWriter
+from lakeflush.utils.logger import Logger
+from lakeflush.utils.metastore import SQLiteMetastore
+
+
+class Checkpoint:
+    """Tracks the sources collected into durable bundles in a SQLiteMetastore, so
+    a restarted collector resumes where the last durable bundle ended.
+
+    Sources must be collected in modification time order. The position is an mtime
+    watermark, the keys collected at the watermark and the records already
+    collected of a source in progress. A position is handed to the writer with the
+    records it ends, and committed with the bundle it ends in once the bundle is
+    closed and before it is renamed. A clean close commits the size of the in
+    progress bundle too.
+
+    On start recover() completes a rename interrupted after its commit, removes
+    bundles rotated but not committed and truncates the in progress bundle to its
+    committed size. Sources after the position are collected again, and sources
+    modified before the watermark after it was committed are never collected.
+
+    Args:
+        db_path (str): The SQLite file of the checkpoints.
+        name (str): Name of the checkpoint, eg: the in progress bundle path.
+
+    Example:
+        >>> checkpoint = Checkpoint("checkpoint.db", "data.lakeflush.inprogress")
+        >>> if not checkpoint.skip(mtime, key):
+        ...     checkpoint.start(mtime, key)
+        ...     for data in read(key):
+        ...         checkpoint.advance()
+        ...         writer.write(data, mark=checkpoint.mark())
+        ...     checkpoint.done()
+    """
+
+    KEY_PREFIX = "checkpoint:"
+
+    def __init__(self, db_path: str, name: str):
+        self.metastore = SQLiteMetastore(db_path)
+        self.key = f"{self.KEY_PREFIX}{name}"
+        self.state = self.metastore.get_metadata(self.key) or {}
+        # position committed by the previous run
+        self.watermark = self.state.get("mtime")
+        self.keys = set(self.state.get("keys", []))
+        self.partial = self.state.get("partial")
+        # position of this run, keys are only appended until the watermark moves
+        self._mtime = self.watermark
+        self._keys: List[str] = list(self.state.get("keys", []))
+        self._current: Tuple[float, str] = None
+        self._records = 0
+
+    def recover(self, filename: str) -> None:
+        """Restores the in progress bundle filename to its committed state"""
+        if not self.state:
+            # first run, data already in progress is kept by a crash
+            offset = os.path.getsize(filename) if os.path.exists(filename) else 0
+            self.commit(self.mark(), offset=offset)
+            return
+        bundle, rotating = self.state.get("bundle"), self.state.get("rotating")
+        if bundle and rotating and os.path.exists(rotating):
+            if not os.path.exists(bundle):
+                # committed, the rename did not happen
+                Logger.info(f"recovering committed bundle {os.path.basename(bundle)}")
+                os.rename(rotating, bundle)
+        pattern = f"{glob.escape(filename)}.*{BundleWriter.rotating_suffix}"
+        for path in glob.glob(pattern):
+            # rotated but never committed, its sources are collected again
+            Logger.warning(f"removing uncommitted bundle {os.path.basename(path)}")
+            os.remove(path)
+        offset = self.state.get("offset", 0)
+        if os.path.exists(filename) and os.path.getsize(filename) > offset:
+            Logger.warning(f"truncating {os.path.basename(filename)} to {offset} bytes")
+            os.truncate(filename, offset)
+
+    def skip(self, mtime: float, key: str) -> bool:
+        """Check if a source was collected by a previous run"""
+        if self.watermark is None:
+            return False
+        return mtime < self.watermark or (mtime == self.watermark and key in self.keys)
+
+    def skip_records(self, key: str) -> int:
+        """Returns the records of a source collected by a previous run"""
+        if self.partial and self.partial[0] == key:
+            return self.partial[1]
+        return 0
+
+    def start(self, mtime: float, key: str) -> None:
+        """Starts collecting a source"""
+        self._current = (mtime, key)
+        self._records = self.skip_records(key)
+
+    def advance(self, records: int = 1) -> None:
+        """Counts records of the current source passed to the writer"""
+        self._records += records
+
+    def done(self) -> None:
+        """Ends the current source, all its records are passed to the writer"""
+        mtime, key = self._current
+        if mtime != self._mtime:
+            # a new list, marks taken before keep the previous one
+            self._mtime, self._keys = mtime, []
+        self._keys.append(key)
+        self._current, self._records = None, 0
+
+    def mark(self) -> tuple:
+        """Returns the current position, cheap to take for every write"""
+        partial = None
+        if self._current is not None and self._records:
+            partial = (self._current[1], self._records)
+        return self._mtime, self._keys, len(self._keys), partial
+
+    def commit(
+        self, mark: tuple, bundle: str = None, rotating: str = None, offset: int = 0
+    ) -> None:
+        """Commits a position with the bundle it ends in, or the size of the in
+        progress bundle on close"""
+        mtime, keys, count, partial = mark
+        state = dict(
+            mtime=mtime,
+            keys=keys[:count],
+            partial=partial,
+            bundle=bundle,
+            rotating=rotating,
+            offset=offset,
+        )
+        self.metastore.set_metadata(self.key, state)
+        self.state = state
@@ -0,0 +1,194 @@
+import bz2
+import lzma
+import zlib
+from typing import Dict, List, Type
+
+
+class StreamCompressor:
+    """A compressor stream of a codec.
+
+    Args:
+        codec (Codec): The codec creating the stream.
+    """
+
+    def __init__(self, codec: "Codec"):
+        self.codec = codec
+        self._compressor = codec.compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        """Compresses data, returns the compressed output available."""
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """Forces all data compressed so far out, so the output is readable up to
+        it. Codecs without a sync flush end the stream and start a new one."""
+        out = self._compressor.flush()
+        self._compressor = self.codec.compressobj()
+        return out
+
+    def finish(self) -> bytes:
+        """Ends the stream and returns the remaining compressed output."""
+        return self._compressor.flush()
+
+
+class ZlibStreamCompressor(StreamCompressor):
+    """A zlib compressor stream supporting sync flush."""
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class Codec:
+    """A compression codec to write bundles.
+
+    Concatenated outputs of a codec must form a valid compressed file, so a
+    bundle can be reopened or compressed in parallel blocks.
+
+    Args:
+        level (int): The compression level, codec default when None.
+    """
+
+    name = ""
+    extension = ""
+    content_type = "application/octet-stream"
+    levels = range(0)
+    default_level = 0
+    stream_compressor = StreamCompressor
+
+    def __init__(self, level: int = None):
+        if level is None:
+            level = self.default_level
+        if level not in self.levels:
+            raise ValueError(
+                f"{self.name} level should be between "
+                f"{self.levels.start} and {self.levels.stop - 1}."
+            )
+        self.level = level
+
+    @classmethod
+    def available(cls) -> bool:
+        """Checks if codec can be used"""
+        return True
+
+    def compressobj(self):
+        """Returns a new compressor object of the codec"""
+        raise NotImplementedError
+
+    def compressor(self) -> StreamCompressor:
+        """Returns a new compressor stream"""
+        return self.stream_compressor(self)
+
+    def compress_block(self, data: bytes) -> bytes:
+        """Compresses data into a complete, independently readable stream"""
+        compressor = self.compressor()
+        return compressor.compress(data) + compressor.finish()
+
+
+__CODECS__: Dict[str, Type[Codec]] = {}
+
+
+def register_codec(codec: Type[Codec]) -> Type[Codec]:
+    """Registers a codec by its name, can be used as class decorator"""
+    __CODECS__[codec.name] = codec
+    return codec
+
+
+def get_codec(name: str, level: int = None) -> Codec:
+    """Returns the registered codec by name with the compression level"""
+    if name not in __CODECS__:
+        raise ValueError(f"unknown codec: {name}, available: {available_codecs()}")
+    codec = __CODECS__[name]
+    if not codec.available():
+        raise ValueError(f"codec {name} is not available, install its library.")
+    return codec(level)
+
+
+def codec_for(filename: str) -> Codec | None:
+    """Returns the codec of a file using its extension"""
+    for codec in __CODECS__.values():
+        if filename.endswith(codec.extension) and codec.available():
+            return codec()
+    return None
+
+
+def available_codecs() -> List[str]:
+    """Returns names of codecs which can be used"""
+    return [name for name, codec in __CODECS__.items() if codec.available()]
+
+
+@register_codec
+class GzipCodec(Codec):
+    name = "gzip"
+    extension = ".gz"
+    content_type = "application/gzip"
+    levels = range(0, 10)
+    default_level = 6
+    stream_compressor = ZlibStreamCompressor
+
+    def compressobj(self):
+        # wbits=31 writes a gzip member
+        return zlib.compressobj(self.level, zlib.DEFLATED, 31)
+
+
+@register_codec
+class Bz2Codec(Codec):
+    name = "bz2"
+    extension = ".bz2"
+    content_type = "application/x-bzip2"
+    levels = range(1, 10)
+    default_level = 9
+
+    def compressobj(self):
+        return bz2.BZ2Compressor(self.level)
+
+
+@register_codec
+class LzmaCodec(Codec):
+    name = "lzma"
+    extension = ".xz"
+    content_type = "application/x-xz"
+    levels = range(0, 10)
+    default_level = 6
+
+    def compressobj(self):
+        return lzma.LZMACompressor(lzma.FORMAT_XZ, preset=self.level)
+
+
+class ZstdStreamCompressor(StreamCompressor):
+    """A zstandard compressor stream supporting block flush."""
+
+    def flush(self) -> bytes:
+        import zstandard
+
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        import zstandard
+
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+@register_codec
+class ZstdCodec(Codec):
+    name = "zstd"
+    extension = ".zst"
+    content_type = "application/zstd"
+    levels = range(1, 23)
+    default_level = 3
+    stream_compressor = ZstdStreamCompressor
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def compressobj(self):
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=self.level).compressobj()
@@ -1,8 +1,13 @@
-import logging
+import os
 import uuid
 import time
-from lakeflush.core.file_handler import SizedTimedRotatingFileHandler
-from lakeflush.core.gzipfile_handler import GzipSizedTimedRotatingFileHandler
+import threading
+from typing import Iterable
+from lakeflush.core.bundle_writer import BundleWriter
+from lakeflush.core.checkpoint import Checkpoint
+from lakeflush.core.codec import get_codec
+from lakeflush.core.flush_policy import FlushPolicy
+from lakeflush.core.flusher import Flusher
 from lakeflush.utils.logger import Logger
 from lakeflush.utils.file import FileStore, FileStatus
 from lakeflush.utils.metadata import MetaDataStore
@@ -15,13 +20,40 @@ class Collector:
         filepath (str): Path to the file.
         filename (str): Name to the file.
         max_size_mb (int): Maximum file size in MB before rotation, default (1 MB).
-        max_time_mins (int): Maximum time in min before rotation, default (1 min).
-        compress (bool): Compresses file to gzip, default (10000).
+        max_time_mins (float): Maximum time in min before rotation, fractions allow
+            sub-minute rotation, default (1 min).
+        compress (bool): Compresses file using codec, default (False).
+        codec (str): The registered compression codec, 'gzip', 'bz2', 'lzma' or
+            'zstd' when zstandard is installed, implies compress, default (gzip).
+        compresslevel (int): The compression level of codec, default (codec default).
+        compress_workers (int): Number of threads compressing blocks of the file in
+            parallel as concatenated codec members, default (1).
+        buffer_size (int): Bytes buffered in memory before writing to the file,
+            0 writes on every collect, default (0).
+        flush_policy (FlushPolicy): When compressed data is flushed to the file,
+            see FlushPolicy for the durability trade-off, default (every record).
+        max_pending_bundles (int): Maximum rotated files closed, fsynced and renamed
+            in background while collection continues in a new file, rotation waits
+            when reached, default (0 = rotate inline).
+        fsync (bool): If True, fsyncs a rotated file before it is renamed to
+            collected, default (False).
+        idle_rotation (bool): If True, a background timer rotates a non empty file
+            once max_time_mins expired even when nothing is collected, bounding the
+            latency of collected data, default (False = checked on collect).
+        checkpoint (str): SQLite file of a Checkpoint committed with every rotated
+            bundle and on close, a restart truncates the in progress file to its
+            committed size and lake collectors resume after the collected sources,
+            requires fsync, so a commit never points past data lost on a power
+            loss, default (None).
+        flusher (Flusher): A flusher of filepath in the same process, collected
+            files are submitted to its workers once renamed, without filesystem
+            events, rotation waits while its queue is full, default (None).
 
     Example:
         >>> collector = Collector(filepath, filename)
         >>> collector.start()
         >>> collector.collect(data)
+        >>> collector.collect_many([data1, data2])
     """
 
     def __init__(
@@ -29,8 +61,18 @@ class Collector:
         filepath: str,
         filename: str,
         max_size_mb: int = 1,
-        max_time_mins: int = 1,
+        max_time_mins: float = 1,
         compress: bool = False,
+        codec: str = None,
+        compresslevel: int = None,
+        compress_workers: int = 1,
+        buffer_size: int = 0,
+        flush_policy: FlushPolicy = None,
+        max_pending_bundles: int = 0,
+        fsync: bool = False,
+        idle_rotation: bool = False,
+        checkpoint: str = None,
+        flusher: Flusher = None,
     ):
         if not filepath or not filename:
             raise ValueError("filepath and filename is required.")
@@ -41,43 +83,82 @@ class Collector:
         if max_size_mb < 1:
             raise ValueError("max_size_mb cannot be less than 1.")
 
-        if max_time_mins < 1:
-            raise ValueError("max_time_mins cannot be less than 1.")
+        if max_time_mins <= 0:
+            raise ValueError("max_time_mins should be greater than 0.")
+
+        if compress_workers < 1:
+            raise ValueError("compress_workers cannot be less than 1.")
+
+        if buffer_size < 0:
+            raise ValueError("buffer_size cannot be less than 0.")
+
+        if max_pending_bundles < 0:
+            raise ValueError("max_pending_bundles cannot be less than 0.")
+
+        if checkpoint and not fsync:
+            raise ValueError("checkpoint requires fsync.")
+
+        if flusher and os.path.realpath(flusher.path) != os.path.realpath(filepath):
+            raise ValueError("flusher should flush the files of filepath.")
 
         # Setup
+        self._setup()
+
+        self.path = filepath
+        self.name = filename
+        self.codec = None
+        if compress or codec:
+            self.codec = get_codec(codec or "gzip", compresslevel)
+        self.compress = self.codec is not None
+        self.flusher = flusher
+
+        filename = FileStore.format(self.path, self.name, FileStatus.INPROGRESS)
+        if self.codec:
+            filename = f"{filename}{self.codec.extension}"
+        self.checkpoint = None
+        if checkpoint:
+            self.checkpoint = Checkpoint(checkpoint, filename)
+            # before the writer recovers and appends to the in progress file
+            self.checkpoint.recover(filename)
+
+        self.writer = BundleWriter(
+            filename,
+            max_bytes=max_size_mb * 1024 * 1024,
+            interval=max_time_mins * 60,
+            buffer_size=buffer_size,
+            codec=self.codec,
+            compress_workers=compress_workers,
+            flush_policy=flush_policy,
+            max_pending_bundles=max_pending_bundles,
+            fsync=fsync,
+            namer=self.lakeflush_namer,
+            rotation_callback=self.on_collected,
+            finalize_callback=self._finalized,
+            commit_callback=self._commit if self.checkpoint else None,
+        )
+
+        self._stop = threading.Event()
+        self._timer = None
+        if idle_rotation:
+            self._timer = threading.Thread(
+                target=self._rotate_idle, args=(self.writer.interval,), daemon=True
+            )
+            self._timer.start()
+
+    def _setup(self) -> None:
+        """Configures the application logger, meta dirs and metadata"""
         Logger.setup()
         FileStore.setup()
         MetaDataStore.setup()
         Logger.info("setup collector")
 
-        self.path = filepath
-        self.name = filename
-        self.compress = compress
-
-        if self.compress:
-            file_handler = GzipSizedTimedRotatingFileHandler(
-                FileStore.format(self.path, self.name, FileStatus.INPROGRESS),
-                maxBytes=max_size_mb * 1024 * 1024,
-                backupCount=10,
-                when="M",
-                interval=max_time_mins,
-                rotation_callback=self.on_collected,
-            )
-        else:
-            file_handler = SizedTimedRotatingFileHandler(
-                FileStore.format(self.path, self.name, FileStatus.INPROGRESS),
-                maxBytes=max_size_mb * 1024 * 1024,
-                backupCount=10,
-                when="M",
-                interval=max_time_mins,
-                rotation_callback=self.on_collected,
-            )
-        file_handler.namer = self.lakeflush_namer
-        file_handler.setFormatter(logging.Formatter("%(message)s"))
-        file_handler.setLevel(logging.INFO)
-        self.collector = logging.getLogger("__lakeflush-collector__")
-        self.collector.setLevel(logging.INFO)
-        self.collector.addHandler(file_handler)
+    def _rotate_idle(self, interval: float) -> None:
+        """Rotates the file when its time expired, runs in the timer thread"""
+        while not self._stop.wait(min(1.0, interval)):
+            try:
+                self.writer.rollover_if_due()
+            except Exception as ex:
+                Logger.error(str(ex))
 
     def lakeflush_namer(self, default_name: str) -> str:
         """Converts '<filename>' to '<filename>.<timestamp>.lakeflush.collected.'"""
@@ -85,8 +166,8 @@ class Collector:
             f"{self.name}.{int(time.time())}.{str(uuid.uuid4()).replace('-','')}"
         )
         file_path = FileStore.format(self.path, base_name, FileStatus.COLLECTED)
-        if self.compress:
-            file_path = f"{file_path}.gz"
+        if self.codec:
+            file_path = f"{file_path}{self.codec.extension}"
         Logger.info(f"collected file {FileStore.basename(file_path)}")
         return file_path
 
@@ -94,10 +175,68 @@ class Collector:
         """Callback after file collection and new file creation"""
         pass
 
-    def collect(self, data: str) -> None:
-        """Collects data into a file '<filename>.lakeflush.inprogress'"""
+    def on_finalized(self, file_path: str) -> None:
+        """Callback after collected file is closed and renamed, runs in background
+        when max_pending_bundles is set"""
+        pass
+
+    def _finalized(self, file_path: str) -> None:
+        """Hands a collected file off to the flusher before on_finalized"""
+        if self.flusher is not None:
+            self.flusher.submit(file_path)
+        self.on_finalized(file_path)
+
+    def _commit(self, mark: tuple, file_path: str, rotating_path: str) -> None:
+        """Commits the checkpoint of a rotated file before it is renamed"""
+        self.checkpoint.commit(mark, file_path, rotating_path)
+
+    def mark(self) -> tuple | None:
+        """Returns the checkpoint position to collect data with, if any"""
+        if self.checkpoint is None:
+            return None
+        return self.checkpoint.mark()
+
+    def collect(self, data: str | bytes, mark: tuple = None) -> None:
+        """Collects data into a file '<filename>.lakeflush.inprogress', mark is
+        the checkpoint position after data"""
         try:
-            self.collector.info(data)
+            self.writer.write(data, mark)
         except Exception as ex:
             Logger.error(str(ex))
             raise ex
+
+    def collect_many(self, records: Iterable[str | bytes], mark: tuple = None) -> None:
+        """Collects a batch of records into a file '<filename>.lakeflush.inprogress'
+        with a single write, rotation is checked once per batch"""
+        try:
+            self.writer.write_many(records, mark)
+        except Exception as ex:
+            Logger.error(str(ex))
+            raise ex
+
+    def collect_file(self, file_path: str, mark: tuple = None) -> int:
+        """Collects the content of a file as is, without decoding it. Uncompressed
+        files are appended in kernel space, a newline is added if missing"""
+        try:
+            return self.writer.write_file(file_path, mark)
+        except Exception as ex:
+            Logger.error(str(ex))
+            raise ex
+
+    def flush(self) -> None:
+        """Writes data buffered by the collector into the file"""
+        self.writer.flush()
+
+    def close(self) -> None:
+        """Flushes and closes the file without rotating it, waits for collected
+        files finalized in background"""
+        if self._timer:
+            self._stop.set()
+            self._timer.join()
+            self._timer = None
+        self.writer.close()
+        if self.checkpoint and self.writer.mark is not None:
+            offset = 0
+            if FileStore.exists(self.writer.filename):
+                offset = os.path.getsize(self.writer.filename)
+            self.checkpoint.commit(self.writer.mark, offset=offset)
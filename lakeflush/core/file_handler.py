@@ -7,6 +7,9 @@ class SizedTimedRotatingFileHandler(TimedRotatingFileHandler):
 
     Inherits from TimedRotatingFileHandler and adds size-based rotation capability.
     Rotation occurs when EITHER the size limit or time interval is exceeded.
+    The file size is seeded once when the file is opened and then tracked from the
+    encoded size of the records written, so no extra format, seek or tell is done
+    per record.
 
     Args:
         filename (str): Path to the log file.
@@ -14,6 +17,9 @@ class SizedTimedRotatingFileHandler(TimedRotatingFileHandler):
         backupCount (int): Number of backup files to retain.
         when (str): Time rotation interval type ('S', 'M', 'H', 'D', etc.).
         interval (int): Time interval between rotations.
+        size_check_interval (int): If > 0, re-syncs the tracked size with the file
+            size on disk every N bytes written, counts drift for writes by other
+            processes (default 0 = never).
 
     Example:
         >>> handler = SizedTimedRotatingFileHandler(
@@ -32,14 +38,25 @@ class SizedTimedRotatingFileHandler(TimedRotatingFileHandler):
         backupCount=1,
         when="M",
         interval=1,
+        size_check_interval=0,
         **kwargs,
     ):
+        self.current_size = 0
+        self._checked_size = 0
         super().__init__(
             filename, when=when, interval=interval, backupCount=backupCount
         )
         self.max_bytes = maxBytes
+        self.size_check_interval = size_check_interval
         self.rotation_callback = kwargs.pop("rotation_callback", None)
 
+    def _open(self):
+        """Open the current log file and seed the tracked size from it."""
+        stream = super()._open()
+        self.current_size = os.fstat(stream.fileno()).st_size
+        self._checked_size = self.current_size
+        return stream
+
     def shouldRollover(self, record):
         """Determine if rollover should occur.
 
@@ -49,15 +66,48 @@ class SizedTimedRotatingFileHandler(TimedRotatingFileHandler):
         Returns:
             bool: True if rollover should occur, False otherwise.
         """
+        msg = f"{self.format(record)}{self.terminator}"
+        return self._should_rollover(record, self._size(msg))
+
+    def _size(self, msg: str) -> int:
+        """Returns the bytes of msg once encoded, ascii is not encoded"""
+        if msg.isascii():
+            return len(msg)
+        return len(msg.encode(self.encoding or "utf-8"))
+
+    def _should_rollover(self, record, size: int) -> bool:
+        """Determine if rollover should occur before writing size bytes."""
         # Size-based check
-        if self.max_bytes > 0:
-            msg = f"{self.format(record)}\n"
-            self.stream.seek(0, os.SEEK_END)
-            if self.stream.tell() + len(msg) >= self.max_bytes:
-                return True
+        if self.max_bytes > 0 and self.current_size + size >= self.max_bytes:
+            return True
         # Time-based check
         return super().shouldRollover(record)
 
+    def emit(self, record):
+        """Write the log record, formatting it only once"""
+        try:
+            msg = self.format(record) + self.terminator
+            size = self._size(msg)
+            if self.stream is None:
+                self.stream = self._open()
+            if self._should_rollover(record, size):
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(msg)
+            self.flush()
+            self.current_size += size
+            if (
+                self.size_check_interval > 0
+                and self.current_size - self._checked_size >= self.size_check_interval
+            ):
+                self.current_size = os.fstat(self.stream.fileno()).st_size
+                self._checked_size = self.current_size
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
     def doRollover(self):
         # use parent handler for rollover
         super().doRollover()
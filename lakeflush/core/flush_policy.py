@@ -0,0 +1,72 @@
+import time
+from enum import StrEnum
+
+
+class FlushMode(StrEnum):
+    RECORD = "record"
+    BYTES = "bytes"
+    MILLIS = "millis"
+    ROTATION = "rotation"
+
+
+class FlushPolicy:
+    """Decides when compressed data is forced out of the compressor into the file.
+
+    Every forced flush ends the current deflate block (Z_SYNC_FLUSH), which makes
+    the data written so far readable and durable against a crash of the process,
+    but costs compression ratio and throughput. Modes:
+
+    - record: flush after every record. Nothing is lost on crash, lowest ratio
+      and throughput (default, previous behaviour).
+    - bytes: flush once ``interval`` uncompressed bytes were written since the
+      last flush. Up to ``interval`` bytes may be lost on crash.
+    - millis: flush once ``interval`` milliseconds passed since the last flush,
+      checked when records are written. Up to ``interval`` ms of data may be lost
+      on crash.
+    - rotation: only flush when the file is rotated or closed. The in progress
+      file is not a complete compressed stream and its unflushed tail is lost on
+      crash, best ratio and throughput.
+
+    Args:
+        mode (FlushMode): The flush mode (default 'record').
+        interval (int): Bytes for 'bytes' mode or milliseconds for 'millis' mode.
+
+    Example:
+        >>> policy = FlushPolicy(FlushMode.BYTES, 1024 * 1024)  # every 1 MB
+    """
+
+    def __init__(self, mode: FlushMode = FlushMode.RECORD, interval: int = 0):
+        mode = FlushMode(mode)
+        if mode in (FlushMode.BYTES, FlushMode.MILLIS) and interval <= 0:
+            raise ValueError(f"interval is required for flush mode '{mode}'.")
+        self.mode = mode
+        self.interval = interval
+        self._bytes = 0
+        self._flushed_at = time.monotonic()
+
+    def should_flush(self, nbytes: int) -> bool:
+        """Accounts nbytes written and determines if a flush should occur.
+
+        Args:
+            nbytes (int): Uncompressed bytes written since the previous call.
+
+        Returns:
+            bool: True if a flush should occur, False otherwise.
+        """
+        if self.mode == FlushMode.RECORD:
+            return True
+        if self.mode == FlushMode.ROTATION:
+            return False
+        if self.mode == FlushMode.BYTES:
+            self._bytes += nbytes
+            if self._bytes < self.interval:
+                return False
+        elif (time.monotonic() - self._flushed_at) * 1000 < self.interval:
+            return False
+        self.reset()
+        return True
+
+    def reset(self) -> None:
+        """Resets the policy state after a flush."""
+        self._bytes = 0
+        self._flushed_at = time.monotonic()
@@ -1,24 +1,57 @@
 from watchdog.observers import Observer
 from lakeflush.core.event_handler import FileRotationEventHandler
 from lakeflush.utils.logger import Logger
-from lakeflush.utils.file import FileStore, FileStatus
+from lakeflush.utils.file import FileStore, FileStatus, FlushJournal
+import os
+import queue
+import threading
 import time
 
 
 class Flusher:
     """Flushes collected files to their destination in real time.
 
+    Collected files are queued by a scan of filepath on start, for files collected
+    while stopped or whose events were missed, and by the events of files collected
+    while running. A pool of flush_workers threads flushes them in parallel. Once
+    max_pending_flushes files are queued, the scan and the events wait for a worker,
+    files still queued on stop are flushed by the next flusher started. A file is
+    queued once at a time, and skipped when its bundle is already in the journal.
+
+    In a single process, a Collector of flusher submits its collected files to
+    the workers directly, and watch=False skips the filesystem events.
+
+    Flushed bundles are recorded in a journal, .lakeflush/<filename>.journal in
+    filepath, looked up by bundle name with flusher.journal.get(bundle). A stopped
+    flusher is not started again.
+
     Args:
         filepath (str): Path to the file.
         filename (str): Name to the file.
+        flush_workers (int): Number of threads flushing files, default (1).
+        max_pending_flushes (int): Maximum collected files queued for the workers,
+            default (1000).
+        watch (bool): If True, collected files are detected by filesystem events,
+            False expects them submitted by a Collector in process, default (True).
 
     Example:
-        >>> flusher = Flusher(filepath, filename)
+        >>> flusher = Flusher(filepath, filename, flush_workers=4)
         >>> flusher.start()
 
+        >>> flusher = Flusher(filepath, filename, watch=False)
+        >>> threading.Thread(target=flusher.start).start()
+        >>> collector = Collector(filepath, filename, flusher=flusher)
+
     """
 
-    def __init__(self, filepath: str, filename: str):
+    def __init__(
+        self,
+        filepath: str,
+        filename: str,
+        flush_workers: int = 1,
+        max_pending_flushes: int = 1000,
+        watch: bool = True,
+    ):
 
         if not filepath or not filename:
             raise ValueError("filepath and filename is required.")
@@ -26,6 +59,12 @@ class Flusher:
         if not FileStore.exists(filepath):
             raise ValueError("filepath provided does not exists.")
 
+        if flush_workers < 1:
+            raise ValueError("flush_workers cannot be less than 1.")
+
+        if max_pending_flushes < 1:
+            raise ValueError("max_pending_flushes cannot be less than 1.")
+
         # Setup
         Logger.setup()
         FileStore.setup()
@@ -33,13 +72,100 @@ class Flusher:
         self.path = filepath
         self.name = filename
         self.keyword = ".lakeflush" + FileStatus.COLLECTED
+        # next to the collected files, not shared through the working directory
+        journal_dir = os.path.join(os.path.realpath(filepath), ".lakeflush")
+        FileStore.mkdirs(journal_dir)
+        self.journal = FlushJournal(os.path.join(journal_dir, f"{filename}.journal"))
+        self.flush_workers = flush_workers
+        self.watch = watch
+        self._queue = queue.Queue(max_pending_flushes)
+        self._queued = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
 
     def on_collected(self, dest_path: bytes | str):
-        dest_path = str(dest_path)
+        """Queues a collected file for the flush workers"""
+        dest_path = os.fsdecode(dest_path)
         Logger.info(f"detected new file {FileStore.basename(dest_path)}")
+        self._enqueue(dest_path)
+
+    def submit(self, dest_path: bytes | str) -> None:
+        """Queues a collected file handed off in process, waits while the queue
+        is full"""
+        self._enqueue(os.fsdecode(dest_path))
+
+    def _enqueue(self, dest_path: str) -> None:
+        """Queues a file not already queued, waits while the queue is full"""
+        with self._lock:
+            if dest_path in self._queued:
+                return
+            self._queued.add(dest_path)
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(dest_path, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        # stopped, left to the scan of the next start
+        with self._lock:
+            self._queued.discard(dest_path)
+
+    def _scan(self) -> None:
+        """Queues the collected files present in filepath"""
+        with os.scandir(self.path) as entries:
+            paths = [
+                entry.path
+                for entry in entries
+                if self.keyword in entry.name and entry.is_file()
+            ]
+        if paths:
+            Logger.info(f"found {len(paths)} collected files")
+        for path in sorted(paths):
+            if self._stopped.is_set():
+                return
+            self._enqueue(path)
+
+    def _work(self) -> None:
+        """Flushes queued files until a None is queued, runs in a worker thread"""
+        while True:
+            dest_path = self._queue.get()
+            if dest_path is None:
+                return
+            try:
+                self._flush_collected(dest_path)
+            except Exception as ex:
+                Logger.error(f"unexpected error flushing file: {str(ex)}")
+            finally:
+                with self._lock:
+                    self._queued.discard(dest_path)
+
+    def _flush_collected(self, dest_path: str):
+        """Flushes a collected file not flushed yet and not empty"""
+        basename = FileStore.basename(dest_path)
+        if basename.replace(FileStatus.COLLECTED, "") in self.journal:
+            Logger.info(f"skipping flushed file {basename}")
+            return
+        if not FileStore.exists(dest_path):
+            return
         if not FileStore.empty(dest_path):
             return self.flush(dest_path)
-        Logger.info(f"skipping flush empty file {FileStore.basename(dest_path)}")
+        Logger.info(f"skipping flush empty file {basename}")
+
+    def record_flush(
+        self, bundle: str, src_file: str, destination: str, stat: os.stat_result
+    ):
+        """Records a bundle flushed from src_file to destination, from the stat
+        of its collected file"""
+        self.journal.append(
+            dict(
+                bundle=bundle,
+                source=src_file,
+                destination=destination,
+                size=stat.st_size,
+                collected_at=stat.st_mtime,
+                flushed_at=time.time(),
+            )
+        )
 
     def flush(self, collected_filepath: str):
         """flush collected file"""
@@ -48,24 +174,51 @@ class Flusher:
     def start(self):
         """starts the flusher"""
         Logger.info("starting flusher")
-        handler = FileRotationEventHandler(self.keyword)
-        handler.on_collected = self.on_collected
-        observer = Observer()
-        observer.schedule(handler, self.path)
-        self._running = True
+        workers = [
+            threading.Thread(
+                target=self._work, name=f"lakeflush-flush-{i}", daemon=True
+            )
+            for i in range(self.flush_workers)
+        ]
+        for worker in workers:
+            worker.start()
+        observer = None
+        if self.watch:
+            handler = FileRotationEventHandler(self.keyword)
+            handler.on_collected = self.on_collected
+            observer = Observer()
+            observer.schedule(handler, self.path)
         try:
-            observer.start()
-            while self._running:
-                time.sleep(1)
+            if observer is not None:
+                # watched before the scan, files collected meanwhile are not missed
+                observer.start()
+            self._scan()
+            while not self._stopped.wait(1):
+                pass
         except KeyboardInterrupt:
             Logger.warning("keyboard interruption")
         except Exception as ex:
             Logger.error(f"unexpected error: {str(ex)}")
         finally:
             Logger.info("stopping flusher")
-            observer.stop()
-        observer.join()
+            self.stop()
+            if observer is not None:
+                observer.stop()
+        if observer is not None:
+            observer.join()
+        # files still queued are flushed on the next start
+        while True:
+            try:
+                dest_path = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._queued.discard(dest_path)
+        for _ in workers:
+            self._queue.put(None)
+        for worker in workers:
+            worker.join()
 
     def stop(self):
         """stops the flusher"""
-        self._running = False
+        self._stopped.set()
@@ -1,6 +1,7 @@
 from logging.handlers import TimedRotatingFileHandler
 import os
 import gzip
+from lakeflush.core.flush_policy import FlushPolicy
 
 
 class GzipSizedTimedRotatingFileHandler(TimedRotatingFileHandler):
@@ -16,6 +17,8 @@ class GzipSizedTimedRotatingFileHandler(TimedRotatingFileHandler):
         when (str): Time rotation interval type ('S', 'M', 'H', 'D', etc.).
         interval (int): Time interval between rotations.
         compresslevel (int): Gzip compression level (1-9).
+        flush_policy (FlushPolicy): When compressed data is flushed to the file,
+            see FlushPolicy for the durability trade-off (default every record).
 
     Example:
         >>> handler = GzipSizedTimedRotatingFileHandler(
@@ -35,6 +38,7 @@ class GzipSizedTimedRotatingFileHandler(TimedRotatingFileHandler):
         when="M",
         interval=1,
         compresslevel=6,
+        flush_policy=None,
         **kwargs,
     ):
         filename = filename if filename.endswith(".gz") else f"{filename}.gz"
@@ -49,6 +53,7 @@ class GzipSizedTimedRotatingFileHandler(TimedRotatingFileHandler):
         self.max_bytes = maxBytes
         self.current_size = 0
         self.compresslevel = compresslevel
+        self.flush_policy = flush_policy or FlushPolicy()
         self._check_interval = 100 * 1024  # 100kb
         self.rotation_callback = kwargs.pop("rotation_callback", None)
         self._open()
@@ -85,7 +90,8 @@ class GzipSizedTimedRotatingFileHandler(TimedRotatingFileHandler):
             msg = self.format(record) + self.terminator
             compressed = msg.encode(self.encoding)
             self.stream.write(compressed)
-            self.stream.flush()
+            if self.flush_policy.should_flush(len(compressed)):
+                self.stream.flush()
             self.current_size += len(compressed)
             if self.shouldRollover(record):
                 self.doRollover()
@@ -101,6 +107,7 @@ class GzipSizedTimedRotatingFileHandler(TimedRotatingFileHandler):
 
         # Open new compressed file
         self._open()
+        self.flush_policy.reset()
 
         if self.rotation_callback:
             self.rotation_callback()
@@ -110,5 +117,6 @@ class GzipSizedTimedRotatingFileHandler(TimedRotatingFileHandler):
         if self.stream:
             self.stream.flush()
             self.stream.close()
+            self.stream = None
         # Still call parent cleanup for other resources
         super().close()
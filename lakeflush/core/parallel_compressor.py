@@ -0,0 +1,81 @@
+from collections import deque
+from concurrent.futures import Executor
+from lakeflush.core.codec import Codec
+
+
+class ParallelCompressor:
+    """A pigz like compressor which compresses blocks of the stream on a thread
+    pool and outputs them, in order, as concatenated members of the codec.
+
+    zlib, bz2, lzma and zstd release the GIL while compressing, so blocks are
+    compressed in parallel. Concatenated members are a valid file for any standard
+    reader of the codec, eg: gzip. Follows the StreamCompressor interface.
+
+    Args:
+        codec (Codec): The codec compressing each block.
+        executor (Executor): The thread pool compressing blocks.
+        block_size (int): Uncompressed size of each member (default 128 KB).
+        max_pending (int): Maximum blocks in flight before compress waits for the
+            oldest one (default 4).
+
+    Example:
+        >>> with ThreadPoolExecutor(4) as executor:
+        ...     compressor = ParallelCompressor(GzipCodec(), executor, max_pending=8)
+        ...     data = compressor.compress(b"data") + compressor.finish()
+    """
+
+    def __init__(
+        self,
+        codec: Codec,
+        executor: Executor,
+        block_size: int = 128 * 1024,
+        max_pending: int = 4,
+    ):
+        self.codec = codec
+        self.executor = executor
+        self.block_size = block_size
+        self.max_pending = max_pending
+        self._block = []
+        self._block_bytes = 0
+        self._pending = deque()
+
+    def _submit(self) -> None:
+        """Submits the current block for compression."""
+        if not self._block:
+            return
+        data = b"".join(self._block)
+        self._block = []
+        self._block_bytes = 0
+        self._pending.append(self.executor.submit(self.codec.compress_block, data))
+
+    def _completed(self, wait: bool) -> bytes:
+        """Returns compressed members in order, waits for all if wait is True
+        otherwise only for those over the max_pending bound."""
+        out = []
+        pending = self._pending
+        while pending and (
+            wait or pending[0].done() or len(pending) > self.max_pending
+        ):
+            out.append(pending.popleft().result())
+        return b"".join(out)
+
+    def compress(self, data: bytes) -> bytes:
+        """Adds data to the stream, returns the compressed members completed."""
+        view = memoryview(data)
+        while view:
+            chunk = view[: self.block_size - self._block_bytes]
+            self._block.append(chunk)
+            self._block_bytes += len(chunk)
+            view = view[len(chunk) :]
+            if self._block_bytes >= self.block_size:
+                self._submit()
+        return self._completed(wait=False)
+
+    def flush(self) -> bytes:
+        """Ends the current member and returns all remaining compressed data."""
+        self._submit()
+        return self._completed(wait=True)
+
+    def finish(self) -> bytes:
+        """Ends the stream, every member is complete so same as flush."""
+        return self.flush()
@@ -0,0 +1,141 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List
+from lakeflush.core.collector import Collector
+from lakeflush.utils.logger import Logger
+from lakeflush.utils.file import FileStore
+from lakeflush.utils.metadata import MetaDataStore
+
+
+class _KeyCollector(Collector):
+    """The collector of a key, the application is set up once by the router"""
+
+    def _setup(self) -> None:
+        pass
+
+
+class RoutingCollector:
+    """Routes records into a collector per key, eg: one file per source partition
+    or event date, each rotated independently as '<filename>.<key>'.
+
+    Open collectors are kept in a LRU pool bounded by max_open_files. The least
+    recently used one is closed when the pool is full, rotated only if its time
+    expired, its in progress file is appended to again when its key shows up
+    later, so thousands of keys can be collected in a single pass without running
+    out of descriptors. A closed file is not rotated by time until its key shows
+    up again, close() leaves the files of all keys in progress.
+
+    Args:
+        filepath (str): Path to the files.
+        filename (str): Name prefix of the files.
+        router (Callable): Returns the key of a record, used when no key is given
+            on collect, default (None).
+        max_open_files (int): Maximum collectors open at once, default (128).
+        **collector_kwargs: Arguments of every Collector, eg: max_size_mb, codec.
+
+    Example:
+        >>> collector = RoutingCollector(filepath, filename, router=lambda r: r[:10])
+        >>> collector.collect(data)
+        >>> collector.collect_many([data1, data2], key="date=2024-01-01")
+        >>> collector.close()
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        filename: str,
+        router: Callable[[str | bytes], str] = None,
+        max_open_files: int = 128,
+        **collector_kwargs,
+    ):
+        if not filepath or not filename:
+            raise ValueError("filepath and filename is required.")
+
+        if not FileStore.exists(filepath):
+            raise ValueError("filepath provided does not exists.")
+
+        if max_open_files < 1:
+            raise ValueError("max_open_files cannot be less than 1.")
+
+        # once, not for every collector opened
+        Logger.setup()
+        FileStore.setup()
+        MetaDataStore.setup()
+        Logger.info("setup routing collector")
+
+        self.path = filepath
+        self.name = filename
+        self.router = router
+        self.max_open_files = max_open_files
+        self.collector_kwargs = collector_kwargs
+        self._collectors: OrderedDict[str, Collector] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _route(self, data: str | bytes) -> str:
+        if self.router is None:
+            raise ValueError("key is required when no router is configured.")
+        return self.router(data)
+
+    def _collector(self, key: str) -> Collector:
+        """Returns the open collector of a key, evicts the least recently used"""
+        # before the lookup, 1 and '1' share a file and a collector
+        key = str(key)
+        collector = self._collectors.get(key)
+        if collector is not None:
+            self._collectors.move_to_end(key)
+            return collector
+
+        if not key or os.sep in key or key in (".", ".."):
+            raise ValueError(f"invalid collector key: {key!r}")
+
+        while len(self._collectors) >= self.max_open_files:
+            _, evicted = self._collectors.popitem(last=False)
+            evicted.writer.rollover_if_due()
+            evicted.close()
+
+        collector = _KeyCollector(
+            self.path, f"{self.name}.{key}", **self.collector_kwargs
+        )
+        self._collectors[key] = collector
+        return collector
+
+    def collect(self, data: str | bytes, key: str = None) -> None:
+        """Collects data into the file of its key '<filename>.<key>'"""
+        if key is None:
+            key = self._route(data)
+        with self._lock:
+            self._collector(key).collect(data)
+
+    def collect_many(self, records: Iterable[str | bytes], key: str = None) -> None:
+        """Collects a batch of records, grouped by key with a single write per key"""
+        if key is not None:
+            batches: Dict[str, List] = {key: list(records)}
+        else:
+            batches = {}
+            for data in records:
+                batches.setdefault(self._route(data), []).append(data)
+        with self._lock:
+            for key, batch in batches.items():
+                self._collector(key).collect_many(batch)
+
+    def keys(self) -> List[str]:
+        """Returns keys of open collectors, least recently used first"""
+        return list(self._collectors)
+
+    def flush(self) -> None:
+        """Writes data buffered by open collectors into their files"""
+        with self._lock:
+            for collector in self._collectors.values():
+                collector.flush()
+
+    def close(self) -> None:
+        """Flushes and closes files of all keys without rotating them"""
+        with self._lock:
+            while self._collectors:
+                key, collector = self._collectors.popitem(last=False)
+                try:
+                    collector.close()
+                except Exception as ex:
+                    Logger.error(f"error closing collector {key}: {str(ex)}")
+                    raise ex
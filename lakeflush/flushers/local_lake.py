@@ -1,3 +1,4 @@
+import os
 import shutil
 from pathlib import Path
 from datetime import datetime
@@ -17,6 +18,11 @@ class LocalLakeFlusher(Flusher):
         filename (str): The same file name provided for collector.
         date_partition_format Optional(str): If provided creates partiton pattern based
             on current datetime format before flusing file. eg: year=%Y/month=%m/day=%d
+        flush_workers (int): Number of threads flushing files, default (1).
+        max_pending_flushes (int): Maximum collected files queued for the workers,
+            default (1000).
+        watch (bool): If True, collected files are detected by filesystem events,
+            False expects them submitted by a Collector in process, default (True).
 
     Example:
         >>> local_flusher = LocalLakeFlusher(root_dir, filepath, filename)
@@ -30,9 +36,12 @@ class LocalLakeFlusher(Flusher):
         filepath: str,
         filename: str,
         date_partition_format: str = None,
+        flush_workers: int = 1,
+        max_pending_flushes: int = 1000,
+        watch: bool = True,
     ):
 
-        super().__init__(filepath, filename)
+        super().__init__(filepath, filename, flush_workers, max_pending_flushes, watch)
 
         if not root_dir:
             raise ValueError("root_dir is required.")
@@ -59,11 +68,11 @@ class LocalLakeFlusher(Flusher):
                 FileStore.mkdirs(flush_path)
                 flush_path = flush_path / destname
             # flush file to flush path
+            stat = os.stat(src_file)
             shutil.move(src_file, flush_path)
             file_path = str(flush_path).replace(str(self.root), "")
             Logger.info(f"flushed file {destname} to path: {file_path}")
             # write meta data
-            metaname = basename.replace(FileStatus.COLLECTED, FileStatus.FLUSHED)
-            FileStore.flushmeta(metaname, flush_path)
+            self.record_flush(destname, src_file, str(flush_path), stat)
         except Exception as e:
             Logger.error(f"error flushing file: {str(e)}")
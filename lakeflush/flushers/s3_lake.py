@@ -1,7 +1,9 @@
+import os
 from datetime import datetime
 from botocore.exceptions import ClientError
 
 from lakeflush.core import Flusher
+from lakeflush.core.codec import codec_for
 from lakeflush.utils.logger import Logger
 from lakeflush.utils.file import FileStore, FileStatus
 from lakeflush.utils.s3 import S3Store
@@ -18,6 +20,11 @@ class S3LakeFlusher(Flusher):
         prefix (str): The path or dir in s3 bucket to flush object (default root).
         date_partition_format Optional(str): If provided creates partiton pattern based
             on current datetime format before flusing file. eg: year=%Y/month=%m/day=%d
+        flush_workers (int): Number of threads flushing files, default (1).
+        max_pending_flushes (int): Maximum collected files queued for the workers,
+            default (1000).
+        watch (bool): If True, collected files are detected by filesystem events,
+            False expects them submitted by a Collector in process, default (True).
 
     Example:
         >>> s3_flusher = S3LakeFlusher(bucket, filepath, filename)
@@ -31,9 +38,12 @@ class S3LakeFlusher(Flusher):
         filepath: str,
         filename: str,
         date_partition_format: str = None,
+        flush_workers: int = 1,
+        max_pending_flushes: int = 1000,
+        watch: bool = True,
     ):
 
-        super().__init__(filepath, filename)
+        super().__init__(filepath, filename, flush_workers, max_pending_flushes, watch)
 
         if not bucket:
             raise ValueError("bucket is required.")
@@ -58,12 +68,21 @@ class S3LakeFlusher(Flusher):
             if self.partition_format:
                 # create partition based on format provided
                 flush_path = datetime.now().strftime(self.partition_format) + "/"
-            # flush object to s3 flush path
-            S3Store.upload(src_file, self.bucket, f"{flush_path}{object_key}")
+            # flush object to s3 flush path, typed by compression codec
+            codec = codec_for(basename)
+            extra_args = {"ContentType": codec.content_type} if codec else None
+            stat = os.stat(src_file)
+            S3Store.upload(
+                src_file, self.bucket, f"{flush_path}{object_key}", extra_args
+            )
             Logger.info(f"flushed object {object_key} to s3 path: {flush_path}")
             # write meta data
-            metaname = basename.replace(FileStatus.COLLECTED, FileStatus.FLUSHED)
-            FileStore.flushmeta(metaname, flush_path)
+            self.record_flush(
+                object_key,
+                src_file,
+                f"s3://{self.bucket}/{flush_path}{object_key}",
+                stat,
+            )
         except ClientError as ex:
             Logger.error(f"s3_client error: {ex}")
         except Exception as e:
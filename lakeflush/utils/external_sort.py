@@ -0,0 +1,93 @@
+import heapq
+import struct
+import tempfile
+from typing import BinaryIO, Iterable, Iterator, Tuple
+from lakeflush.utils.file_index import FileIndex
+
+# mtime, size and path length of an entry spilled to a run
+ENTRY_HEADER = struct.Struct("<dqI")
+BUFFER_SIZE = 64 * 1024
+
+Entry = Tuple[float, str, int]
+
+
+class ExternalSorter:
+    """Sorts (mtime, path, size) entries oldest first with bounded memory.
+
+    Entries are collected into runs of run_size, every full run is sorted and
+    spilled to a temporary file, then all runs are k-way merged while read back.
+    Entries fitting a single run are sorted in memory without spilling. A run is
+    held in a compact FileIndex rather than a list of tuples.
+
+    Args:
+        run_size (int): Maximum entries held in memory (default 1000000).
+        tmp_dir (str): Directory of the spilled runs (default system temp dir).
+
+    Example:
+        >>> sorter = ExternalSorter(run_size=100000)
+        >>> for mtime, path, size in sorter.sort(entries):
+        ...     print(path)
+    """
+
+    def __init__(self, run_size: int = 1000000, tmp_dir: str = None):
+        if run_size < 1:
+            raise ValueError("run_size cannot be less than 1.")
+
+        self.run_size = run_size
+        self.tmp_dir = tmp_dir
+        self.runs = 0
+
+    def _spill(self, run: FileIndex) -> BinaryIO:
+        """Writes a sorted run to a temporary file"""
+        fp = tempfile.TemporaryFile(
+            dir=self.tmp_dir, prefix="lakeflush-run-", buffering=BUFFER_SIZE
+        )
+        pack = ENTRY_HEADER.pack
+        for i in run.sorted():
+            # paths are already encoded in the index
+            data = run.raw_path(i)
+            fp.write(pack(run.mtimes[i], run.sizes[i], len(data)))
+            fp.write(data)
+        fp.seek(0)
+        self.runs += 1
+        return fp
+
+    @staticmethod
+    def _read(fp: BinaryIO) -> Iterator[Entry]:
+        """Reads entries of a spilled run back in order"""
+        unpack, header_size = ENTRY_HEADER.unpack, ENTRY_HEADER.size
+        while True:
+            header = fp.read(header_size)
+            if not header:
+                return
+            mtime, size, length = unpack(header)
+            path = fp.read(length).decode("utf-8", "surrogateescape")
+            yield mtime, path, size
+
+    def sort(self, entries: Iterable[Entry]) -> Iterator[Entry]:
+        """Yields entries sorted by (mtime, path).
+
+        Args:
+            entries (Iterable): The (mtime, path, size) entries, consumed at once.
+
+        Returns:
+            Iterator of sorted (mtime, path, size) entries.
+        """
+        runs, run = [], FileIndex()
+        try:
+            for mtime, path, size in entries:
+                run.append(mtime, path, size)
+                if len(run) >= self.run_size:
+                    runs.append(self._spill(run))
+                    run.clear()
+            if not runs:
+                for i in run.sorted():
+                    yield run[i]
+                return
+            if run:
+                runs.append(self._spill(run))
+                run.clear()
+            yield from heapq.merge(*(self._read(fp) for fp in runs))
+        finally:
+            for fp in runs:
+                fp.close()
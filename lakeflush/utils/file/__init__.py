@@ -2,3 +2,8 @@ from lakeflush.utils.file.status import FileStatus
 from lakeflush.utils.file.store import FileStore
 from lakeflush.utils.file.processor import FileProcessor
 from lakeflush.utils.file.type import FileType
+from lakeflush.utils.file.order import FileOrder
+from lakeflush.utils.file.scan_cache import ScanCache
+from lakeflush.utils.file.pattern import PatternMatcher
+from lakeflush.utils.file.filter import FileFilter
+from lakeflush.utils.file.journal import FlushJournal
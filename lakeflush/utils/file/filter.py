@@ -0,0 +1,77 @@
+import time
+from datetime import datetime
+
+
+class FileFilter:
+    """Selects files by age, modification time window and size, from the stat of
+    a scanned file or the metadata of a listed object, before any is opened.
+
+    Files still written by a producer are skipped by a minimum age, measured from
+    the start of each scan. Empty files are skipped by default.
+
+    Args:
+        min_age_secs (float): Minimum seconds since a file was last modified
+            (default 0).
+        modified_after (datetime or float): Skips files modified before, inclusive
+            lower bound of the mtime window (default None).
+        modified_before (datetime or float): Skips files modified at or after,
+            exclusive upper bound of the mtime window (default None).
+        min_size (int): Minimum size in bytes (default 1, skips empty files).
+        max_size (int): Maximum size in bytes (default None).
+
+    Example:
+        >>> file_filter = FileFilter(min_age_secs=60, max_size=1024 * 1024 * 1024)
+        >>> file_filter.begin()
+        >>> file_filter.match(stat.st_mtime, stat.st_size)
+        True
+    """
+
+    def __init__(
+        self,
+        min_age_secs: float = 0,
+        modified_after: datetime | float = None,
+        modified_before: datetime | float = None,
+        min_size: int = 1,
+        max_size: int = None,
+    ):
+        if min_age_secs < 0:
+            raise ValueError("min_age_secs cannot be less than 0.")
+
+        if min_size < 0:
+            raise ValueError("min_size cannot be less than 0.")
+
+        if max_size is not None and max_size < min_size:
+            raise ValueError("max_size cannot be less than min_size.")
+
+        if isinstance(modified_after, datetime):
+            modified_after = modified_after.timestamp()
+        if isinstance(modified_before, datetime):
+            modified_before = modified_before.timestamp()
+        if (
+            modified_after is not None
+            and modified_before is not None
+            and modified_after >= modified_before
+        ):
+            raise ValueError("modified_after should be before modified_before.")
+
+        self.min_age_secs = min_age_secs
+        self.modified_after = modified_after
+        self.modified_before = modified_before
+        self.min_size = min_size
+        self.max_size = max_size
+        self._min_mtime = float("-inf") if modified_after is None else modified_after
+        self._max_mtime = float("inf") if modified_before is None else modified_before
+        self._settled_mtime = float("inf")
+
+    def begin(self) -> None:
+        """Starts a scan, files modified later than min_age_secs ago are skipped"""
+        if self.min_age_secs > 0:
+            self._settled_mtime = time.time() - self.min_age_secs
+
+    def match(self, mtime: float, size: int) -> bool:
+        """Check if a file of mtime and size in bytes is eligible"""
+        if size < self.min_size or (self.max_size is not None and size > self.max_size):
+            return False
+        if mtime < self._min_mtime or mtime >= self._max_mtime:
+            return False
+        return mtime <= self._settled_mtime
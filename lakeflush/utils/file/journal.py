@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Dict
+from lakeflush.utils.logger import Logger
+
+# seconds flush records are kept by a compaction
+RETENTION_SECS = 7 * 24 * 60 * 60
+
+
+class FlushJournal:
+    """Appends flush records to a single json lines journal, indexed in memory
+    by bundle name, instead of a file per flushed bundle.
+
+    Appends are group committed: a thread appending while another one writes
+    and fsyncs the journal waits for it, then writes and fsyncs the records of
+    all waiting threads at once. A record is durable once append() returns.
+
+    Every compact_records records appended, the journal is compacted: the latest
+    record of each bundle flushed within retention_secs, or whose source file
+    still exists, is rewritten to a new journal, which atomically replaces the
+    old one.
+
+    Args:
+        path (str): The journal file.
+        retention_secs (float): Seconds records are kept by a compaction, records
+            of a source still present are always kept, None keeps them all
+            (default 7 days).
+        compact_records (int): Records appended between compactions
+            (default 100000).
+
+    Example:
+        >>> journal = FlushJournal(".lakeflush/testfile.journal")
+        >>> journal.append(dict(bundle="testfile.20240101.lakeflush", size=1024))
+        >>> journal.get("testfile.20240101.lakeflush")["size"]
+        1024
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        retention_secs: float = RETENTION_SECS,
+        compact_records: int = 100000,
+    ):
+        if retention_secs is not None and retention_secs <= 0:
+            raise ValueError("retention_secs should be greater than 0.")
+
+        if compact_records < 1:
+            raise ValueError("compact_records should be greater than 0.")
+
+        self.path = Path(path)
+        self.retention_secs = retention_secs
+        self.compact_records = compact_records
+        self._index: Dict[str, dict] = {}
+        self._records = 0
+        self._load()
+        self._compacted = len(self._index)
+        self._fp = open(self.path, "a", encoding="utf-8")
+        self._cond = threading.Condition()
+        self._pending = []
+        self._appended = 0
+        self._durable = 0
+        self._committing = False
+
+    def _load(self) -> None:
+        """Builds the index from the journal, the latest record of a bundle wins"""
+        if not self.path.exists():
+            return
+        valid = 0
+        with open(self.path, "rb") as fp:
+            for line in fp:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    record = None
+                if record is None or not line.endswith(b"\n"):
+                    # torn by a crash while appending, never acknowledged
+                    break
+                valid += len(line)
+                if not isinstance(record, dict) or "bundle" not in record:
+                    Logger.warning(
+                        f"skipping record without bundle in {self.path.name}"
+                    )
+                    continue
+                self._index[record["bundle"]] = record
+                self._records += 1
+        if valid < self.path.stat().st_size:
+            Logger.warning(f"truncating torn records of {self.path.name}")
+            os.truncate(self.path, valid)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, bundle: str) -> bool:
+        return bundle in self._index
+
+    def get(self, bundle: str) -> dict | None:
+        """Returns the latest flush record of a bundle name or None"""
+        return self._index.get(bundle)
+
+    def append(self, record: dict) -> None:
+        """Appends a flush record with a bundle name, durable once returned"""
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._cond:
+            self._pending.append((line, record))
+            self._appended += 1
+            seq = self._appended
+            while self._durable < seq:
+                if self._committing:
+                    self._cond.wait()
+                    continue
+                # leads the commit of every record pending
+                self._committing = True
+                lines, self._pending = self._pending, []
+                target = self._appended
+                self._cond.release()
+                try:
+                    self._fp.write("".join(line for line, _ in lines))
+                    self._fp.flush()
+                    os.fsync(self._fp.fileno())
+                except BaseException:
+                    self._cond.acquire()
+                    self._pending[:0] = lines
+                    self._committing = False
+                    self._cond.notify_all()
+                    raise
+                self._cond.acquire()
+                # looked up once durable
+                for _, committed in lines:
+                    self._index[committed["bundle"]] = committed
+                self._records += len(lines)
+                self._durable = target
+                self._committing = False
+                self._cond.notify_all()
+            compact = self._records - self._compacted >= self.compact_records
+        if compact:
+            self.compact()
+
+    def compact(self) -> None:
+        """Rewrites the journal with the latest record of each bundle kept"""
+        with self._cond:
+            while self._committing:
+                self._cond.wait()
+            if self.retention_secs is not None:
+                expired = time.time() - self.retention_secs
+                self._index = {
+                    bundle: record
+                    for bundle, record in self._index.items()
+                    if record.get("flushed_at", expired) >= expired
+                    # a source still present would be flushed again
+                    or (record.get("source") and os.path.exists(record["source"]))
+                }
+            tmp_path = self.path.with_name(f"{self.path.name}.compact")
+            with open(tmp_path, "w", encoding="utf-8") as fp:
+                for record in self._index.values():
+                    fp.write(json.dumps(record, separators=(",", ":")) + "\n")
+                fp.flush()
+                os.fsync(fp.fileno())
+            self._fp.close()
+            os.replace(tmp_path, self.path)
+            self._fp = open(self.path, "a", encoding="utf-8")
+            Logger.info(
+                f"compacted {self.path.name} from {self._records} "
+                f"to {len(self._index)} records"
+            )
+            self._records = self._compacted = len(self._index)
+
+    def close(self) -> None:
+        """Closes the journal"""
+        with self._cond:
+            while self._committing:
+                self._cond.wait()
+            self._fp.close()
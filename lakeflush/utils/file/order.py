@@ -0,0 +1,6 @@
+from enum import StrEnum
+
+
+class FileOrder(StrEnum):
+    BATCH = "batch"
+    GLOBAL = "global"
@@ -0,0 +1,64 @@
+import os
+import re
+import fnmatch
+from typing import List
+
+# characters starting a wildcard in unix style patterns
+WILDCARDS = re.compile(r"[*?\[]")
+
+
+class PatternMatcher:
+    """Matches names against unix style patterns, compiled once into a single
+    regex, with the same rules as fnmatch.
+
+    The literal prefix of a pattern is the part before its first wildcard, eg:
+    'logs/2024/' for 'logs/2024/*.json'. As '*' also matches '/', only the
+    literal prefixes tell which paths can never match.
+
+    Args:
+        patterns (List[str]): The unix style patterns, eg: ["*.json"].
+
+    Example:
+        >>> matcher = PatternMatcher(["logs/2024/*.json", "logs/2024/*.csv"])
+        >>> matcher.match("logs/2024/01/events.json")
+        True
+        >>> matcher.prefix
+        'logs/2024/'
+    """
+
+    def __init__(self, patterns: List[str]):
+        self.patterns = tuple(os.path.normcase(pattern) for pattern in patterns)
+        self.prefixes = tuple(
+            WILDCARDS.split(pattern, maxsplit=1)[0] for pattern in self.patterns
+        )
+        self._match = None
+        if self.patterns:
+            self._match = re.compile(
+                "|".join(fnmatch.translate(pattern) for pattern in self.patterns)
+            ).match
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns)
+
+    @property
+    def prefix(self) -> str:
+        """Returns the literal prefix common to all patterns"""
+        if not self.prefixes:
+            return ""
+        return os.path.commonprefix(self.prefixes)
+
+    def match(self, name: str) -> bool:
+        """Check if name matches any pattern, all names match without patterns"""
+        if self._match is None:
+            return True
+        return self._match(os.path.normcase(name)) is not None
+
+    def may_contain(self, dir_path: str) -> bool:
+        """Check if paths under a directory, eg: 'logs/2023', can match any pattern"""
+        if self._match is None:
+            return True
+        dir_path = f"{dir_path}/"
+        return any(
+            dir_path.startswith(prefix) or prefix.startswith(dir_path)
+            for prefix in self.prefixes
+        )
@@ -1,9 +1,14 @@
 import os
 import heapq
-import fnmatch
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Iterator, List
+from typing import Iterator, List, Tuple
 from lakeflush.utils.logger import Logger
+from lakeflush.utils.external_sort import ExternalSorter
+from lakeflush.utils.file.order import FileOrder
+from lakeflush.utils.file.filter import FileFilter
+from lakeflush.utils.file.pattern import PatternMatcher
+from lakeflush.utils.file.scan_cache import ScanCache
 
 
 class FileProcessor:
@@ -11,7 +16,20 @@ class FileProcessor:
 
     This class implements an iterator that yields files from a directory tree in
     ascending order of their modification times by batch (oldest first) without
-    loading all file paths into memory simultaneously. Supports file pattern matching.
+    loading all file paths into memory simultaneously. Supports file pattern matching,
+    patterns match file names or with a '/' paths relative to root_dir, eg:
+    'year=2024/*.json', directories no pattern can match are not scanned.
+
+    With order 'global' files are yielded strictly oldest first across the whole
+    tree, scanned entries are sorted externally in runs spilled to temporary files
+    so memory stays bounded by sort_run_size.
+
+    With scan_workers > 1 directories are scanned concurrently on a thread pool,
+    for deep partition trees on high latency mounts like NFS, files are matched
+    and ordered the same way.
+
+    With a scan_cache, directories unchanged since the previous scan are not
+    listed again and only files not seen before are yielded, see ScanCache.
     """
 
     def __init__(
@@ -19,6 +37,11 @@ class FileProcessor:
         root_dir: str | Path,
         match_patterns: List[str] = [],
         batch_size: int = 1000,
+        order: FileOrder = FileOrder.BATCH,
+        sort_run_size: int = 1000000,
+        scan_workers: int = 1,
+        scan_cache: str = None,
+        file_filter: FileFilter = None,
     ):
         """Initialize the file processor.
 
@@ -26,28 +49,57 @@ class FileProcessor:
             root_dir (str or Path object): Path to the root directory
             match_patterns (List of string): patterns to match file names (default all)
             batch_size (int): Batch size to control number of files (default 1000)
+            order (FileOrder): 'batch' orders files within a batch, 'global' orders
+                all files (default 'batch')
+            sort_run_size (int): Files sorted in memory for order 'global', more are
+                spilled to disk and merged (default 1000000)
+            scan_workers (int): Number of directories scanned concurrently
+                (default 1)
+            scan_cache (str): SQLite file caching scanned directories, a rescan
+                yields only files not seen before (default None)
+            file_filter (FileFilter): Selects files by age, mtime window and size
+                from their stat (default skips empty files)
         """
+        if scan_workers < 1:
+            raise ValueError("scan_workers cannot be less than 1.")
+
         self.root = Path(root_dir)
         self.batch_size = batch_size
         self.match_patterns = tuple(match_patterns)
+        self.name_matcher = PatternMatcher(
+            [pattern for pattern in match_patterns if "/" not in pattern]
+        )
+        self.path_matcher = PatternMatcher(
+            [pattern for pattern in match_patterns if "/" in pattern]
+        )
+        # length of the root prefix stripped from paths matched
+        self._root_len = len(os.path.join(str(self.root), ""))
+        self.order = FileOrder(order)
+        self.sorter = ExternalSorter(sort_run_size)
+        self.scan_workers = scan_workers
+        self.scan_cache = ScanCache(scan_cache) if scan_cache else None
+        self.file_filter = file_filter or FileFilter()
         self._heap = []
-        self._dir_queue = []
-        self._current_dir = None
-        self._dir_iter = None
+        self._scanner = None
+        self._sorted = None
 
-    def _should_match(self, path: Path) -> bool:
-        """Check if file matches inclusion criteria."""
+    def _should_match(self, filename: str, path: str = None) -> bool:
+        """Check if file name or path matches inclusion criteria."""
         if not self.match_patterns:
             return True
 
-        filename = path.name
         # Check patterns
-        pattern_match = any(
-            fnmatch.fnmatch(filename, pattern) for pattern in self.match_patterns
-        )
-        if not pattern_match:
-            return False
-        return True
+        if self.name_matcher and self.name_matcher.match(filename):
+            return True
+        if self.path_matcher and path is not None:
+            return self.path_matcher.match(path[self._root_len :])
+        return False
+
+    def _should_visit(self, dir_path: str) -> bool:
+        """Check if files under a directory can match path patterns."""
+        if self.name_matcher or not self.path_matcher:
+            return True
+        return self.path_matcher.may_contain(dir_path[self._root_len :])
 
     def __iter__(self) -> Iterator[Path]:
         """Initialize the iterator.
@@ -55,7 +107,8 @@ class FileProcessor:
         Returns:
             An iterator yielding Path objects in mtime order
         """
-        self._dir_queue = [self.root]
+        self._scanner = self._scan()
+        self._sorted = None
         return self
 
     def __next__(self) -> Path:
@@ -67,52 +120,178 @@ class FileProcessor:
         Raises:
             StopIteration: When no more files remain to process
         """
+        return Path(self._next_file()[1])
+
+    def files(self) -> Iterator[Tuple[Path, int, float]]:
+        """Yields files (path, size, mtime) in modification time order"""
+        self.__iter__()
+        while True:
+            try:
+                mtime, path, size = self._next_file()
+            except StopIteration:
+                return
+            yield Path(path), size, mtime
+
+    def _next_file(self) -> Tuple[float, str, int]:
+        """Get the next file (mtime, path, size) in modification time order"""
+        if self._scanner is None:
+            self._scanner = self._scan()
+
+        if self.order == FileOrder.GLOBAL:
+            if self._sorted is None:
+                self._sorted = self.sorter.sort(self._scanner)
+            return next(self._sorted)
+
         while True:
             # Try to get next file from heap
             if self._heap:
-                mtime, path = heapq.heappop(self._heap)
-                return path
+                return heapq.heappop(self._heap)
 
             # Need to scan more directories
             if not self._load_next_batch():
                 raise StopIteration
 
-    def _load_next_batch(self) -> bool:
-        """Scan directories to populate the processing heap.
+    def _cached(self, current_dir: str) -> dict | None:
+        """Returns the cached state of a directory, read on the caller thread"""
+        if self.scan_cache is None:
+            return None
+        return self.scan_cache.get(current_dir)
 
-        Scans directories incrementally until either:
-        - The heap contains files to process
-        - All directories have been exhausted
+    def _scan_dir(
+        self, current_dir: str, cached: dict = None
+    ) -> Tuple[List[str], List[tuple]]:
+        """Scan a single directory, skips it when unchanged since cached.
 
         Returns:
-            bool: True if files are available in heap, False if processing complete
+            A tuple of sub directories and (mtime, path, size) of matched files
         """
-        while self._dir_queue or self._current_dir:
-            if self._current_dir is None:
-                self._current_dir = self._dir_queue.pop()
-                try:
-                    self._dir_iter = os.scandir(self._current_dir)
-                except (PermissionError, OSError):
-                    self._current_dir = None
-                    continue
-
+        dirs, files = [], []
+        if self.scan_cache is not None:
             try:
-                entry = next(self._dir_iter)
+                # taken before listing, an entry added later changes it
+                dir_mtime = os.stat(current_dir).st_mtime_ns
+            except (PermissionError, OSError):
+                return dirs, files
+            if cached and cached["mtime"] == dir_mtime:
+                for name in cached["dirs"]:
+                    if self._should_visit(os.path.join(current_dir, name)):
+                        dirs.append(os.path.join(current_dir, name))
+                self.scan_cache.prefetch(dirs)
+                return dirs, files
+            seen = set(cached["files"]) if cached else set()
+            dir_names, file_names = [], []
+            filtered = False
+
+        try:
+            dir_iter = os.scandir(current_dir)
+        except (PermissionError, OSError):
+            return dirs, files
+
+        with dir_iter:
+            for entry in dir_iter:
                 try:
                     if entry.is_dir(follow_symlinks=False):
-                        self._dir_queue.append(Path(entry.path))
+                        if self._should_visit(entry.path):
+                            dirs.append(entry.path)
+                        if self.scan_cache is not None:
+                            dir_names.append(entry.name)
                     elif entry.is_file(follow_symlinks=False):
-                        filepath = Path(entry.path)
-                        if self._should_match(filepath):
+                        if self._should_match(entry.name, entry.path):
+                            if self.scan_cache is not None and entry.name in seen:
+                                file_names.append(entry.name)
+                                continue
                             stat = entry.stat()
-                            heapq.heappush(self._heap, (stat.st_mtime, filepath))
-                            # Control memory usage using batch
-                            if len(self._heap) > self.batch_size:
-                                return True
+                            if not self.file_filter.match(stat.st_mtime, stat.st_size):
+                                filtered = True
+                                continue
+                            if self.scan_cache is not None:
+                                file_names.append(entry.name)
+                            files.append((stat.st_mtime, entry.path, stat.st_size))
                 except (OSError, PermissionError) as ex:
                     Logger.warning(f"OSError: {ex}")
                     continue
-            except StopIteration:
-                self._current_dir = None
+
+        if self.scan_cache is not None:
+            # files filtered out may be eligible later, listed again next scan
+            dir_mtime = None if filtered else dir_mtime
+            self.scan_cache.stage(current_dir, dir_mtime, dir_names, file_names)
+            self.scan_cache.prefetch(dirs)
+        return dirs, files
+
+    def _scan(self) -> Iterator[Tuple[float, str, int]]:
+        """Scan directories depth first, or concurrently with scan_workers > 1.
+
+        Returns:
+            An iterator yielding (mtime, path, size) of matched files
+        """
+        self.file_filter.begin()
+        if self.scan_cache is not None:
+            self.scan_cache.begin()
+
+        if self.scan_workers > 1:
+            yield from self._scan_parallel()
+            return
+
+        dir_queue = [str(self.root)]
+        while dir_queue:
+            current_dir = dir_queue.pop()
+            dirs, files = self._scan_dir(current_dir, self._cached(current_dir))
+            dir_queue.extend(dirs)
+            yield from files
+
+    def _scan_parallel(self) -> Iterator[Tuple[float, str, int]]:
+        """Scan directories on a thread pool, files are yielded as directories
+        complete, sub directories found are scanned next."""
+        dir_queue = [str(self.root)]
+        pending = set()
+        executor = ThreadPoolExecutor(
+            self.scan_workers, thread_name_prefix="lakeflush-scan"
+        )
+        try:
+            while dir_queue or pending:
+                # bounds the directories scanned ahead of the consumer
+                while dir_queue and len(pending) < self.scan_workers * 2:
+                    current_dir = dir_queue.pop()
+                    pending.add(
+                        executor.submit(
+                            self._scan_dir, current_dir, self._cached(current_dir)
+                        )
+                    )
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    dirs, files = future.result()
+                    dir_queue.extend(dirs)
+                    yield from files
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def commit_scan(self) -> None:
+        """Persists the directories scanned to the scan cache, call once their
+        files are collected so they are not yielded again."""
+        if self.scan_cache is not None:
+            self.scan_cache.save()
+
+    def failed(self, path: str | Path) -> None:
+        """Marks a file yielded as not collected, it is not saved to the scan
+        cache and is yielded again by the next scan."""
+        if self.scan_cache is not None:
+            self.scan_cache.discard(str(path))
+
+    def _load_next_batch(self) -> bool:
+        """Scan directories to populate the processing heap.
+
+        Scans directories incrementally until either:
+        - The heap contains files to process
+        - All directories have been exhausted
+
+        Returns:
+            bool: True if files are available in heap, False if processing complete
+        """
+        for mtime, path, size in self._scanner:
+            # paths are kept as str, a Path is only built when yielded
+            heapq.heappush(self._heap, (mtime, path, size))
+            # Control memory usage using batch
+            if len(self._heap) > self.batch_size:
+                return True
 
         return len(self._heap) > 0
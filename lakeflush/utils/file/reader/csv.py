@@ -1,3 +1,4 @@
+import io
 import time
 
 
@@ -9,8 +10,18 @@ class CSVFileReader:
         self.header_data = None
         self.batch_size = batch_size
 
-    def read(self, file_path: str):
+    def fetch(self, file_path: str) -> str:
+        """Reads the file content, can run ahead on another thread"""
         with open(file_path, "r") as file:
+            return file.read()
+
+    def read(self, file_path: str, content: str = None):
+        """Yields the file rows in batches, content fetched ahead is used if given"""
+        if content is None:
+            file = open(file_path, "r")
+        else:
+            file = io.StringIO(content)
+        with file:
             if self.header:
                 if not self.header_data:
                     # Store header
@@ -5,8 +5,13 @@ class JSONFileReader:
         # added for common check
         self.header_data = None
 
-    def read(self, file_path: str):
+    def fetch(self, file_path: str) -> str:
+        """Reads the file content, can run ahead on another thread"""
         with open(file_path, "r") as fp:
-            data = fp.read()
-            if data:
-                yield data
+            return fp.read()
+
+    def read(self, file_path: str, content: str = None):
+        """Yields the file content, content fetched ahead is used if given"""
+        data = self.fetch(file_path) if content is None else content
+        if data:
+            yield data
@@ -0,0 +1,96 @@
+import os
+import threading
+import time
+from typing import Dict, List
+from lakeflush.utils.metastore import SQLiteMetastore
+
+# directories modified this close to a scan may still get entries within the
+# same mtime, they are listed again on the next scan
+RACY_NS = 2 * 1000000000
+
+
+class ScanCache:
+    """Caches the directories scanned by FileProcessor in a SQLiteMetastore, so a
+    rescan only lists the directories changed since the previous scan.
+
+    A directory is stored with its mtime, the names of its sub directories and of
+    its matched files. Adding, removing or renaming an entry changes the mtime of
+    its directory: an unchanged directory is not listed again, only its sub
+    directories are visited, and a changed one is listed but only its files not
+    seen before are stat'ed and yielded. Files modified in place are not yielded
+    again. Only matched files are cached, so a cache is meant for a single set of
+    match patterns.
+
+    The sub directories of a scanned directory are read from the cache in a
+    single query by prefetch(). Scanned directories are staged in memory and
+    persisted by save(), once their files are collected, files that failed to
+    be collected are dropped with discard().
+
+    Args:
+        db_path (str): The SQLite file of the cache.
+
+    Example:
+        >>> processor = FileProcessor(root_dir, scan_cache="scan.db")
+        >>> for path in processor:
+        ...     collect(path)
+        >>> processor.commit_scan()
+    """
+
+    KEY_PREFIX = "scan:"
+
+    def __init__(self, db_path: str):
+        self.metastore = SQLiteMetastore(db_path)
+        self.scan_start = time.time_ns()
+        self._staged: Dict[str, dict] = {}
+        self._fetched: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def begin(self) -> None:
+        """Starts a scan, discards directories staged and not saved"""
+        self.scan_start = time.time_ns()
+        with self._lock:
+            self._staged, self._fetched = {}, {}
+
+    def get(self, path: str) -> dict | None:
+        """Returns the cached directory {mtime, dirs, files} or None"""
+        with self._lock:
+            if path in self._fetched:
+                return self._fetched.pop(path)
+        return self.metastore.get_metadata(f"{self.KEY_PREFIX}{path}")
+
+    def prefetch(self, paths: List[str]) -> None:
+        """Reads the cached directories of paths, returned by get() once"""
+        found = self.metastore.get_many(f"{self.KEY_PREFIX}{path}" for path in paths)
+        start = len(self.KEY_PREFIX)
+        with self._lock:
+            for path in paths:
+                self._fetched[path] = None
+            for key, state in found.items():
+                self._fetched[key[start:]] = state
+
+    def stage(self, path: str, mtime: int, dirs: List[str], files: List[str]) -> None:
+        """Stages a scanned directory, its mtime in ns and entry names, a None
+        mtime lists it again on the next scan"""
+        if mtime is not None and mtime >= self.scan_start - RACY_NS:
+            mtime = None
+        with self._lock:
+            self._staged[path] = dict(mtime=mtime, dirs=dirs, files=files)
+
+    def discard(self, file_path: str) -> None:
+        """Drops a staged file not collected, its directory is listed again on
+        the next scan and the file yielded again"""
+        current_dir, name = os.path.split(file_path)
+        with self._lock:
+            state = self._staged.get(current_dir)
+            if state is None or name not in state["files"]:
+                return
+            state["files"] = [f for f in state["files"] if f != name]
+            state["mtime"] = None
+
+    def save(self) -> None:
+        """Persists the staged directories"""
+        with self._lock:
+            staged, self._staged = self._staged, {}
+        self.metastore.set_many(
+            {f"{self.KEY_PREFIX}{path}": state for path, state in staged.items()}
+        )
@@ -13,13 +13,6 @@ class FileStore:
         cls.__lakeflush_path = Path(f"{os.path.realpath(path)}/.lakeflush")
         os.makedirs(cls.__lakeflush_path, mode=0o700, exist_ok=True)
 
-    @classmethod
-    def flushmeta(cls, meta_filename: Path | str, dest_filepath: Path | str):
-        """Configures application meta dirs"""
-        meta_filepath = cls.__lakeflush_path / meta_filename
-        with open(meta_filepath, "w") as fp:
-            fp.write(str(dest_filepath))
-
     @classmethod
     def format(cls, path: str, name: str, status: str) -> str:
         """Creates lakeflush filename format from path and name"""
@@ -0,0 +1,99 @@
+import heapq
+from array import array
+from typing import Iterator, Tuple
+
+Entry = Tuple[float, str, int]
+
+# positions sorted at once, bounds the temporary lists of a sort
+SORT_CHUNK = 256 * 1024
+
+
+class FileIndex:
+    """A compact index of scanned files (mtime, path, size).
+
+    Entries are stored in parallel arrays of mtimes and sizes, paths are utf-8
+    encoded into a single buffer addressed by offsets, so an entry costs 24 bytes
+    plus its path length instead of a tuple, a float, an int and a str object.
+    Entries are decoded back to tuples only when read.
+
+    Example:
+        >>> index = FileIndex()
+        >>> index.append(1700000000.0, "/data/file.json", 1024)
+        >>> for i in index.sorted():
+        ...     mtime, path, size = index[i]
+    """
+
+    def __init__(self):
+        self.mtimes = array("d")
+        self.sizes = array("q")
+        self.offsets = array("Q", [0])
+        self.paths = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.mtimes)
+
+    def __getitem__(self, i: int) -> Entry:
+        return self.mtimes[i], self.path(i), self.sizes[i]
+
+    def __iter__(self) -> Iterator[Entry]:
+        """Yields entries in the order they were appended"""
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def nbytes(self) -> int:
+        """Returns bytes allocated by the arrays and the path buffer"""
+        return (
+            self.mtimes.buffer_info()[1] * self.mtimes.itemsize
+            + self.sizes.buffer_info()[1] * self.sizes.itemsize
+            + self.offsets.buffer_info()[1] * self.offsets.itemsize
+            + len(self.paths)
+        )
+
+    def append(self, mtime: float, path: str, size: int) -> None:
+        """Adds a file to the index"""
+        self.paths += path.encode("utf-8", "surrogateescape")
+        self.offsets.append(len(self.paths))
+        self.mtimes.append(mtime)
+        self.sizes.append(size)
+
+    def raw_path(self, i: int) -> bytes:
+        """Returns the encoded path of an entry"""
+        return bytes(self.paths[self.offsets[i] : self.offsets[i + 1]])
+
+    def path(self, i: int) -> str:
+        """Returns the path of an entry"""
+        return self.raw_path(i).decode("utf-8", "surrogateescape")
+
+    def sorted(self) -> array:
+        """Returns positions of the entries ordered by (mtime, path).
+
+        Positions are sorted by mtime alone in chunks of SORT_CHUNK merged into a
+        single array, then only the runs of equal mtimes are sorted by path, so no
+        (mtime, path) key is built per entry and no list spans the whole index.
+        """
+        mtimes, count = self.mtimes, len(self)
+        key = mtimes.__getitem__
+        chunks = [
+            array("Q", sorted(range(start, min(start + SORT_CHUNK, count)), key=key))
+            for start in range(0, count, SORT_CHUNK)
+        ]
+        if len(chunks) == 1:
+            order = chunks.pop()
+        else:
+            order = array("Q", heapq.merge(*chunks, key=key))
+            del chunks
+
+        start = 0
+        while start < count:
+            end, mtime = start + 1, mtimes[order[start]]
+            while end < count and mtimes[order[end]] == mtime:
+                end += 1
+            if end - start > 1:
+                order[start:end] = array("Q", sorted(order[start:end], key=self.path))
+            start = end
+        return order
+
+    def clear(self) -> None:
+        """Removes all entries and releases their memory"""
+        self.__init__()
@@ -1,13 +1,48 @@
 import sqlite3
-from typing import Dict, Any, Optional, List
+import threading
+from typing import Dict, Any, Iterable, Optional, List
 import json
 from pathlib import Path
 
+# keys bound per batched read, below the 999 variables of older SQLite builds
+READ_BATCH = 500
+
+UPSERT = (
+    "INSERT INTO metadata (key, value) VALUES (?, ?) "
+    "ON CONFLICT(key) DO UPDATE SET value = excluded.value, "
+    "updated_at = CURRENT_TIMESTAMP"
+)
+
 
 class SQLiteMetastore:
-    def __init__(self, db_path: str = "metastore.db"):
+    """Key value metadata in a SQLite file, values are stored as json.
+
+    The database is opened in WAL mode, readers do not block the writer, and
+    set_many()/get_many() write or read many keys in a single transaction or
+    query. The connection is shared by threads under a lock.
+
+    Args:
+        db_path (str): The SQLite file (default metastore.db).
+        synchronous (str): SQLite synchronous setting, FULL makes every commit
+            durable on power loss, NORMAL only on a crash of the process
+            (default FULL).
+
+    Example:
+        >>> metastore = SQLiteMetastore("metastore.db")
+        >>> metastore.set_many({"a": {"size": 1}, "b": {"size": 2}})
+        >>> metastore.get_many(["a", "b", "c"])
+        {'a': {'size': 1}, 'b': {'size': 2}}
+    """
+
+    def __init__(self, db_path: str = "metastore.db", synchronous: str = "FULL"):
+        if synchronous.upper() not in ("OFF", "NORMAL", "FULL", "EXTRA"):
+            raise ValueError("synchronous should be OFF, NORMAL, FULL or EXTRA.")
         self.db_path = Path(db_path)
-        self.conn = sqlite3.connect(self.db_path)
+        # closed by __del__ on whichever thread collects the metastore
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA synchronous={synchronous.upper()}")
         self._initialize_db()
 
     def _initialize_db(self):
@@ -15,20 +50,17 @@ class SQLiteMetastore:
         cursor = self.conn.cursor()
 
         # Main metadata table
-        cursor.execute(
-            """
+        cursor.execute("""
         CREATE TABLE IF NOT EXISTS metadata (
             key TEXT PRIMARY KEY,
             value TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
-        """
-        )
+        """)
 
         # Version history table (optional)
-        cursor.execute(
-            """
+        cursor.execute("""
         CREATE TABLE IF NOT EXISTS metadata_versions (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             key TEXT,
@@ -36,8 +68,7 @@ class SQLiteMetastore:
             created_at TIMESTAMP,
             FOREIGN KEY(key) REFERENCES metadata(key)
         )
-        """
-        )
+        """)
 
         self.conn.commit()
 
@@ -45,64 +76,71 @@ class SQLiteMetastore:
         """Store metadata with the given key"""
         value_str = json.dumps(value) if not isinstance(value, str) else value
 
-        cursor = self.conn.cursor()
-
-        # Check if key exists
-        cursor.execute("SELECT 1 FROM metadata WHERE key = ?", (key,))
-        exists = cursor.fetchone()
-
-        if exists:
+        with self._lock, self.conn:
             if versioned:
                 # Save current version to history before updating
-                cursor.execute(
+                self.conn.execute(
                     "INSERT INTO metadata_versions (key, value, created_at) "
                     "SELECT key, value, updated_at FROM metadata WHERE key = ?",
                     (key,),
                 )
-            # Update existing record
-            cursor.execute(
-                "UPDATE metadata SET value = ?, updated_at = CURRENT_TIMESTAMP WHERE key = ?",
-                (value_str, key),
-            )
-        else:
-            # Insert new record
-            cursor.execute(
-                "INSERT INTO metadata (key, value) VALUES (?, ?)", (key, value_str)
-            )
+            self.conn.execute(UPSERT, (key, value_str))
 
-        self.conn.commit()
+    def set_many(self, items: Dict[str, Any]):
+        """Store metadata of many keys in a single transaction"""
+        rows = (
+            (key, json.dumps(value) if not isinstance(value, str) else value)
+            for key, value in items.items()
+        )
+        with self._lock, self.conn:
+            self.conn.executemany(UPSERT, rows)
 
     def get_metadata(self, key: str, default: Optional[Any] = None) -> Any:
         """Retrieve metadata for the given key"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT value FROM metadata WHERE key = ?", (key,))
-        result = cursor.fetchone()
+        with self._lock:
+            result = self.conn.execute(
+                "SELECT value FROM metadata WHERE key = ?", (key,)
+            ).fetchone()
 
         if result:
-            try:
-                return json.loads(result[0])
-            except json.JSONDecodeError:
-                return result[0]
+            return self._loads(result[0])
         return default
 
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """Retrieve metadata of many keys in batched queries, keys without
+        metadata are left out"""
+        keys = list(keys)
+        results = {}
+        with self._lock:
+            for i in range(0, len(keys), READ_BATCH):
+                batch = keys[i : i + READ_BATCH]
+                query = "SELECT key, value FROM metadata WHERE key IN ({})".format(
+                    ",".join("?" * len(batch))
+                )
+                for key, value in self.conn.execute(query, batch):
+                    results[key] = self._loads(value)
+        return results
+
+    @staticmethod
+    def _loads(value: str) -> Any:
+        """Decodes a stored value, plain strings are returned as is"""
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return value
+
     def get_metadata_with_timestamps(self, key: str) -> Optional[Dict[str, Any]]:
         """Retrieve metadata along with timestamps"""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT key, value, created_at, updated_at FROM metadata WHERE key = ?",
-            (key,),
-        )
-        result = cursor.fetchone()
+        with self._lock:
+            result = self.conn.execute(
+                "SELECT key, value, created_at, updated_at FROM metadata WHERE key = ?",
+                (key,),
+            ).fetchone()
 
         if result:
-            try:
-                value = json.loads(result[1])
-            except json.JSONDecodeError:
-                value = result[1]
-
             return {
                 "key": result[0],
-                "value": value,
+                "value": self._loads(result[1]),
                 "created_at": result[2],
                 "updated_at": result[3],
             }
@@ -110,65 +148,46 @@ class SQLiteMetastore:
 
     def get_metadata_versions(self, key: str) -> List[Dict[str, Any]]:
         """Get version history for a key"""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT value, created_at FROM metadata_versions WHERE key = ? ORDER BY created_at DESC",
-            (key,),
-        )
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT value, created_at FROM metadata_versions WHERE key = ? ORDER BY created_at DESC",
+                (key,),
+            ).fetchall()
 
-        versions = []
-        for row in cursor.fetchall():
-            try:
-                value = json.loads(row[0])
-            except json.JSONDecodeError:
-                value = row[0]
-
-            versions.append({"value": value, "created_at": row[1]})
-
-        return versions
+        return [{"value": self._loads(row[0]), "created_at": row[1]} for row in rows]
 
     def search_metadata(self, search_term: str = None) -> Dict[str, Any]:
         """Search metadata using SQL LIKE operator"""
-        cursor = self.conn.cursor()
-
-        if search_term:
-            cursor.execute(
-                "SELECT key, value FROM metadata WHERE value LIKE ?",
-                (f"%{search_term}%",),
-            )
-        else:
-            cursor.execute("SELECT key, value FROM metadata")
+        with self._lock:
+            if search_term:
+                rows = self.conn.execute(
+                    "SELECT key, value FROM metadata WHERE value LIKE ?",
+                    (f"%{search_term}%",),
+                ).fetchall()
+            else:
+                rows = self.conn.execute("SELECT key, value FROM metadata").fetchall()
 
-        results = {}
-        for row in cursor.fetchall():
-            try:
-                value = json.loads(row[1])
-            except json.JSONDecodeError:
-                value = row[1]
-            results[row[0]] = value
-
-        return results
+        return {row[0]: self._loads(row[1]) for row in rows}
 
     def delete_metadata(self, key: str):
         """Remove metadata for the given key"""
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM metadata WHERE key = ?", (key,))
-        cursor.execute("DELETE FROM metadata_versions WHERE key = ?", (key,))
-        self.conn.commit()
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM metadata WHERE key = ?", (key,))
+            self.conn.execute("DELETE FROM metadata_versions WHERE key = ?", (key,))
 
     def list_keys(self) -> List[str]:
         """List all keys in the metastore"""
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT key FROM metadata")
-        return [row[0] for row in cursor.fetchall()]
+        with self._lock:
+            rows = self.conn.execute("SELECT key FROM metadata").fetchall()
+        return [row[0] for row in rows]
 
     def clear(self):
         """Clear all metadata"""
-        cursor = self.conn.cursor()
-        cursor.execute("DELETE FROM metadata")
-        cursor.execute("DELETE FROM metadata_versions")
-        self.conn.commit()
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM metadata")
+            self.conn.execute("DELETE FROM metadata_versions")
 
     def __del__(self):
         """Close the database connection when the object is destroyed"""
-        self.conn.close()
+        if hasattr(self, "conn"):
+            self.conn.close()
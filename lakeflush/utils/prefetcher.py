@@ -0,0 +1,101 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Tuple
+
+
+class Prefetcher:
+    """Fetches the next items ahead on a thread pool while the caller processes
+    the current one, results are yielded in the exact order of the items.
+
+    Fetching is bounded by both the number of items in flight and the bytes
+    buffered: an item is submitted only while fewer than max_items are pending
+    and their size is below max_bytes. The size of a pending item is its fetched
+    result length once done, or size(item) before (0 when size is not given).
+    A fetch may return None for an item the caller reads itself later.
+
+    Args:
+        fetch (Callable): Fetches an item, eg: reads a file, runs on the pool.
+        workers (int): Number of threads fetching items (default 4).
+        max_items (int): Maximum items fetched ahead (default 16).
+        max_bytes (int): Maximum bytes fetched ahead (default 64 MB).
+        size (Callable): Returns the expected size of an item before fetching.
+
+    Example:
+        >>> prefetcher = Prefetcher(read_file, workers=8)
+        >>> for path, future in prefetcher.map(paths):
+        ...     process(path, future.result())
+    """
+
+    def __init__(
+        self,
+        fetch: Callable,
+        workers: int = 4,
+        max_items: int = 16,
+        max_bytes: int = 64 * 1024 * 1024,
+        size: Callable = None,
+    ):
+        if workers < 1:
+            raise ValueError("workers cannot be less than 1.")
+
+        if max_items < 1:
+            raise ValueError("max_items cannot be less than 1.")
+
+        if max_bytes < 1:
+            raise ValueError("max_bytes cannot be less than 1.")
+
+        self.fetch = fetch
+        self.workers = workers
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.size = size
+
+    @staticmethod
+    def _buffered(pending: deque) -> int:
+        """Returns bytes of pending items, fetched length or expected size"""
+        total = 0
+        for _, future, expected in pending:
+            if future.done() and future.exception() is None:
+                total += len(future.result() or ())
+            else:
+                total += expected
+        return total
+
+    def map(self, items: Iterable) -> Iterator[Tuple[object, Future]]:
+        """Fetches items ahead and yields (item, future) in items order, the
+        future result is the fetched item or raises the fetch error.
+
+        Args:
+            items (Iterable): The items to fetch, consumed lazily.
+
+        Returns:
+            Iterator of (item, future) tuples.
+        """
+        items = iter(items)
+        pending = deque()
+        exhausted = False
+        executor = ThreadPoolExecutor(
+            self.workers, thread_name_prefix="lakeflush-prefetch"
+        )
+        try:
+            while True:
+                while (
+                    not exhausted
+                    and len(pending) < self.max_items
+                    and (not pending or self._buffered(pending) < self.max_bytes)
+                ):
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    expected = self.size(item) if self.size else 0
+                    pending.append((item, executor.submit(self.fetch, item), expected))
+
+                if not pending:
+                    return
+                item, future, _ = pending.popleft()
+                yield item, future
+        finally:
+            for _, future, _ in pending:
+                future.cancel()
+            executor.shutdown()
@@ -1,2 +1,3 @@
 from lakeflush.utils.s3.processor import S3Processor
+from lakeflush.utils.s3.lister import S3Lister
 from lakeflush.utils.s3.store import S3Store
@@ -0,0 +1,213 @@
+import os
+import json
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator
+from lakeflush.utils.s3.store import S3Store
+
+
+class S3Lister:
+    """A stateful s3 listing engine, lists objects page by page without ever
+    restarting from the first key.
+
+    The listing is split into streams, a stream lists a prefix and keeps the
+    last key it listed. With workers > 1 the root prefix is listed with the
+    delimiter, every common prefix found becomes a stream of its own and streams
+    are listed concurrently, so disjoint key ranges are listed in parallel.
+    Objects are yielded as pages arrive, not in key order.
+
+    If checkpoint_path is given, the consumer acknowledges every object with
+    done() once it is collected. The streams are saved to it once all objects of
+    a page and of the pages before it are done, and a new lister resumes from it
+    with StartAfter, the pages not fully done are listed again. The checkpoint is
+    removed once all objects are done.
+
+    Args:
+        bucket (str): The s3 bucket to list objects from.
+        prefix (str): The s3 path in bucket to list (default root).
+        page_size (int): Maximum keys of a page (default 1000).
+        workers (int): Number of streams listed concurrently (default 1).
+        checkpoint_path (str): File to save the listing progress to (default None).
+        delimiter (str): Splits keys into common prefixes (default '/').
+
+    Example:
+        >>> lister = S3Lister(bucket, "lake/", workers=8, checkpoint_path="list.json")
+        >>> for obj in lister.objects():
+        ...     collect(obj["Key"])
+        ...     lister.done(obj["Key"])
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = None,
+        page_size: int = 1000,
+        workers: int = 1,
+        checkpoint_path: str = None,
+        delimiter: str = "/",
+    ):
+        if workers < 1:
+            raise ValueError("workers cannot be less than 1.")
+
+        self.bucket = bucket
+        self.prefix = prefix or ""
+        self.page_size = page_size
+        self.workers = workers
+        self.checkpoint_path = checkpoint_path
+        self.delimiter = delimiter
+        self.streams: Dict[str, dict] = {}
+        self._stop = threading.Event()
+        # pages of a stream listed and not done, [remaining, start_after]
+        self._listed: Dict[str, deque] = {}
+        self._page_of: Dict[str, list] = {}
+        self._finished = set()
+
+    def _load(self) -> None:
+        """Loads streams from the checkpoint or starts from the root prefix"""
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, "r") as fp:
+                checkpoint = json.load(fp)
+            if (checkpoint["bucket"], checkpoint["prefix"]) == (
+                self.bucket,
+                self.prefix,
+            ):
+                self.streams = checkpoint["streams"]
+                return
+        self.streams = {}
+        self._add_stream(self.prefix, self.delimiter if self.workers > 1 else None)
+
+    def _save(self) -> None:
+        """Saves streams to the checkpoint atomically, removes it once done"""
+        if not self.checkpoint_path:
+            return
+        if all(stream["done"] for stream in self.streams.values()):
+            if os.path.exists(self.checkpoint_path):
+                os.remove(self.checkpoint_path)
+            return
+        checkpoint = dict(bucket=self.bucket, prefix=self.prefix, streams=self.streams)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w") as fp:
+            json.dump(checkpoint, fp)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _add_stream(self, prefix: str, delimiter: str = None) -> str | None:
+        """Adds a stream, returns its id or None if already known"""
+        stream_id = f"{prefix}|{delimiter or ''}"
+        if stream_id in self.streams:
+            return None
+        self.streams[stream_id] = dict(
+            prefix=prefix, delimiter=delimiter, start_after=None, done=False
+        )
+        return stream_id
+
+    def done(self, key: str) -> None:
+        """Acknowledges an object yielded by objects() as collected"""
+        page = self._page_of.pop(key, None)
+        if page is None:
+            return
+        page[0] -= 1
+        self._advance(page[2])
+
+    def _advance(self, stream_id: str) -> None:
+        """Moves a stream after its pages done in order and saves it"""
+        stream, listed = self.streams[stream_id], self._listed[stream_id]
+        moved = False
+        while listed and listed[0][0] == 0:
+            stream["start_after"] = listed.popleft()[1]
+            moved = True
+        if stream_id in self._finished and not listed and not stream["done"]:
+            stream["done"] = moved = True
+        if moved:
+            self._save()
+
+    def _pages(self, stream: dict) -> Iterator[dict]:
+        """Lists pages of a stream, following the continuation token"""
+        params = dict(Bucket=self.bucket, Prefix=stream["prefix"])
+        params["MaxKeys"] = self.page_size
+        if stream["delimiter"]:
+            params["Delimiter"] = stream["delimiter"]
+        if stream["start_after"]:
+            params["StartAfter"] = stream["start_after"]
+        while True:
+            page = S3Store.list_objects(**params)
+            yield page
+            if not page.get("IsTruncated"):
+                return
+            params.pop("StartAfter", None)
+            params["ContinuationToken"] = page["NextContinuationToken"]
+
+    def _put(self, pages: queue.Queue, item: tuple) -> bool:
+        """Puts an item unless the listing is stopped"""
+        while not self._stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self, stream_id: str, stream: dict, pages: queue.Queue) -> None:
+        """Lists a stream into the pages queue, runs on the pool"""
+        try:
+            for page in self._pages(stream):
+                if not self._put(pages, (stream_id, page)):
+                    return
+            self._put(pages, (stream_id, None))
+        except Exception as ex:
+            self._put(pages, (stream_id, ex))
+
+    def objects(self) -> Iterator[dict]:
+        """Yields listed s3 objects, eg: {'Key': ..., 'Size': ..., ...}"""
+        self._load()
+        self._stop.clear()
+        self._listed = {stream_id: deque() for stream_id in self.streams}
+        self._page_of, self._finished = {}, set()
+        # bounds the pages listed ahead of the consumer
+        pages = queue.Queue(maxsize=self.workers * 2)
+        executor = ThreadPoolExecutor(self.workers, thread_name_prefix="lakeflush-list")
+        active = 0
+        try:
+            for stream_id, stream in list(self.streams.items()):
+                if not stream["done"]:
+                    executor.submit(self._run, stream_id, stream, pages)
+                    active += 1
+
+            while active:
+                stream_id, page = pages.get()
+                stream = self.streams[stream_id]
+                if page is None:
+                    self._finished.add(stream_id)
+                    active -= 1
+                    self._advance(stream_id)
+                    continue
+                if isinstance(page, Exception):
+                    raise page
+
+                last_keys = []
+                for common_prefix in page.get("CommonPrefixes", []):
+                    last_keys.append(common_prefix["Prefix"])
+                    new_id = self._add_stream(common_prefix["Prefix"])
+                    if new_id:
+                        self._listed[new_id] = deque()
+                        executor.submit(self._run, new_id, self.streams[new_id], pages)
+                        active += 1
+                contents = page.get("Contents", [])
+                if contents:
+                    last_keys.append(contents[-1]["Key"])
+                if not last_keys:
+                    continue
+                if not self.checkpoint_path:
+                    yield from contents
+                    continue
+                # once done, a resumed listing starts after the page
+                listed = [len(contents), max(last_keys), stream_id]
+                self._listed[stream_id].append(listed)
+                for obj in contents:
+                    self._page_of[obj["Key"]] = listed
+                self._advance(stream_id)
+                yield from contents
+        finally:
+            self._stop.set()
+            executor.shutdown(cancel_futures=True)
@@ -1,10 +1,13 @@
 import heapq
-import fnmatch
-from typing import Iterator, List
+from typing import Iterator, List, Tuple
 from botocore.exceptions import ClientError
 
-from lakeflush.utils.s3.store import S3Store
+from lakeflush.utils.s3.lister import S3Lister
 from lakeflush.utils.logger import Logger
+from lakeflush.utils.external_sort import ExternalSorter
+from lakeflush.utils.file.order import FileOrder
+from lakeflush.utils.file.filter import FileFilter
+from lakeflush.utils.file.pattern import PatternMatcher
 
 
 class S3Processor:
@@ -12,7 +15,9 @@ class S3Processor:
 
     This class implements an iterator that yields objects from a s3 bucket in
     ascending order of their modification times by batch (oldest first) without
-    loading all objects into memory simultaneously. Supports file pattern matching.
+    loading all objects into memory simultaneously. Supports file pattern matching,
+    the literal prefix common to all patterns, eg: 'logs/2024/' for
+    'logs/2024/*.json', narrows the prefix listed.
     """
 
     def __init__(
@@ -22,6 +27,11 @@ class S3Processor:
         s3_batchsize: int = 1000,
         match_patterns: List[str] = [],
         batch_size: int = 1000,
+        list_workers: int = 1,
+        list_checkpoint: str = None,
+        order: FileOrder = FileOrder.BATCH,
+        sort_run_size: int = 1000000,
+        file_filter: FileFilter = None,
     ):
         """Initialize the file processor.
 
@@ -31,29 +41,49 @@ class S3Processor:
             s3_batchsize (int): Batch size to paginate s3 objects (default 1000)
             match_patterns (List of string): patterns to match object names(default all)
             batch_size (int): Batch size to control number of files (default 1000)
+            list_workers (int): Number of prefixes listed concurrently (default 1)
+            list_checkpoint (str): File to save the listing progress to, objects
+                are acknowledged with done() once collected and a stopped listing
+                resumes after them, not supported with order 'global' (default None)
+            order (FileOrder): 'batch' orders objects within a batch, 'global'
+                orders all objects (default 'batch')
+            sort_run_size (int): Objects sorted in memory for order 'global', more
+                are spilled to disk and merged (default 1000000)
+            file_filter (FileFilter): Selects objects by age, mtime window and size
+                from their listing (default skips empty objects)
         """
-        self.paginator = S3Store.paginator()
-        self.pg_params = dict(
-            Bucket=bucket, PaginationConfig={"PageSize": s3_batchsize}
+        if list_checkpoint and FileOrder(order) == FileOrder.GLOBAL:
+            # all objects are listed before the first one is collected
+            raise ValueError("list_checkpoint is not supported with order 'global'.")
+
+        self.matcher = PatternMatcher(match_patterns)
+        self.lister = S3Lister(
+            bucket,
+            self._list_prefix(prefix or "", self.matcher.prefix),
+            page_size=s3_batchsize,
+            workers=list_workers,
+            checkpoint_path=list_checkpoint,
         )
-        if prefix:
-            self.pg_params["Prefix"] = prefix
         self.batch_size = batch_size
         self.match_patterns = tuple(match_patterns)
+        self.order = FileOrder(order)
+        self.sorter = ExternalSorter(sort_run_size)
+        self.file_filter = file_filter or FileFilter()
         self._heap = []
+        self._scanner = None
+        self._sorted = None
+
+    @staticmethod
+    def _list_prefix(prefix: str, pattern_prefix: str) -> str:
+        """Returns the longer of prefix and the literal prefix of patterns, when
+        one extends the other."""
+        if pattern_prefix.startswith(prefix):
+            return pattern_prefix
+        return prefix
 
     def _should_match(self, object_key: str) -> bool:
         """Check if s3 object key matches inclusion criteria."""
-        if not self.match_patterns:
-            return True
-
-        # Check patterns
-        pattern_match = any(
-            fnmatch.fnmatch(object_key, pattern) for pattern in self.match_patterns
-        )
-        if not pattern_match:
-            return False
-        return True
+        return self.matcher.match(object_key)
 
     def __iter__(self) -> Iterator:
         """Initialize the iterator"""
@@ -68,16 +98,63 @@ class S3Processor:
         Raises:
             StopIteration: When no more s3 object remain to process
         """
+        return self._next_object()[0]
+
+    def objects(self) -> Iterator[Tuple[str, int, float]]:
+        """Yields s3 objects (key, size, mtime) in modification time order"""
+        while True:
+            try:
+                yield self._next_object()
+            except StopIteration:
+                return
+
+    def done(self, object_key: str) -> None:
+        """Acknowledges an object as collected, a stopped listing resumes after
+        the objects done"""
+        self.lister.done(object_key)
+
+    def _next_object(self) -> Tuple[str, int, float]:
+        """Get the next object (key, size, mtime) in modification time order"""
+        if self._scanner is None:
+            # listing continues where the previous batch stopped
+            self._scanner = self._scan()
+
+        if self.order == FileOrder.GLOBAL:
+            if self._sorted is None:
+                self._sorted = self.sorter.sort(self._scanner)
+            mtime, object_key, size = next(self._sorted)
+            return object_key, size, mtime
+
         while True:
             # Try to get next object key from heap
             if self._heap:
-                mtime, object_key = heapq.heappop(self._heap)
-                return object_key
+                mtime, object_key, size = heapq.heappop(self._heap)
+                return object_key, size, mtime
 
             # Need to scan more path
             if not self._load_next_batch():
                 raise StopIteration
 
+    def _scan(self) -> Iterator[Tuple[float, str, int]]:
+        """Lists matched s3 objects as (mtime, key, size)"""
+        self.file_filter.begin()
+        try:
+            for obj in self.lister.objects():
+                mtime = obj["LastModified"].timestamp()
+                if (
+                    obj["Key"].endswith("/")
+                    or not self._should_match(obj["Key"])
+                    or not self.file_filter.match(mtime, obj["Size"])
+                ):
+                    # never collected, done once listed
+                    self.lister.done(obj["Key"])
+                    continue
+                yield mtime, obj["Key"], obj["Size"]
+        except ClientError as ex:
+            Logger.error(f"s3_client error: {ex}")
+        except Exception as ex:
+            Logger.error(f"unexpected error: {str(ex)}")
+
     def _load_next_batch(self) -> bool:
         """Scan s3 directories to populate the processing heap.
 
@@ -88,23 +165,10 @@ class S3Processor:
         Returns:
             bool: True if files are available in heap, False if processing complete
         """
-        try:
-            for page in self.paginator.paginate(**self.pg_params):
-                for obj in page.get("Contents", []):
-                    if obj["Key"].endswith("/"):
-                        continue
-                    if not self._should_match(obj["Key"]):
-                        continue
-
-                    heapq.heappush(self._heap, (obj["LastModified"], obj["Key"]))
-                    # Control memory usage using batch
-                    if len(self._heap) > self.batch_size:
-                        return True
-        except ClientError as ex:
-            Logger.error(f"s3_client error: {ex}")
-        except StopIteration:
-            Logger.info("all s3 objects listed")
-        except Exception as ex:
-            Logger.error(f"unexpected error: {str(ex)}")
+        for mtime, object_key, size in self._scanner:
+            heapq.heappush(self._heap, (mtime, object_key, size))
+            # Control memory usage using batch
+            if len(self._heap) > self.batch_size:
+                return True
 
         return len(self._heap) > 0
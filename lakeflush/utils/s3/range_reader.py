@@ -0,0 +1,94 @@
+from contextlib import closing
+from typing import Iterable, Iterator
+from lakeflush.utils.prefetcher import Prefetcher
+from lakeflush.utils.s3.store import S3Store
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Yields lines without line endings from chunks split anywhere"""
+    rest = b""
+    for chunk in chunks:
+        lines = (rest + chunk).splitlines(keepends=True)
+        # the last line may continue in the next chunk
+        rest = lines.pop() if lines and not lines[-1].endswith(b"\n") else b""
+        for line in lines:
+            yield line.rstrip(b"\r\n")
+    if rest:
+        yield rest.rstrip(b"\r")
+
+
+def iter_blocks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Yields blocks of whole lines from chunks split anywhere, without the last
+    line ending"""
+    rest = b""
+    for chunk in chunks:
+        block = rest + chunk
+        end = block.rfind(b"\n")
+        if end < 0:
+            rest = block
+            continue
+        rest = block[end + 1 :]
+        if end:
+            yield block[:end]
+    if rest:
+        yield rest
+
+
+class S3RangeReader:
+    """Reads large s3 objects as concurrent byte range GETs, the ranges are
+    yielded in order so the object streams into the collector without being
+    held in memory at once.
+
+    Args:
+        bucket (str): The s3 bucket of the objects.
+        cutoff (int): Objects of at least cutoff bytes are read in ranges.
+        part_size (int): Bytes of a range (default 8 MB).
+        workers (int): Number of ranges fetched concurrently (default 4).
+        max_parts (int): Maximum ranges fetched ahead (default 8).
+
+    Example:
+        >>> reader = S3RangeReader(bucket, cutoff=64 * 1024 * 1024)
+        >>> for chunk in reader.chunks(object_key, size):
+        ...     process(chunk)
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        cutoff: int,
+        part_size: int = 8 * 1024 * 1024,
+        workers: int = 4,
+        max_parts: int = 8,
+    ):
+        if part_size < 1:
+            raise ValueError("part_size cannot be less than 1.")
+
+        self.bucket = bucket
+        self.cutoff = cutoff
+        self.part_size = part_size
+        self.prefetcher = Prefetcher(
+            self._fetch,
+            workers=workers,
+            max_items=max_parts,
+            max_bytes=part_size * max_parts,
+            size=lambda part: part[2] - part[1] + 1,
+        )
+
+    def ranged(self, size: int) -> bool:
+        """Checks if an object of size bytes is read in ranges"""
+        return size is not None and self.cutoff > 0 and size >= self.cutoff
+
+    def _fetch(self, part: tuple) -> bytes:
+        object_key, start, end = part
+        res = S3Store.get(self.bucket, object_key, (start, end))
+        with closing(res["Body"]) as stream:
+            return stream.read()
+
+    def chunks(self, object_key: str, size: int) -> Iterator[bytes]:
+        """Yields the object content in order, range by range"""
+        parts = (
+            (object_key, start, min(start + self.part_size, size) - 1)
+            for start in range(0, size, self.part_size)
+        )
+        for _, future in self.prefetcher.map(parts):
+            yield future.result()
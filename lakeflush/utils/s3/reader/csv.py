@@ -1,38 +1,66 @@
 import time
+from contextlib import closing
 from lakeflush.utils.s3.store import S3Store
+from lakeflush.utils.s3.range_reader import S3RangeReader, iter_lines
 
 
 class S3CSVFileReader:
     """Reads csv file and processes the content further"""
 
-    def __init__(self, header: bool, bucket: str, batch_size=100) -> None:
+    def __init__(
+        self,
+        header: bool,
+        bucket: str,
+        batch_size=100,
+        range_reader: S3RangeReader = None,
+    ) -> None:
         self.header = header
         self.header_data = None
         self.batch_size = batch_size
         self.bucket = bucket
+        self.range_reader = range_reader
 
-    def read(self, object_key: str):
+    def fetch(self, object_key: str) -> bytes:
+        """Reads the object content, can run ahead on another thread"""
         res = S3Store.get(self.bucket, object_key)
-        with res["Body"] as stream:
-            lines = stream.iter_lines()
-            if self.header:
-                if not self.header_data:
-                    # Store header
-                    self.header_data = next(lines).strip()
-                    yield self.header_data
-                else:
-                    # Skip header
-                    next(lines)
-
-            # Process in batch_size
-            batch = []
-            for line in lines:
-                batch.append(line)
-                if len(batch) >= self.batch_size:
-                    yield "".join(batch).strip()
-                    batch = []
-                    # relax CPU
-                    time.sleep(0.001)
-
-            if batch:
-                yield "".join(batch).strip()
+        with closing(res["Body"]) as stream:
+            return stream.read()
+
+    def _lines(self, object_key: str, content: bytes = None, size: int = None):
+        """Yields object lines without line endings"""
+        if content is not None:
+            yield from content.splitlines()
+            return
+        if self.range_reader and self.range_reader.ranged(size):
+            yield from iter_lines(self.range_reader.chunks(object_key, size))
+            return
+        res = S3Store.get(self.bucket, object_key)
+        with closing(res["Body"]) as stream:
+            yield from stream.iter_lines()
+
+    def read(self, object_key: str, content: bytes = None, size: int = None):
+        """Yields the object rows in batches, content fetched ahead is used if
+        given. Large objects are streamed in lines read in ranges"""
+        lines = self._lines(object_key, content, size)
+        if self.header:
+            if not self.header_data:
+                # Store header
+                self.header_data = next(lines).strip()
+                yield self.header_data
+            else:
+                # Skip header
+                next(lines)
+
+        # Process in batch_size
+        batch = []
+        for line in lines:
+            batch.append(line)
+            if len(batch) >= self.batch_size:
+                # lines are bytes without line endings
+                yield b"\n".join(batch).strip()
+                batch = []
+                # relax CPU
+                time.sleep(0.001)
+
+        if batch:
+            yield b"\n".join(batch).strip()
@@ -1,15 +1,29 @@
+from contextlib import closing
 from lakeflush.utils.s3.store import S3Store
+from lakeflush.utils.s3.range_reader import S3RangeReader, iter_blocks
 
 
 class S3JSONFileReader:
     """Reads json fle and processes the content further"""
 
-    def __init__(self, bucket: str) -> None:
+    def __init__(self, bucket: str, range_reader: S3RangeReader = None) -> None:
         # added for common check
         self.header_data = None
         self.bucket = bucket
+        self.range_reader = range_reader
 
-    def read(self, object_key: str):
+    def fetch(self, object_key: str) -> bytes:
+        """Reads the object content, can run ahead on another thread"""
         res = S3Store.get(self.bucket, object_key)
-        if "Body" in res:
-            yield res["Body"].read()
+        with closing(res["Body"]) as stream:
+            return stream.read()
+
+    def read(self, object_key: str, content: bytes = None, size: int = None):
+        """Yields the object content, content fetched ahead is used if given.
+        Large objects are streamed in blocks of whole lines read in ranges"""
+        if content is None and self.range_reader and self.range_reader.ranged(size):
+            yield from iter_blocks(self.range_reader.chunks(object_key, size))
+            return
+        data = self.fetch(object_key) if content is None else content
+        if data:
+            yield data
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Tuple
 import boto3
 from botocore.client import BaseClient
 from botocore.exceptions import ClientError
@@ -10,15 +11,21 @@ class S3Store:
     __client__: BaseClient
 
     @classmethod
-    def setup(cls):
-        """Setups s3 client"""
-        cls.__client__ = boto3.client("s3")
+    def setup(cls, **client_kwargs):
+        """Setups s3 client, client_kwargs are passed to boto3 client
+        eg: endpoint_url of a local s3 stand-in"""
+        cls.__client__ = boto3.client("s3", **client_kwargs)
 
     @classmethod
     def paginator(cls):
         """Returns s3 list paginator from client"""
         return cls.__client__.get_paginator("list_objects_v2")
 
+    @classmethod
+    def list_objects(cls, **params) -> dict:
+        """Lists a page of objects stored in s3 bucket, params of list_objects_v2."""
+        return cls.__client__.list_objects_v2(**params)
+
     @classmethod
     def exists(cls, bucket: str) -> bool:
         """
@@ -33,15 +40,21 @@ class S3Store:
             return False
 
     @classmethod
-    def get(cls, bucket: str, key: str) -> dict:
+    def get(cls, bucket: str, key: str, byte_range: Tuple[int, int] = None) -> dict:
         """
-        Get the object stored in s3 bucket.
+        Get the object stored in s3 bucket, or the inclusive byte range of it.
 
         :return dict: s3 reposne object.
         """
+        if byte_range:
+            return cls.__client__.get_object(
+                Bucket=bucket, Key=key, Range=f"bytes={byte_range[0]}-{byte_range[1]}"
+            )
         return cls.__client__.get_object(Bucket=bucket, Key=key)
 
     @classmethod
-    def upload(cls, file_path: Path, bucket: str, key: str):
+    def upload(cls, file_path: Path, bucket: str, key: str, extra_args: dict = None):
         """Uploads the file to s3 bucket."""
-        return cls.__client__.upload_file(Filename=file_path, Bucket=bucket, Key=key)
+        return cls.__client__.upload_file(
+            Filename=file_path, Bucket=bucket, Key=key, ExtraArgs=extra_args
+        )
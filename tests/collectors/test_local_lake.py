@@ -1,7 +1,10 @@
 import pytest
 from datetime import datetime, timedelta
 import os
-from lakeflush.utils.file import FileType
+import gzip
+import time
+import threading
+from lakeflush.utils.file import FileType, FileOrder
 from lakeflush.collectors import LocalLakeCollector
 from tests.lakes.random_datalake import create_random_datalake
 
@@ -15,7 +18,12 @@ def collector_args(tmp_path):
 @pytest.fixture
 def collect(mocker):
     """collect mock"""
-    yield mocker.patch("lakeflush.core.collector.Collector.collect")
+    yield mocker.patch("lakeflush.core.collector.Collector.collect_many")
+
+
+def collected(collect) -> int:
+    """number of records collected in batches"""
+    return sum(len(call.args[0]) for call in collect.call_args_list)
 
 
 class TestLocalLakeCollector:
@@ -60,7 +68,7 @@ class TestLocalLakeCollector:
         collector = LocalLakeCollector(file_path, **collector_args)
         collector.start()
 
-        assert collect.call_count == 20
+        assert collected(collect) == 20
 
     @pytest.mark.parametrize(
         "locallake_args",
@@ -98,7 +106,7 @@ class TestLocalLakeCollector:
         )
         collector.start()
 
-        assert collect.call_count == 0
+        assert collected(collect) == 0
 
     @pytest.mark.parametrize(
         "csv_header",
@@ -132,6 +140,371 @@ class TestLocalLakeCollector:
         collector.start()
 
         if csv_header:
-            assert collect.call_count == 5
+            assert collected(collect) == 5
         else:
-            assert collect.call_count == 8
+            assert collected(collect) == 8
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_collection_passthrough(self, compress, collector_args, tmp_path):
+        """
+        Test the local lake collector appending files as is in passthrough mode.
+        """
+
+        file_path = tmp_path / "locallake" / "year=2024"
+        os.makedirs(file_path)
+        contents = ['{"id": 1}\n{"id": 2}\n', '{"id": 3}', "", '{"id": 4}\n']
+        for i, content in enumerate(contents):
+            path = file_path / f"{i}.json"
+            path.write_text(content)
+            os.utime(path, (1000 + i, 1000 + i))
+        collector = LocalLakeCollector(
+            tmp_path / "locallake",
+            passthrough=True,
+            compress=compress,
+            **collector_args,
+        )
+        collector.start()
+        collector.close()
+
+        bundle = tmp_path / "testfile.lakeflush.inprogress"
+        if compress:
+            with gzip.open(f"{bundle}.gz", "rt") as f:
+                data = f.read()
+        else:
+            data = bundle.read_text()
+        assert data == '{"id": 1}\n{"id": 2}\n{"id": 3}\n{"id": 4}\n'
+        with pytest.raises(ValueError):
+            LocalLakeCollector(
+                tmp_path / "locallake",
+                file_type=FileType.CSV,
+                csv_header=True,
+                passthrough=True,
+                **collector_args,
+            )
+
+    @pytest.mark.parametrize("file_type", ["json", "csv"])
+    def test_collection_prefetch(self, file_type, collector_args, tmp_path):
+        """
+        Test the local lake collector reading files ahead in modification order.
+        """
+
+        file_path = tmp_path / "locallake"
+        os.makedirs(file_path)
+        for i in range(20):
+            path = file_path / f"{i}.{file_type}"
+            path.write_text(f"{i}\n")
+            # creation order differs from modification order
+            os.utime(path, (1000 + (i * 7) % 20, 1000 + (i * 7) % 20))
+        collector = LocalLakeCollector(
+            file_path,
+            file_type=file_type,
+            prefetch_workers=3,
+            prefetch_files=4,
+            prefetch_mb=1,
+            **collector_args,
+        )
+        collector.start()
+        collector.close()
+
+        data = (tmp_path / "testfile.lakeflush.inprogress").read_text()
+        expected = sorted(range(20), key=lambda i: (i * 7) % 20)
+        assert data.split() == [str(i) for i in expected]
+
+    def test_collection_prefetch_mb(self, collector_args, tmp_path):
+        """
+        Test the local lake collector reading ahead no more than prefetch_mb.
+        """
+
+        file_path = tmp_path / "locallake"
+        os.makedirs(file_path)
+        record = "x" * (300 * 1024 - 1) + "\n"
+        for i in range(12):
+            (file_path / f"{i}.json").write_text(record)
+        collector = LocalLakeCollector(
+            file_path,
+            prefetch_workers=8,
+            prefetch_files=16,
+            prefetch_mb=1,
+            max_size_mb=8,
+            **collector_args,
+        )
+        fetch = collector.reader.fetch
+        lock = threading.Lock()
+        in_flight = []
+
+        def slow_fetch(path):
+            with lock:
+                in_flight.append(os.path.getsize(path))
+                peak.append(sum(in_flight))
+            time.sleep(0.05)
+            with lock:
+                in_flight.remove(os.path.getsize(path))
+            return fetch(path)
+
+        peak = []
+        collector.reader.fetch = slow_fetch
+        collector.start()
+        collector.close()
+
+        data = (tmp_path / "testfile.lakeflush.inprogress").read_text()
+        assert data.split() == [record.strip()] * 12
+        # a file is read ahead while fewer than prefetch_mb are in flight
+        assert max(peak) < 1024 * 1024 + len(record)
+
+    def test_collection_global_order(self, collector_args, tmp_path):
+        """
+        Test the local lake collector collecting all files strictly oldest first.
+        """
+
+        file_path = tmp_path / "locallake"
+        mtimes = {}
+        for i in range(30):
+            path = file_path / f"part={i % 4}" / f"{i}.json"
+            os.makedirs(path.parent, exist_ok=True)
+            path.write_text(f"{i}\n")
+            mtimes[i] = 1000 + (i * 7) % 30
+            os.utime(path, (mtimes[i], mtimes[i]))
+        collector = LocalLakeCollector(
+            file_path,
+            batch_size=2,
+            order=FileOrder.GLOBAL,
+            sort_run_size=4,
+            **collector_args,
+        )
+        collector.start()
+        collector.close()
+
+        data = (tmp_path / "testfile.lakeflush.inprogress").read_text()
+        assert data.split() == [str(i) for i in sorted(mtimes, key=mtimes.get)]
+        assert collector.processor.sorter.runs == 8
+
+    @pytest.mark.parametrize("order", ["batch", "global"])
+    def test_collection_scan_workers(self, order, collector_args, tmp_path):
+        """
+        Test the local lake collector scanning directories concurrently.
+        """
+
+        file_path = tmp_path / "locallake"
+        mtimes = {}
+        for i in range(40):
+            path = file_path / f"year={i % 2}" / f"month={i % 3}" / f"{i}.json"
+            os.makedirs(path.parent, exist_ok=True)
+            path.write_text(f"{i}\n")
+            mtimes[i] = 1000 + (i * 7) % 40
+            os.utime(path, (mtimes[i], mtimes[i]))
+        collector = LocalLakeCollector(
+            file_path, order=order, scan_workers=3, **collector_args
+        )
+        collector.start()
+        collector.close()
+
+        data = (tmp_path / "testfile.lakeflush.inprogress").read_text().split()
+        assert sorted(data) == sorted(str(i) for i in mtimes)
+        if order == "global":
+            assert data == [str(i) for i in sorted(mtimes, key=mtimes.get)]
+        with pytest.raises(ValueError):
+            LocalLakeCollector(file_path, scan_workers=0, **collector_args)
+
+    @pytest.mark.parametrize("scan_workers", [1, 3])
+    def test_collection_scan_cache(
+        self, scan_workers, collector_args, tmp_path, mocker
+    ):
+        """
+        Test the local lake collector rescanning only changed directories, and
+        files not collected.
+        """
+
+        file_path = tmp_path / "locallake"
+        for i in range(12):
+            path = file_path / f"day={i % 2}" / f"hour={i % 3}" / f"{i}.json"
+            os.makedirs(path.parent, exist_ok=True)
+            path.write_text(f"{i}\n")
+        for root, dirs, files in os.walk(file_path):
+            # directories not modified since long before the scan
+            os.utime(root, (1000, 1000))
+        args = dict(scan_workers=scan_workers, scan_cache=str(tmp_path / "scan.db"))
+        collector = LocalLakeCollector(file_path, **args, **collector_args)
+        collector.start()
+        collector.close()
+        data = (tmp_path / "testfile.lakeflush.inprogress").read_text().split()
+        assert sorted(data) == sorted(str(i) for i in range(12))
+
+        (file_path / "day=1" / "hour=2" / "new.json").write_text("new\n")
+        # a file failing to be read is not cached as seen
+        collector = LocalLakeCollector(file_path, **args, **collector_args)
+        mocker.patch.object(collector.reader, "read", side_effect=OSError)
+        collector.start()
+        collector.close()
+        data = (tmp_path / "testfile.lakeflush.inprogress").read_text().split()
+        assert len(data) == 12
+
+        scandir = mocker.spy(os, "scandir")
+        collector = LocalLakeCollector(file_path, **args, **collector_args)
+        collector.start()
+        collector.close()
+        data = (tmp_path / "testfile.lakeflush.inprogress").read_text().split()
+        assert data[12:] == ["new"]
+        listed = [call.args[0] for call in scandir.call_args_list]
+        assert [path for path in listed if str(file_path) in path] == [
+            str(file_path / "day=1" / "hour=2")
+        ]
+
+    @pytest.mark.parametrize("scan_workers", [1, 3])
+    def test_collection_path_pattern(
+        self, scan_workers, collector_args, tmp_path, mocker
+    ):
+        """
+        Test the local lake collector matching paths and pruning directories.
+        """
+
+        file_path = tmp_path / "locallake"
+        for year in (2023, 2024):
+            for month in (1, 2):
+                path = file_path / f"year={year}" / f"month={month}"
+                os.makedirs(path)
+                (path / "0.json").write_text(f"{year}-{month}\n")
+                (path / "1.csv").write_text(f"{year}-{month}\n")
+        scandir = mocker.spy(os, "scandir")
+        collector = LocalLakeCollector(
+            file_path,
+            match_patterns=["year=2024/*.json"],
+            scan_workers=scan_workers,
+            **collector_args,
+        )
+        collector.start()
+        collector.close()
+
+        data = (tmp_path / "testfile.lakeflush.inprogress").read_text()
+        assert sorted(data.split()) == ["2024-1", "2024-2"]
+        listed = [str(call.args[0]) for call in scandir.call_args_list]
+        assert not [path for path in listed if "year=2023" in path]
+
+    def test_collection_filters(self, collector_args, tmp_path):
+        """
+        Test the local lake collector skipping young, empty, large and out of
+        window files from their stat.
+        """
+
+        file_path = tmp_path / "locallake"
+        os.makedirs(file_path)
+        now = time.time()
+        files = dict(
+            old=(now - 7200, "old\n"),
+            empty=(now - 7200, ""),
+            large=(now - 7200, "large" * 1024),
+            young=(now, "young\n"),
+            ancient=(now - 86400 * 2, "ancient\n"),
+        )
+        for name, (mtime, content) in files.items():
+            (file_path / f"{name}.json").write_text(content)
+            os.utime(file_path / f"{name}.json", (mtime, mtime))
+        collector = LocalLakeCollector(
+            file_path,
+            min_age_secs=60,
+            modified_after=datetime.fromtimestamp(now - 86400),
+            max_file_mb=0.001,
+            **collector_args,
+        )
+        collector.start()
+        collector.close()
+
+        data = (tmp_path / "testfile.lakeflush.inprogress").read_text()
+        assert data.split() == ["old"]
+        with pytest.raises(ValueError):
+            LocalLakeCollector(file_path, min_age_secs=-1, **collector_args)
+
+    @pytest.mark.parametrize(
+        "file_type,files,lines,crash_at",
+        [("json", 12, 15000, 8), ("csv", 40, 2000, 500)],
+    )
+    @pytest.mark.parametrize("crash", ["collect", "rename"])
+    def test_collection_checkpoint(
+        self, file_type, files, lines, crash_at, crash, collector_args, tmp_path
+    ):
+        """
+        Test the local lake collector resuming after a crash from its checkpoint,
+        every line is collected exactly once.
+        """
+
+        file_path = tmp_path / "locallake"
+        os.makedirs(file_path)
+        expected = []
+        for i in range(files):
+            rows = [f"file{i:03d}-line{j:05d}" for j in range(lines)]
+            (file_path / f"{i:03d}.{file_type}").write_text("\n".join(rows) + "\n")
+            # pairs of files share an mtime
+            os.utime(file_path / f"{i:03d}.{file_type}", (1000 + i // 2,) * 2)
+            expected += rows
+        args = dict(
+            file_type=file_type,
+            order="global",
+            collect_batch_size=1,
+            fsync=True,
+            checkpoint=str(tmp_path / "checkpoint.db"),
+        )
+
+        collector = LocalLakeCollector(file_path, **args, **collector_args)
+        records, read = [0], collector.reader.read
+        commit = collector.writer.commit_callback
+
+        def crash_read(*read_args):
+            for data in read(*read_args):
+                records[0] += 1
+                if crash == "collect" and records[0] == crash_at:
+                    raise KeyboardInterrupt
+                yield data
+
+        def crash_commit(*commit_args):
+            commit(*commit_args)
+            # committed, the bundle is not renamed yet
+            raise KeyboardInterrupt
+
+        collector.reader.read = crash_read
+        if crash == "rename":
+            collector.writer.commit_callback = crash_commit
+        with pytest.raises(KeyboardInterrupt):
+            collector.start()
+
+        collector = LocalLakeCollector(file_path, **args, **collector_args)
+        collector.start()
+        collector.close()
+
+        collected = []
+        for bundle in tmp_path.glob("testfile.*.lakeflush.collected"):
+            collected += bundle.read_text().split()
+        collected += (tmp_path / "testfile.lakeflush.inprogress").read_text().split()
+        assert sorted(collected) == expected
+        with pytest.raises(ValueError):
+            LocalLakeCollector(file_path, checkpoint="cp.db", **collector_args)
+        with pytest.raises(ValueError):
+            LocalLakeCollector(
+                file_path, order="global", checkpoint="cp.db", **collector_args
+            )
+        assert not os.path.exists("cp.db")
+
+    @pytest.mark.parametrize("sort_run_size", [3, 100])
+    def test_collection_global_order_ties(
+        self, collector_args, tmp_path, sort_run_size
+    ):
+        """
+        Test the local lake collector ordering files of equal mtime by path.
+        """
+
+        file_path = tmp_path / "locallake"
+        os.makedirs(file_path)
+        names = [f"{chr(ord('a') + (i * 5) % 12)}.json" for i in range(12)]
+        for i, name in enumerate(names):
+            (file_path / name).write_text(f"{name}\n")
+            os.utime(file_path / name, (1000 + i % 2, 1000 + i % 2))
+        collector = LocalLakeCollector(
+            file_path,
+            order=FileOrder.GLOBAL,
+            sort_run_size=sort_run_size,
+            **collector_args,
+        )
+        collector.start()
+        collector.close()
+
+        data = (tmp_path / "testfile.lakeflush.inprogress").read_text()
+        expected = sorted(names[0::2]) + sorted(names[1::2])
+        assert data.split() == expected
@@ -0,0 +1,319 @@
+import pytest
+from datetime import datetime, timedelta
+
+boto3 = pytest.importorskip("boto3")
+moto_server = pytest.importorskip("moto.server")
+
+from lakeflush.collectors import S3LakeCollector  # noqa: E402
+from lakeflush.utils.s3 import S3Lister, S3Store  # noqa: E402
+
+BUCKET = "testlake"
+
+
+@pytest.fixture(scope="module")
+def endpoint_url():
+    """local s3 stand-in"""
+    server = moto_server.ThreadedMotoServer(port=0, verbose=False)
+    server.start()
+    host, port = server.get_host_and_port()
+    yield f"http://{host}:{port}"
+    server.stop()
+
+
+@pytest.fixture
+def s3_lake(endpoint_url, monkeypatch):
+    """s3 client of an empty bucket"""
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    client = boto3.client("s3", endpoint_url=endpoint_url)
+    client.create_bucket(Bucket=BUCKET)
+    yield client
+    for page in client.get_paginator("list_objects_v2").paginate(Bucket=BUCKET):
+        for obj in page.get("Contents", []):
+            client.delete_object(Bucket=BUCKET, Key=obj["Key"])
+    client.delete_bucket(Bucket=BUCKET)
+
+
+def put_objects(client, keys_bodies, mocker):
+    """puts objects with increasing modification time"""
+    now = datetime(2024, 1, 1)
+    for i, (key, body) in enumerate(keys_bodies):
+        mocker.patch("moto.s3.models.utcnow", return_value=now + timedelta(seconds=i))
+        client.put_object(Bucket=BUCKET, Key=key, Body=body)
+    mocker.stopall()
+
+
+class TestS3LakeCollector:
+    @pytest.mark.parametrize("fetch_workers", [0, 4])
+    def test_collection(self, fetch_workers, s3_lake, endpoint_url, tmp_path, mocker):
+        """
+        Test the s3 lake collector fetching objects concurrently in mtime order.
+        """
+
+        # keys are not in modification order
+        keys = [f"lake/{(i * 7) % 20}.json" for i in range(20)]
+        put_objects(s3_lake, [(key, f"{key}\n") for key in keys], mocker)
+        collector = S3LakeCollector(
+            BUCKET,
+            prefix="lake/",
+            fetch_workers=fetch_workers,
+            fetch_objects=3,
+            fetch_mb=1,
+            client_kwargs=dict(endpoint_url=endpoint_url),
+            filepath=tmp_path,
+            filename="testfile",
+        )
+        collector.start()
+        collector.close()
+
+        data = (tmp_path / "testfile.lakeflush.inprogress").read_text()
+        assert data.split() == keys
+
+    @pytest.mark.parametrize("fetch_workers", [0, 2])
+    def test_collection_csv(
+        self, fetch_workers, s3_lake, endpoint_url, tmp_path, mocker
+    ):
+        """
+        Test the s3 lake collector collecting csv objects with header.
+        """
+
+        bodies = [b"id,name\n1,a\n2,b\n", b"id,name\r\n3,c\r\n4,d"]
+        put_objects(s3_lake, zip(["0.csv", "1.csv"], bodies), mocker)
+        collector = S3LakeCollector(
+            BUCKET,
+            file_type="csv",
+            csv_header=True,
+            fetch_workers=fetch_workers,
+            client_kwargs=dict(endpoint_url=endpoint_url),
+            filepath=tmp_path,
+            filename="testfile",
+        )
+        collector.start()
+        collector.close()
+
+        data = (tmp_path / "testfile.lakeflush.inprogress").read_bytes()
+        assert data == b"id,name\n1,a\n2,b\n3,c\n4,d\n"
+
+    @pytest.mark.parametrize("file_type", ["json", "csv"])
+    def test_collection_ranged(
+        self, file_type, s3_lake, endpoint_url, tmp_path, mocker
+    ):
+        """
+        Test the s3 lake collector streaming large objects in byte ranges.
+        """
+
+        line = b"1234567,lakeflush,large object line\r\n"
+        large = line * (3 * 1024 * 1024 // len(line))  # ~3 MB
+        bodies = [b"small,0\n", large, b"small,1"]
+        put_objects(
+            s3_lake, zip([f"{i}.{file_type}" for i in range(3)], bodies), mocker
+        )
+        get = mocker.spy(S3Store, "get")
+        collector = S3LakeCollector(
+            BUCKET,
+            file_type=file_type,
+            fetch_workers=2,
+            range_cutoff_mb=1,
+            range_part_mb=1,
+            range_workers=2,
+            client_kwargs=dict(endpoint_url=endpoint_url),
+            filepath=tmp_path,
+            filename="testfile",
+            max_size_mb=16,
+        )
+        collector.start()
+        collector.close()
+
+        data = (tmp_path / "testfile.lakeflush.inprogress").read_bytes()
+        lines = [line for line in data.splitlines() if line]
+        assert lines == [b"small,0"] + large.splitlines() + [b"small,1"]
+        ranges = [call.args[2] for call in get.call_args_list if len(call.args) > 2]
+        assert len(ranges) == 3
+
+    def test_collection_global_order(self, s3_lake, endpoint_url, tmp_path, mocker):
+        """
+        Test the s3 lake collector collecting all objects strictly oldest first.
+        """
+
+        keys = [f"lake/{(i * 7) % 20}.json" for i in range(20)]
+        put_objects(s3_lake, [(key, f"{key}\n") for key in keys], mocker)
+        collector = S3LakeCollector(
+            BUCKET,
+            prefix="lake/",
+            batch_size=2,
+            order="global",
+            sort_run_size=3,
+            client_kwargs=dict(endpoint_url=endpoint_url),
+            filepath=tmp_path,
+            filename="testfile",
+        )
+        collector.start()
+        collector.close()
+
+        data = (tmp_path / "testfile.lakeflush.inprogress").read_text()
+        assert data.split() == keys
+        assert collector.processor.sorter.runs == 7
+
+    @pytest.mark.parametrize("buffer_size", [0, 1024 * 1024])
+    def test_collection_list_checkpoint(
+        self, buffer_size, s3_lake, endpoint_url, tmp_path, mocker
+    ):
+        """
+        Test that a stopped collection resumes its listing after the objects
+        collected, objects listed and not collected are not lost, buffered or not.
+        """
+
+        keys = [f"lake/{i:02d}.json" for i in range(20)]
+        put_objects(s3_lake, [(key, f"{key}\n") for key in keys], mocker)
+        args = dict(
+            bucket=BUCKET,
+            prefix="lake/",
+            s3_batchsize=3,
+            batch_size=4,
+            collect_batch_size=1,
+            buffer_size=buffer_size,
+            list_checkpoint=str(tmp_path / "listing.json"),
+            client_kwargs=dict(endpoint_url=endpoint_url),
+            filepath=tmp_path,
+            filename="testfile",
+        )
+        with pytest.raises(ValueError):
+            S3LakeCollector(order="global", **args)
+        collector = S3LakeCollector(**args)
+        read = collector.reader.read
+
+        def crash_read(object_key, *args):
+            if object_key == keys[9]:
+                raise KeyboardInterrupt
+            return read(object_key, *args)
+
+        mocker.patch.object(collector.reader, "read", side_effect=crash_read)
+        with pytest.raises(KeyboardInterrupt):
+            collector.start()
+        collected = (tmp_path / "testfile.lakeflush.inprogress").read_text().split()
+        assert collected == keys[:9]
+
+        collector = S3LakeCollector(**args)
+        collector.start()
+        collector.close()
+
+        data = (tmp_path / "testfile.lakeflush.inprogress").read_text().split()
+        assert sorted(set(data)) == keys
+        # only the pages not fully collected are listed again
+        assert len(data) == len(keys) + 9 - 6
+        assert not (tmp_path / "listing.json").exists()
+
+    @pytest.mark.parametrize(
+        "prefix,patterns,list_prefix",
+        [
+            (None, ["logs/2024/*.json"], "logs/2024/"),
+            ("logs/", ["logs/2024/0*.json", "logs/2024/1*.json"], "logs/2024/"),
+            ("logs/2024/", ["*.json"], "logs/2024/"),
+        ],
+    )
+    def test_collection_pattern_prefix(
+        self, prefix, patterns, list_prefix, s3_lake, endpoint_url, tmp_path, mocker
+    ):
+        """
+        Test the s3 lake collector listing only the literal prefix of patterns.
+        """
+
+        keys = ["logs/2023/0.json", "logs/2024/0.json", "logs/2024/1.csv"]
+        keys += ["logs/2024/1.json", "other/0.json"]
+        put_objects(s3_lake, [(key, f"{key}\n") for key in keys], mocker)
+        list_objects = mocker.spy(S3Store, "list_objects")
+        collector = S3LakeCollector(
+            BUCKET,
+            prefix=prefix,
+            match_patterns=patterns,
+            client_kwargs=dict(endpoint_url=endpoint_url),
+            filepath=tmp_path,
+            filename="testfile",
+        )
+        collector.start()
+        collector.close()
+
+        data = (tmp_path / "testfile.lakeflush.inprogress").read_text()
+        assert data.split() == ["logs/2024/0.json", "logs/2024/1.json"]
+        prefixes = {call.kwargs["Prefix"] for call in list_objects.call_args_list}
+        assert prefixes == {list_prefix}
+
+    def test_collection_filters(self, s3_lake, endpoint_url, tmp_path, mocker):
+        """
+        Test the s3 lake collector skipping empty, large and out of window objects
+        from their listing, without fetching them.
+        """
+
+        bodies = [b"0\n", b"1\n", b"", b"3" * 2048 + b"\n", b"4\n", b"5\n"]
+        put_objects(s3_lake, zip([f"{i}.json" for i in range(6)], bodies), mocker)
+        get = mocker.spy(S3Store, "get")
+        collector = S3LakeCollector(
+            BUCKET,
+            modified_after=datetime(2024, 1, 1, 0, 0, 1),
+            modified_before=datetime(2024, 1, 1, 0, 0, 5),
+            max_file_mb=0.001,
+            client_kwargs=dict(endpoint_url=endpoint_url),
+            filepath=tmp_path,
+            filename="testfile",
+        )
+        collector.start()
+        collector.close()
+
+        data = (tmp_path / "testfile.lakeflush.inprogress").read_text()
+        assert data.split() == ["1", "4"]
+        assert [call.args[1] for call in get.call_args_list] == ["1.json", "4.json"]
+
+
+class TestS3Lister:
+    KEYS = sorted(
+        [f"lake/top{i}.json" for i in range(3)]
+        + [f"lake/{p}/{i}.json" for p in ("a", "b", "c/d") for i in range(5)]
+    )
+
+    @pytest.fixture
+    def lister_lake(self, s3_lake, endpoint_url):
+        for key in self.KEYS:
+            s3_lake.put_object(Bucket=BUCKET, Key=key, Body=b"{}")
+        s3_lake.put_object(Bucket=BUCKET, Key="other/0.json", Body=b"{}")
+        S3Store.setup(endpoint_url=endpoint_url)
+
+    @pytest.mark.parametrize("workers", [1, 3])
+    def test_listing(self, workers, lister_lake):
+        """Test that the lister lists every object once, concurrently by prefix"""
+        lister = S3Lister(BUCKET, "lake/", page_size=2, workers=workers)
+
+        keys = [obj["Key"] for obj in lister.objects()]
+
+        assert sorted(keys) == self.KEYS
+        if workers > 1:
+            assert "lake/a/|" in lister.streams
+
+    @pytest.mark.parametrize("workers", [1, 3])
+    def test_listing_checkpoint(self, workers, lister_lake, tmp_path):
+        """Test that a stopped listing resumes after its objects done"""
+        checkpoint = str(tmp_path / "listing.json")
+        lister = S3Lister(
+            BUCKET, "lake/", page_size=2, workers=workers, checkpoint_path=checkpoint
+        )
+        objects = lister.objects()
+        listed = [next(objects)["Key"] for _ in range(7)]
+        for key in listed[:5]:
+            lister.done(key)
+        objects.close()
+
+        lister = S3Lister(
+            BUCKET, "lake/", page_size=2, workers=workers, checkpoint_path=checkpoint
+        )
+        resumed = []
+        for obj in lister.objects():
+            resumed.append(obj["Key"])
+            lister.done(obj["Key"])
+
+        # listed objects not done are listed again
+        assert set(listed[5:]) <= set(resumed)
+        assert sorted(set(listed[:5] + resumed)) == self.KEYS
+        if workers == 1:
+            # only the pages not fully done are listed again
+            assert len(resumed) == len(self.KEYS) - 4
+        assert not (tmp_path / "listing.json").exists()
@@ -1,9 +1,12 @@
 import pytest
 import time
 import gzip
+import bz2
+import lzma
+import zlib
 import os
 from pathlib import Path
-from lakeflush.core import Collector
+from lakeflush.core import Collector, FlushPolicy, FlushMode
 
 
 @pytest.fixture(autouse=True)
@@ -88,6 +91,147 @@ class TestCollector:
         assert lines[0].strip() == files_data[0]
         assert lines[1].strip() == files_data[1]
 
+    @pytest.mark.parametrize(
+        "collector_kwargs",
+        [{}, {"compress": True}],
+    )
+    def test_collection_many(self, collector_kwargs, tmp_path: Path):
+        """Test that collector collecting batch of data"""
+        collector = Collector(tmp_path, "testfile", **collector_kwargs)
+        if collector_kwargs.get("compress") is True:
+            file_path = tmp_path / "testfile.lakeflush.inprogress.gz"
+            _open = gzip.open
+        else:
+            file_path = tmp_path / "testfile.lakeflush.inprogress"
+            _open = open
+
+        files_data = [
+            ",".join(self.__class__.__name__),
+            "|".join(self.__class__.__name__).encode(),
+        ]
+        collector.collect_many(files_data)
+
+        with _open(file_path, "rt") as f:
+            lines = [f.readline(), f.readline()]
+
+        assert lines[0].strip() == files_data[0]
+        assert lines[1].strip() == files_data[1].decode()
+
+    @pytest.mark.parametrize(
+        "collector_kwargs",
+        [{"buffer_size": 1024}, {"buffer_size": 1024, "compress": True}],
+    )
+    def test_collection_buffered(self, collector_kwargs, tmp_path: Path):
+        """Test that collector buffers data until flushed"""
+        collector = Collector(tmp_path, "testfile", **collector_kwargs)
+        if collector_kwargs.get("compress") is True:
+            file_path = tmp_path / "testfile.lakeflush.inprogress.gz"
+            _open = gzip.open
+        else:
+            file_path = tmp_path / "testfile.lakeflush.inprogress"
+            _open = open
+
+        files_data = [
+            ",".join(self.__class__.__name__),
+            "|".join(self.__class__.__name__),
+        ]
+        for data in files_data:
+            collector.collect(data)
+
+        assert os.path.getsize(file_path) == 0
+
+        collector.flush()
+
+        with _open(file_path, "rt") as f:
+            lines = [f.readline(), f.readline()]
+
+        assert lines[0].strip() == files_data[0]
+        assert lines[1].strip() == files_data[1]
+
+    def test_gzip_collection_flush_policy(self, tmp_path: Path):
+        """Test that collector flushes gzip data using flush policy"""
+        policy = FlushPolicy(FlushMode.ROTATION)
+        collector = Collector(tmp_path, "testfile", compress=True, flush_policy=policy)
+        file_path = tmp_path / "testfile.lakeflush.inprogress.gz"
+        data = ",".join(self.__class__.__name__)
+        collector.collect(data)
+
+        # gzip header only
+        assert os.path.getsize(file_path) <= 10
+
+        collector.close()
+
+        with gzip.open(file_path, "rt") as f:
+            assert f.readline().strip() == data
+
+    def test_gzip_collection_parallel(self, tmp_path: Path):
+        """Test that collector compresses gzip members in parallel and in order"""
+        collector = Collector(
+            tmp_path,
+            "testfile",
+            compress=True,
+            compress_workers=2,
+            buffer_size=64 * 1024,
+            flush_policy=FlushPolicy(FlushMode.ROTATION),
+        )
+        file_path = tmp_path / "testfile.lakeflush.inprogress.gz"
+        files_data = [f"{self.__class__.__name__},{i}" for i in range(50000)]
+        collector.collect_many(files_data)
+        collector.close()
+
+        with gzip.open(file_path, "rt") as f:
+            lines = f.read().splitlines()
+
+        with open(file_path, "rb") as f:
+            data = f.read()
+        members = 0
+        while data:
+            decompressor = zlib.decompressobj(31)
+            decompressor.decompress(data)
+            data = decompressor.unused_data
+            members += 1
+
+        assert lines == files_data
+        assert members > 1
+
+    @pytest.mark.parametrize(
+        "codec,extension,_open",
+        [
+            ("gzip", ".gz", gzip.open),
+            ("bz2", ".bz2", bz2.open),
+            ("lzma", ".xz", lzma.open),
+        ],
+    )
+    def test_collection_codec(self, codec, extension, _open, tmp_path: Path):
+        """Test that collector collecting data using compression codec"""
+        collector = Collector(tmp_path, "testfile", codec=codec, max_time_mins=2)
+        file_path = tmp_path / f"testfile.lakeflush.inprogress{extension}"
+        files_data = [
+            ",".join(self.__class__.__name__),
+            "|".join(self.__class__.__name__),
+        ]
+        for data in files_data:
+            collector.collect(data)
+
+        with _open(file_path, "rt") as f:
+            lines = [f.readline(), f.readline()]
+
+        assert lines[0].strip() == files_data[0]
+        assert lines[1].strip() == files_data[1]
+
+        time.sleep(120)
+        collector.collect(files_data[0])
+        file_paths = list(tmp_path.glob(f"testfile.*.lakeflush.collected{extension}"))
+
+        assert len(file_paths) == 1
+
+    def test_collection_codec_validation(self, tmp_path: Path):
+        """Test that collector validates compression codec"""
+        with pytest.raises(ValueError):
+            Collector(tmp_path, "testfile", codec="unknown")
+        with pytest.raises(ValueError):
+            Collector(tmp_path, "testfile", codec="bz2", compresslevel=0)
+
     @pytest.mark.parametrize(
         "collector_kwargs",
         [{"max_size_mb": 1}, {"max_size_mb": 2}],
@@ -207,3 +351,61 @@ class TestCollector:
         file_paths = list(tmp_path.glob("testfile.*.lakeflush.collected"))
 
         assert len(file_paths) == 3
+
+    def test_collection_async_rollover(self, tmp_path: Path, mocker):
+        """Test that collector finalizes collected files in background"""
+        on_finalized = mocker.patch("lakeflush.core.collector.Collector.on_finalized")
+        # leftover of a run stopped while finalizing
+        (tmp_path / "testfile.lakeflush.inprogress.gz.0.rotating").write_bytes(b"")
+        collector = Collector(
+            tmp_path, "testfile", compress=True, max_pending_bundles=2, fsync=True
+        )
+        data = os.urandom(1024 * 1024).hex()
+        for _ in range(3):
+            collector.collect(data)
+        collector.close()
+
+        file_paths = list(tmp_path.glob("testfile.*.lakeflush.collected.gz"))
+
+        assert len(file_paths) == 4
+        assert not list(tmp_path.glob("*.rotating"))
+        assert on_finalized.call_count == 3
+        for call in on_finalized.call_args_list:
+            with gzip.open(call.args[0], "rt") as f:
+                assert f.read() == f"{data}\n"
+
+    def test_collection_idle_rotation(self, tmp_path: Path):
+        """Test that collector rotates an idle non empty file once its time expired"""
+        collector = Collector(
+            tmp_path, "testfile", max_time_mins=0.01, idle_rotation=True
+        )
+        collector.collect("data")
+        time.sleep(1)
+
+        pattern = "testfile.*.lakeflush.collected"
+        deadline = time.monotonic() + 5
+        while not list(tmp_path.glob(pattern)) and time.monotonic() < deadline:
+            collector._stop.wait(0.1)
+        time.sleep(1)  # new file is empty, it is not rotated
+        collector._stop.wait(1.5)
+        collector.close()
+
+        file_paths = list(tmp_path.glob(pattern))
+
+        assert len(file_paths) == 1
+        assert file_paths[0].read_text() == "data\n"
+
+    def test_collection_file_mark(self, tmp_path: Path, mocker):
+        """Test that collecting an empty or emptied file records its mark"""
+        collector = Collector(tmp_path, "testfile")
+        src = tmp_path / "source.json"
+        src.write_text("")
+        assert collector.collect_file(str(src), mark="empty") == 0
+        assert collector.writer.mark == "empty"
+
+        # emptied between its size and its copy
+        src.write_text("data\n")
+        mocker.patch.object(collector.writer._bundle, "copy", return_value=0)
+        assert collector.collect_file(str(src), mark="emptied") == 0
+        assert collector.writer.mark == "emptied"
+        collector.close()
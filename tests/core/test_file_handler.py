@@ -0,0 +1,51 @@
+import pytest
+import logging
+import os
+from pathlib import Path
+from lakeflush.core.file_handler import SizedTimedRotatingFileHandler
+
+
+@pytest.fixture
+def logger():
+    """logger setup"""
+    logger = logging.getLogger("__lakeflush-test-handler__")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    yield logger
+    for handler in list(logger.handlers):
+        handler.close()
+        logger.removeHandler(handler)
+
+
+class TestSizedTimedRotatingFileHandler:
+    def test_size_seeded(self, tmp_path: Path):
+        """Test that handler seeds the tracked size from existing file"""
+        file_path = tmp_path / "testfile.lakeflush.inprogress"
+        file_path.write_text("x" * 100)
+        handler = SizedTimedRotatingFileHandler(str(file_path))
+
+        assert handler.current_size == 100
+
+        handler.close()
+
+    @pytest.mark.parametrize("data", ["x" * 1023, "é" * 511 + "x"])
+    @pytest.mark.parametrize("size_check_interval", [0, 1024])
+    def test_rollover_by_size(self, size_check_interval, data, logger, tmp_path: Path):
+        """Test that handler rotates file using the tracked size in bytes"""
+        file_path = tmp_path / "testfile.lakeflush.inprogress"
+        handler = SizedTimedRotatingFileHandler(
+            str(file_path),
+            maxBytes=10 * 1024,
+            interval=60,
+            size_check_interval=size_check_interval,
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        for _ in range(15):
+            logger.info(data)
+
+        file_paths = list(tmp_path.glob("testfile.lakeflush.inprogress.*"))
+
+        assert len(file_paths) == 1
+        assert os.path.getsize(file_paths[0]) == 9 * 1024
+        assert handler.current_size == os.path.getsize(file_path) == 6 * 1024
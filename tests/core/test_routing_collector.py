@@ -0,0 +1,79 @@
+import pytest
+import gzip
+import time
+from pathlib import Path
+from lakeflush.core import RoutingCollector
+from lakeflush.utils.logger import Logger
+
+
+class TestRoutingCollector:
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"filepath": None, "filename": "testfile"},
+            {"filepath": "./testpath1", "filename": "testfile"},
+            {"filename": "testfile", "max_open_files": 0},
+        ],
+    )
+    def test_validation(self, kwargs, tmp_path: Path):
+        """Test the routing collector validation"""
+        kwargs.setdefault("filepath", tmp_path)
+        with pytest.raises(ValueError):
+            RoutingCollector(**kwargs)
+
+    def test_collection_routed(self, tmp_path: Path):
+        """Test that records are collected into the file of their key"""
+        collector = RoutingCollector(
+            tmp_path, "testfile", router=lambda data: data.split(",")[0]
+        )
+        collector.collect("a,1")
+        collector.collect_many(["b,1", "a,2", "b,2"])
+        collector.collect("c,1", key="a")
+        collector.collect("1", key=1)
+        collector.collect_many(["2"], key=1)
+        assert collector.keys() == ["b", "a", "1"]
+        collector.close()
+
+        assert (tmp_path / "testfile.a.lakeflush.inprogress").read_text() == (
+            "a,1\na,2\nc,1\n"
+        )
+        assert (tmp_path / "testfile.b.lakeflush.inprogress").read_text() == (
+            "b,1\nb,2\n"
+        )
+        assert (tmp_path / "testfile.1.lakeflush.inprogress").read_text() == "1\n2\n"
+        with pytest.raises(ValueError):
+            RoutingCollector(tmp_path, "testfile").collect("a,1")
+
+    def test_collection_lru_eviction(self, tmp_path: Path):
+        """Test that least recently used collectors are closed and reopened"""
+        collector = RoutingCollector(
+            tmp_path, "testfile", max_open_files=2, compress=True
+        )
+        for i in range(10):
+            for key in ("a", "b", "c"):
+                collector.collect(f"{key}{i}", key=key)
+            assert len(collector.keys()) == 2
+        collector.close()
+
+        for key in ("a", "b", "c"):
+            path = tmp_path / f"testfile.{key}.lakeflush.inprogress.gz"
+            with gzip.open(path, "rt") as f:
+                assert f.read() == "".join(f"{key}{i}\n" for i in range(10))
+
+    def test_collection_setup_once(self, tmp_path: Path, mocker):
+        """Test that the application is set up once, and evicted collectors are
+        rotated when their time expired"""
+        setup = mocker.spy(Logger, "setup")
+        collector = RoutingCollector(
+            tmp_path, "testfile", max_open_files=2, max_time_mins=0.001
+        )
+        collector.collect("a1", key="a")
+        collector.collect("b1", key="b")
+        time.sleep(0.1)
+        collector.collect("c1", key="c")
+        collector.collect("a2", key="a")
+        collector.close()
+
+        assert setup.call_count == 1
+        (collected,) = tmp_path.glob("testfile.a.*.lakeflush.collected")
+        assert collected.read_text() == "a1\n"
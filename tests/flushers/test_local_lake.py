@@ -1,3 +1,4 @@
+import json
 import pytest
 import threading
 from datetime import datetime, timedelta
@@ -6,6 +7,7 @@ import time
 from tests.lakes.random_datalake import create_random_datalake
 from lakeflush.collectors import LocalLakeCollector
 from lakeflush.flushers import LocalLakeFlusher
+from lakeflush.utils.file import FlushJournal
 
 
 @pytest.fixture
@@ -88,3 +90,138 @@ class TestLocalLakeFlusher:
         finally:
             flusher.stop()
             flusher_thread.join(timeout=1)
+
+    def test_flush_journal(self, collector, collector_args, tmp_path):
+        """Test that flushed bundles are recorded in the flush journal"""
+
+        file_path = tmp_path / "locallakeflush"
+        os.makedirs(file_path)
+        flusher = LocalLakeFlusher(root_dir=file_path, **collector_args)
+        collector.start()
+        (collected,) = tmp_path.glob("testfile.*.lakeflush.collected")
+        stat = collected.stat()
+        flusher.flush(str(collected))
+        (flushed,) = file_path.glob("testfile.*.lakeflush")
+        record = flusher.journal.get(flushed.name)
+
+        assert record["source"] == str(collected)
+        assert record["destination"] == str(flushed)
+        assert record["size"] == stat.st_size
+        assert record["collected_at"] == stat.st_mtime
+        assert flusher.journal.path.parent == tmp_path / ".lakeflush"
+
+        # reloaded from the journal, no file per flushed bundle
+        journal = FlushJournal(flusher.journal.path)
+        assert journal.get(flushed.name) == record
+        assert not list(flusher.journal.path.parent.glob("*.flushed"))
+
+        # compaction keeps the latest record of each bundle
+        journal = FlushJournal(flusher.journal.path, compact_records=2)
+        journal.append(dict(record, size=1))
+        journal.append(dict(record, size=2))
+        assert FlushJournal(journal.path).get(flushed.name)["size"] == 2
+        assert len(journal.path.read_text().splitlines()) == len(journal)
+
+        # compaction keeps expired records of a source still present, records
+        # without bundle are skipped
+        (tmp_path / "kept.collected").touch()
+        records = [
+            dict(size=1),
+            dict(bundle="kept", source=str(tmp_path / "kept.collected")),
+            dict(bundle="expired", source=str(tmp_path / "missing.collected")),
+        ]
+        path = tmp_path / "expired.journal"
+        path.write_text(
+            "".join(json.dumps(dict(r, flushed_at=0)) + "\n" for r in records)
+        )
+        journal = FlushJournal(path, compact_records=1)
+        assert len(journal) == 2
+        journal.append(dict(bundle="new", flushed_at=time.time()))
+        journal = FlushJournal(path)
+        assert "kept" in journal and "new" in journal
+        assert "expired" not in journal
+
+    def test_flush_backlog(self, collector_args, tmp_path):
+        """Test that files collected before the flusher started are flushed by
+        the flush workers"""
+
+        file_path = tmp_path / "locallakeflush"
+        os.makedirs(file_path)
+        with pytest.raises(ValueError):
+            LocalLakeFlusher(file_path, flush_workers=0, **collector_args)
+        names = [f"testfile.{i}.backlog.lakeflush" for i in range(50)]
+        for name in names:
+            (tmp_path / f"{name}.collected").write_text(name)
+        (tmp_path / "testfile.empty.lakeflush.collected").touch()
+        flusher = LocalLakeFlusher(
+            root_dir=file_path,
+            flush_workers=4,
+            max_pending_flushes=2,
+            **collector_args,
+        )
+        flusher_thread = threading.Thread(target=flusher.start)
+        try:
+            flusher_thread.start()
+            deadline = time.time() + 10
+            while not all(name in flusher.journal for name in names):
+                assert time.time() < deadline
+                time.sleep(0.01)
+
+            assert sorted(path.name for path in file_path.iterdir()) == sorted(names)
+            assert (file_path / names[0]).read_text() == names[0]
+            assert (tmp_path / "testfile.empty.lakeflush.collected").exists()
+
+        finally:
+            flusher.stop()
+            flusher_thread.join(timeout=1)
+        assert not flusher_thread.is_alive()
+
+        # a stop before start is not lost
+        flusher = LocalLakeFlusher(root_dir=file_path, **collector_args)
+        flusher.stop()
+        flusher_thread = threading.Thread(target=flusher.start)
+        flusher_thread.start()
+        flusher_thread.join(timeout=5)
+        assert not flusher_thread.is_alive()
+
+    def test_flush_handoff(self, collector_args, tmp_path):
+        """Test that a collector hands its collected files off to the flusher
+        in process, without filesystem events"""
+
+        file_path = tmp_path / "locallakeflush"
+        os.makedirs(file_path)
+        lake_path = tmp_path / "locallake"
+        os.makedirs(lake_path)
+        endtime = datetime.now()
+        starttime = endtime + timedelta(hours=-1)
+        create_random_datalake(
+            lake_path, 4, starttime, endtime, file_type="csv", max_files=5
+        )
+        flusher = LocalLakeFlusher(root_dir=file_path, watch=False, **collector_args)
+        with pytest.raises(ValueError):
+            LocalLakeCollector(
+                root_dir=lake_path,
+                filepath=file_path,
+                filename="testfile",
+                flusher=flusher,
+            )
+        flusher_thread = threading.Thread(target=flusher.start)
+        try:
+            flusher_thread.start()
+            collector = LocalLakeCollector(
+                root_dir=lake_path, flusher=flusher, **collector_args
+            )
+            collector.start()
+            deadline = time.time() + 5
+            # recorded once the flushed file is moved
+            while not len(flusher.journal):
+                assert time.time() < deadline
+                time.sleep(0.01)
+            (flushed,) = file_path.glob("testfile.*.lakeflush")
+
+            assert flushed.name in flusher.journal
+            assert not list(tmp_path.glob("testfile.*.lakeflush.collected"))
+
+        finally:
+            flusher.stop()
+            flusher_thread.join(timeout=1)